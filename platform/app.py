@@ -1,8 +1,101 @@
 import streamlit as st
 import requests
 import json
+import os
 import pandas as pd
 import plotly.express as px
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Where the house price API lives (the Kubernetes service name by default)
+API_URL = os.getenv("API_URL", "http://house-price-service:5001").rstrip("/")
+
+# (connect, read) timeouts in seconds - a stuck API shouldn't freeze the dashboard
+REQUEST_TIMEOUT = (float(os.getenv("API_CONNECT_TIMEOUT", 2)), float(os.getenv("API_READ_TIMEOUT", 10)))
+
+# What-if sweeps: label -> (API field, min, max, default number of points)
+SWEEPS = {
+    "Living Area (sq ft)": ("gr_liv_area", 500, 5000, 46),
+    "Overall Quality (1-10)": ("overall_qual", 1, 10, 10),
+    "Lot Area (sq ft)": ("lot_area", 1000, 50000, 50),
+    "Year Built": ("year_built", 1900, 2025, 126),
+    "Bedrooms": ("bedrooms", 1, 10, 10),
+    "Bathrooms": ("bathrooms", 1, 10, 10),
+}
+
+
+@st.cache_resource
+def get_session():
+    """
+    One HTTP session shared by every user of this Streamlit server
+    Keeps connections to the API open (keep-alive) instead of a new TCP connection per click,
+    and retries with backoff (0.3s, 0.6s, 1.2s) when the API is briefly unavailable
+    Predictions don't change anything on the server, so retrying a POST is safe
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        raise_on_status=False,  # give us the last response instead of an exception
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def post(path, payload):
+    response = get_session().post(f"{API_URL}{path}", json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+
+# Same inputs -> same answer, so remember results for a few minutes
+# (errors raise and are not cached, so the next click tries the API again)
+@st.cache_data(ttl=300, max_entries=5000, show_spinner=False)
+def predict_simple(lot_area, bedrooms, bathrooms, year_built, overall_qual, gr_liv_area):
+    return post("/predict/simple", {
+        "lot_area": lot_area,
+        "bedrooms": bedrooms,
+        "bathrooms": bathrooms,
+        "year_built": year_built,
+        "overall_qual": overall_qual,
+        "gr_liv_area": gr_liv_area
+    })
+
+
+@st.cache_data(ttl=300, max_entries=500, show_spinner=False)
+def predict_sweep(base, field, values):
+    """
+    Prices for the base house with `field` set to each of `values`
+    All points go to the API in ONE /predict/batch request instead of one call per point
+    base is a tuple of (field, value) pairs so Streamlit can use it as a cache key
+    """
+    records = [{**dict(base), field: value} for value in values]
+    result = post("/predict/batch", {"records": records})
+    return [p.get("predicted_price") for p in sorted(result["predictions"], key=lambda p: p["index"])]
+
+
+@st.cache_data(ttl=300, max_entries=5000, show_spinner=False)
+def explain_simple(base):
+    """Dollar contribution of each model column to the base house's price (see /explain)"""
+    result = post("/explain", dict(base))
+    return result["base_price"], result["explanations"][0]["contributions"]
+
+
+def show_api_error(e):
+    if isinstance(e, requests.exceptions.ConnectionError):
+        st.error("❌ Could not connect to model API. Make sure your Kubernetes deployment is running!")
+        st.info("Check: kubectl get pods")
+    elif isinstance(e, requests.exceptions.Timeout):
+        st.error("❌ The model API took too long to answer, please try again")
+    elif isinstance(e, requests.exceptions.HTTPError):
+        st.error("❌ API Error: Could not get prediction")
+        st.error(f"Status Code: {e.response.status_code}")
+    else:
+        st.error(f"❌ Error: {e}")
 
 # Page config
 st.set_page_config(
@@ -50,43 +143,87 @@ if page == "🏠 Model Playground":
         }
         
         try:
-            # Call your Flask API
+            # Call your Flask API (through the shared session; repeat inputs come from the cache)
             with st.spinner("🤖 Running ML model..."):
-                response = requests.post(
-                    "http://house-price-service:5001/predict/simple",
-                    json=prediction_data
-                )
+                result = predict_simple(**prediction_data)
+            predicted_price = result['predicted_price']
             
-            if response.status_code == 200:
-                result = response.json()
-                predicted_price = result['predicted_price']
-                
-                # Display results
-                st.success("✅ Prediction Complete!")
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Predicted Price", f"${predicted_price:,.0f}")
-                with col2:
-                    price_per_sqft = predicted_price / gr_liv_area
-                    st.metric("Price per Sq Ft", f"${price_per_sqft:.0f}")
-                with col3:
-                    st.metric("Model Used", "ElasticNet")
-                
-                # Show input summary
-                st.subheader("Input Summary")
-                input_df = pd.DataFrame([prediction_data])
-                st.dataframe(input_df, use_container_width=True)
-                
-            else:
-                st.error("❌ API Error: Could not get prediction")
-                st.error(f"Status Code: {response.status_code}")
+            # Display results
+            st.success("✅ Prediction Complete!")
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Predicted Price", f"${predicted_price:,.0f}")
+            with col2:
+                price_per_sqft = predicted_price / gr_liv_area
+                st.metric("Price per Sq Ft", f"${price_per_sqft:.0f}")
+            with col3:
+                st.metric("Model Used", "ElasticNet")
+            
+            # Show input summary
+            st.subheader("Input Summary")
+            input_df = pd.DataFrame([prediction_data])
+            st.dataframe(input_df, use_container_width=True)
+            
+            # Exact breakdown of the price: the model is linear on the log scale
+            st.subheader("🧾 Why this price?")
+            try:
+                base_price, contributions = explain_simple(tuple(sorted(prediction_data.items())))
+                top = sorted(contributions.items(), key=lambda item: abs(item[1]), reverse=True)[:10]
+                explain_df = pd.DataFrame(top, columns=["Feature", "Contribution"])
+                fig = px.bar(explain_df, x="Contribution", y="Feature", orientation="h",
+                             color=explain_df["Contribution"] > 0,
+                             color_discrete_map={True: "#2ca02c", False: "#d62728"})
+                fig.update_layout(showlegend=False, yaxis={"categoryorder": "total ascending"})
+                fig.update_xaxes(tickprefix="$", tickformat=",.0f")
+                st.markdown(f"Starting from the model's base price of **${base_price:,.0f}**, "
+                            "the 10 features that moved the price the most:")
+                st.plotly_chart(fig, use_container_width=True)
+            except requests.exceptions.HTTPError as e:
+                if e.response.status_code == 501:
+                    st.info("The deployed model can't be explained exactly (it isn't a linear model)")
+                else:
+                    show_api_error(e)
                 
-        except requests.exceptions.ConnectionError:
-            st.error("❌ Could not connect to model API. Make sure your Kubernetes deployment is running!")
-            st.info("Check: kubectl get pods")
         except Exception as e:
-            st.error(f"❌ Error: {e}")
+            show_api_error(e)
+    
+    # What-if panel: change one feature of the house above and watch the price move
+    st.markdown("---")
+    st.subheader("📈 What-if Analysis")
+    st.markdown("Keep the house above fixed and sweep one feature across a range.")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        sweep_label = st.selectbox("Feature to sweep", list(SWEEPS))
+        field, low, high, default_points = SWEEPS[sweep_label]
+        sweep_range = st.slider("Range", min_value=low, max_value=high, value=(low, high))
+        max_points = sweep_range[1] - sweep_range[0] + 1
+        points = st.slider("Points", min_value=2, max_value=min(200, max_points),
+                           value=min(default_points, max_points)) if max_points > 2 else max_points
+    
+    with col2:
+        base_house = {
+            "lot_area": int(lot_area),
+            "bedrooms": int(bedrooms),
+            "bathrooms": int(bathrooms),
+            "year_built": int(year_built),
+            "overall_qual": int(overall_qual),
+            "gr_liv_area": int(gr_liv_area)
+        }
+        # Whole numbers only, like the inputs above (duplicates dropped for narrow ranges)
+        values = tuple(sorted({round(sweep_range[0] + i * (sweep_range[1] - sweep_range[0]) / max(points - 1, 1))
+                               for i in range(points)}))
+        try:
+            with st.spinner(f"🤖 Pricing {len(values)} variations..."):
+                prices = predict_sweep(tuple(sorted(base_house.items())), field, values)
+            sweep_df = pd.DataFrame({sweep_label: values, "Predicted Price": prices})
+            fig = px.line(sweep_df, x=sweep_label, y="Predicted Price", markers=True)
+            fig.add_vline(x=base_house[field], line_dash="dash", annotation_text="your house")
+            fig.update_yaxes(tickprefix="$", tickformat=",.0f")
+            st.plotly_chart(fig, use_container_width=True)
+        except Exception as e:
+            show_api_error(e)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,138 @@
+"""
+Admission control: a concurrency limit with a small, prioritized waiting line
+
+Without it, a burst of traffic all gets started at once, every request fights
+for the same CPU, and everyone's latency blows up together. Instead:
+  - at most max_concurrent prediction requests run at the same time
+  - up to max_queue more wait in line, interactive ones (priority 0, e.g.
+    /predict/simple) ahead of batch ones (priority 1, /predict/batch)
+  - a request that can't start within queue_timeout is turned away with a
+    503, and when the line is full the newcomer gets a 429 straight away -
+    unless it outranks a waiting batch request, which is bumped instead
+Rejected callers get a Retry-After header, so well-behaved clients back off.
+
+Note for gunicorn's gthread worker: a request only reaches this line once a
+worker thread has picked it up, so GUNICORN_THREADS must be larger than
+max_concurrent + max_queue. Otherwise the overflow waits in gunicorn's own
+(unbounded, unprioritized) queue instead of getting a quick 429. The spare
+threads cost little: all they do is say no.
+"""
+import threading
+
+INTERACTIVE = 0
+BATCH = 1
+
+
+class Rejected(Exception):
+    """The request was not admitted. status is the HTTP code to answer with"""
+
+    def __init__(self, reason, status, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('priority', 'sequence', 'event', 'outcome')
+
+    def __init__(self, priority, sequence):
+        self.priority = priority
+        self.sequence = sequence
+        self.event = threading.Event()
+        self.outcome = None     # 'admitted' or 'bumped', set by another thread
+
+
+class AdmissionController:
+    """
+    Limits concurrent requests; the rest wait (by priority, then arrival) or are turned away
+    on_change(in_flight, {priority: waiting}) is called, with the lock held, whenever either changes
+    """
+
+    def __init__(self, max_concurrent=4, max_queue=16, queue_timeout=0.25, retry_after=1, on_change=None):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._waiting = []      # _Waiter objects, small (at most max_queue)
+        self._sequence = 0
+        self.in_flight = 0
+        self.admitted = {INTERACTIVE: 0, BATCH: 0}
+        self.rejected = {}      # (reason, priority) -> count
+        self.on_change = on_change
+
+    def acquire(self, priority=INTERACTIVE):
+        """Wait for a slot (at most queue_timeout). Raises Rejected if there isn't one"""
+        with self._lock:
+            if self.in_flight < self.max_concurrent and not self._waiting:
+                self.in_flight += 1
+                self.admitted[priority] += 1
+                self._changed()
+                return
+            if len(self._waiting) >= self.max_queue:
+                # Line is full: bump the most recent waiter with a lower priority than ours, if any
+                victim = max(self._waiting, key=lambda w: (w.priority, w.sequence), default=None)
+                if victim is None or victim.priority <= priority:
+                    self._count_rejection('queue_full', priority)
+                    raise Rejected('queue_full', 429, self.retry_after)
+                self._waiting.remove(victim)
+                victim.outcome = 'bumped'
+                victim.event.set()
+            self._sequence += 1
+            waiter = _Waiter(priority, self._sequence)
+            self._waiting.append(waiter)
+            self._changed()
+
+        waiter.event.wait(self.queue_timeout)
+        with self._lock:
+            if waiter.outcome == 'admitted':
+                self.admitted[priority] += 1
+                return
+            if waiter.outcome is None:
+                self._waiting.remove(waiter)
+                self._changed()
+                reason = 'timeout'
+            else:
+                reason = 'bumped'
+            self._count_rejection(reason, priority)
+        raise Rejected(reason, 503, self.retry_after)
+
+    def release(self):
+        """Free a slot and hand it to the next waiter in line"""
+        with self._lock:
+            self.in_flight -= 1
+            while self._waiting and self.in_flight < self.max_concurrent:
+                waiter = min(self._waiting, key=lambda w: (w.priority, w.sequence))
+                self._waiting.remove(waiter)
+                waiter.outcome = 'admitted'
+                self.in_flight += 1
+                waiter.event.set()
+            self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            waiting = {INTERACTIVE: 0, BATCH: 0}
+            for w in self._waiting:
+                waiting[w.priority] += 1
+            self.on_change(self.in_flight, waiting)
+
+    def _count_rejection(self, reason, priority):
+        self.rejected[(reason, priority)] = self.rejected.get((reason, priority), 0) + 1
+
+    def queue_depth(self, priority=None):
+        with self._lock:
+            return sum(1 for w in self._waiting if priority is None or w.priority == priority)
+
+    def stats(self):
+        names = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'queue_timeout_ms': self.queue_timeout * 1000,
+                'in_flight': self.in_flight,
+                'queue_depth': {names[p]: sum(1 for w in self._waiting if w.priority == p) for p in names},
+                'admitted': {names[p]: count for p, count in self.admitted.items()},
+                'rejected': {f'{names[p]}_{reason}': count for (reason, p), count in sorted(self.rejected.items())},
+            }
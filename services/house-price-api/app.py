@@ -1,17 +1,346 @@
-from flask import Flask, request, jsonify  # Flask for web API, request for getting data, jsonify for JSON responses
-import joblib  
+import time
+_import_started = time.perf_counter()  # startup timing, reported on /healthz/ready
+
+from flask import Flask, Response, g, request, jsonify  # Flask for web API, request for getting data, jsonify for JSON responses
 import numpy as np  
 import pandas as pd  
 from datetime import datetime 
+import hmac
 import os
 
+from admission import BATCH, INTERACTIVE, AdmissionController, Rejected
+from batching import MicroBatcher
+from cache import PredictionCache
+from drift import DriftMonitor
+from features import (CATEGORICAL_FEATURES, FEATURES_REQUIRED, NUMERIC_FEATURES, SIMPLE_FIELDS,
+                      build_simple_features)
+from kernel import dollar_contributions, round_to_cents
+from metrics import Metrics, PodGauges, RequestTimer, stage
+from model_manager import ModelManager, load_model
+from prediction_log import PredictionLogger
+from profiler import SamplingProfiler
+from registry import ModelNotFound, ModelRegistry
+from shadow import ShadowScorer
+from wire import (BULK_FORMATS, NDJSON, NPZ, PayloadError, PayloadTooLarge, ndjson_lines,
+                  negotiate, npz_bytes, read_ndjson_columns, read_npz_columns, validate_columns)
+
+_imports_done = time.perf_counter()
+
 # Create a Flask web application
 # Think of this like creating a website that can receive requests and send responses
 app = Flask(__name__)
 
+# Opt-in micro-batching of single-row requests (see batching.py)
+# Trades up to MICROBATCH_WINDOW_MS of extra latency for fewer, bigger model calls
+MICROBATCH_ENABLED = os.environ.get('MICROBATCH_ENABLED', '0') == '1'
+MICROBATCH_WINDOW_MS = float(os.environ.get('MICROBATCH_WINDOW_MS', 2.0))
+MICROBATCH_MAX_SIZE = int(os.environ.get('MICROBATCH_MAX_SIZE', 64))
+
+# In-process cache of recent predictions (see cache.py), PREDICTION_CACHE_SIZE=0 turns it off
+PREDICTION_CACHE_SIZE = int(os.environ.get('PREDICTION_CACHE_SIZE', 1024))
+PREDICTION_CACHE_TTL = float(os.environ.get('PREDICTION_CACHE_TTL', 300))
+prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL) if PREDICTION_CACHE_SIZE > 0 else None
+
+# Upper limit on rows per /predict/batch call so one caller can't hog the server
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
 # Load trained ML model 
-model_path = 'models/house_price/saved_model/elastic_net_regression.pkl'
-model = joblib.load(model_path)
+# The ModelManager keeps the model, its compiled kernel (see kernel.py) and its
+# version together, and can hot-swap them without a restart (see model_manager.py)
+# Set USE_COMPILED_KERNEL=0 to go back to plain model.predict, and if the
+# model isn't a linear pipeline we fall back to sklearn automatically
+model_path = os.environ.get('MODEL_PATH', 'models/house_price/saved_model/elastic_net_regression.pkl')
+USE_COMPILED_KERNEL = os.environ.get('USE_COMPILED_KERNEL', '1') == '1'
+_load_started = time.perf_counter()
+model_manager = ModelManager(
+    model_path,
+    use_kernel=USE_COMPILED_KERNEL,
+    logger=app.logger,
+    canary_path=os.environ.get('CANARY_DATA_PATH', 'data/train_new.csv'),
+    canary_rows=int(os.environ.get('CANARY_ROWS', 200)),
+    max_canary_rmse=float(os.environ.get('CANARY_MAX_RMSE', 0.5)),
+    features=FEATURES_REQUIRED
+)
+_load_done = time.perf_counter()
+
+# Shadow mode: SHADOW_MODEL_PATH points at a candidate model that scores a copy of
+# live traffic in the background (see shadow.py). Users only ever get the live
+# model's answer, and mirroring is a non-blocking put that drops when the queue is full
+SHADOW_QUEUE_SIZE = int(os.environ.get('SHADOW_QUEUE_SIZE', 10000))  # rows
+SHADOW_BATCH_SIZE = int(os.environ.get('SHADOW_BATCH_SIZE', 256))
+SHADOW_THRESHOLD_PCT = float(os.environ.get('SHADOW_THRESHOLD_PCT', 5.0))
+
+def start_shadow(path, threshold_pct=SHADOW_THRESHOLD_PCT):
+    candidate = load_model(path, USE_COMPILED_KERNEL, app.logger)
+    return ShadowScorer(candidate, max_queue=SHADOW_QUEUE_SIZE, batch_size=SHADOW_BATCH_SIZE,
+                        threshold_pct=threshold_pct)
+
+shadow = start_shadow(os.environ['SHADOW_MODEL_PATH']) if os.environ.get('SHADOW_MODEL_PATH') else None
+
+# Drift monitoring: compares live model inputs with the training data, per feature
+# (see drift.py). Requests only append to a deque; the stats are built in the background
+# DRIFT_MONITOR=0 turns it off
+DRIFT_MONITOR = os.environ.get('DRIFT_MONITOR', '1') == '1'
+DRIFT_REFERENCE_PATH = os.environ.get('DRIFT_REFERENCE_PATH', 'data/train_new.csv')
+drift_monitor = None
+if DRIFT_MONITOR:
+    try:
+        drift_monitor = DriftMonitor.from_csv(DRIFT_REFERENCE_PATH, NUMERIC_FEATURES, CATEGORICAL_FEATURES)
+    except (OSError, KeyError, ValueError) as e:
+        app.logger.warning(f'Drift monitoring is off, could not read reference data: {e}')
+
+# Prediction log: every prediction (inputs, price, model version, latency) goes to
+# rotating gzip JSON-lines files in PREDICTION_LOG_DIR, written by a background
+# thread (see prediction_log.py). Empty = no log. If the disk falls behind and the
+# buffer fills up, predictions are dropped from the log, never delayed
+PREDICTION_LOG_DIR = os.environ.get('PREDICTION_LOG_DIR', '')
+prediction_logger = None
+if PREDICTION_LOG_DIR:
+    prediction_logger = PredictionLogger(
+        PREDICTION_LOG_DIR,
+        max_buffer=int(os.environ.get('PREDICTION_LOG_BUFFER', 100000)),
+        flush_interval=float(os.environ.get('PREDICTION_LOG_FLUSH_SECONDS', 1.0)),
+        max_file_bytes=int(float(os.environ.get('PREDICTION_LOG_MAX_MB', 64)) * 1024 * 1024),
+        max_file_seconds=float(os.environ.get('PREDICTION_LOG_ROTATE_SECONDS', 3600))
+    )
+
+# Admission control: at most ADMISSION_MAX_CONCURRENT predictions run at once per
+# process, up to ADMISSION_MAX_QUEUE more wait (interactive before batch) for at most
+# ADMISSION_QUEUE_TIMEOUT_MS, and everything else gets a quick 429/503 with
+# Retry-After instead of making everyone slow (see admission.py)
+# ADMISSION_MAX_CONCURRENT=0 turns it off
+ADMISSION_MAX_CONCURRENT = int(os.environ.get('ADMISSION_MAX_CONCURRENT', 4))
+
+# hpa.yaml scales on in-flight and queued requests, and needs them for the whole
+# pod, not just the one worker a scrape happens to reach. This shared memory is
+# created here, before gunicorn forks the workers (preload_app), and every worker
+# writes its own numbers into it, so /metrics reports the sum over all of them
+pod_admission = PodGauges(['in_flight', 'queued_interactive', 'queued_batch'])
+
+def _publish_admission(in_flight, waiting):
+    pod_admission.set(in_flight=in_flight, queued_interactive=waiting[INTERACTIVE], queued_batch=waiting[BATCH])
+
+admission = None
+if ADMISSION_MAX_CONCURRENT > 0:
+    admission = AdmissionController(
+        max_concurrent=ADMISSION_MAX_CONCURRENT,
+        max_queue=int(os.environ.get('ADMISSION_MAX_QUEUE', 16)),
+        queue_timeout=float(os.environ.get('ADMISSION_QUEUE_TIMEOUT_MS', 250)) / 1000,
+        retry_after=int(os.environ.get('ADMISSION_RETRY_AFTER', 1)),
+        on_change=_publish_admission
+    )
+
+def explain_priority():
+    """/explain for one house is interactive, for several houses it's a batch job"""
+    data = request.get_json(silent=True)   # parsed once; explain() gets the cached result
+    records = data.get('records') if isinstance(data, dict) else data
+    return BATCH if isinstance(records, list) and len(records) > 1 else INTERACTIVE
+
+# Which routes go through admission control, and at what priority: a priority, or a
+# function that picks one from the request (health checks, /metrics and admin routes
+# are never held up)
+ADMISSION_PRIORITIES = {
+    'predict_house_price': INTERACTIVE,
+    'predict_simple': INTERACTIVE,
+    'explain': explain_priority,
+    'predict_batch': BATCH,
+    'registry_predict': BATCH,
+}
+
+# Startup phase: the pod only reports ready after the model is loaded AND a few
+# warmup predictions have gone through every code path (see warm_up below)
+# WARMUP_ROUNDS=0 skips the warmup
+WARMUP_ROUNDS = int(os.environ.get('WARMUP_ROUNDS', 3))
+startup = {
+    'ready': False,
+    'import_ms': round((_imports_done - _import_started) * 1000, 1),
+    'model_load_ms': round((_load_done - _load_started) * 1000, 1),
+}
+
+# MODEL_WATCH_INTERVAL > 0 polls the model file every N seconds and reloads it when it changes
+# (with several gunicorn workers this is the way to reload all of them, not just one)
+MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 0))
+
+# The /admin and /debug routes need an X-Admin-Token header matching ADMIN_TOKEN,
+# and without ADMIN_TOKEN they are switched off completely
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Every model under models/*/saved_model, loaded the first time it's used (see registry.py)
+# MODEL_MEMORY_BUDGET_MB caps how much loaded model we keep around per process
+MODELS_DIR = os.environ.get('MODELS_DIR', 'models')
+registry = ModelRegistry(MODELS_DIR,
+                         float(os.environ.get('MODEL_MEMORY_BUDGET_MB', 256)))
+
+# The registry name of the model /predict serves; the ModelManager owns that one
+PRIMARY_MODEL = 'house_price'
+
+# Models trained on a transformed target, and how to get back to real units
+# (house prices were trained on np.log1p(SalePrice))
+TARGET_TRANSFORMS = {'house_price': np.expm1}
+
+def _is_number(value):
+    """True for real numbers (bool is technically an int in Python, so exclude it)"""
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+def prepare_batch_record(record):
+    """
+    Validate one /predict/batch record and return the full 23-feature row
+    Records with any of the 23 model columns are treated as full records,
+    otherwise they are treated like a /predict/simple request
+    Raises ValueError with a readable message if the record can't be scored
+    """
+    if not isinstance(record, dict) or not record:
+        raise ValueError('Record must be a non-empty JSON object')
+
+    if any(feature in record for feature in FEATURES_REQUIRED):
+        missing = [f for f in FEATURES_REQUIRED if f not in record]
+        if missing:
+            raise ValueError(f'Missing features: {missing}')
+        bad = [f for f in NUMERIC_FEATURES if not _is_number(record[f]) or not np.isfinite(record[f])]
+        bad += [f for f in CATEGORICAL_FEATURES if not isinstance(record[f], str)]
+        if bad:
+            raise ValueError(f'Invalid values for features: {bad}')
+        return {f: record[f] for f in FEATURES_REQUIRED}
+
+    unknown = [k for k in record if k not in SIMPLE_FIELDS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {unknown}')
+    bad = [k for k in record if not _is_number(record[k]) or not np.isfinite(record[k])]
+    if bad:
+        raise ValueError(f'Invalid values for fields: {bad}')
+    return build_simple_features(record)
+
+def cache_key(row):
+    """
+    Canonical, hashable version of a 23-feature row for the prediction cache
+    Numbers become floats so 3 and 3.0 are the same house, extra keys are ignored
+    Returns None if the row can't be cached (missing features, odd values)
+    """
+    try:
+        key = tuple(float(row[f]) if _is_number(row[f]) else row[f] for f in FEATURES_REQUIRED)
+        hash(key)
+        return key
+    except (KeyError, TypeError):
+        return None
+
+def predict_log_price(row):
+    """
+    Score ONE 23-feature dict (used by /predict and /predict/simple)
+    Repeat inputs are answered from the prediction cache, and with
+    micro-batching on, the row waits a moment so it can share a model
+    call with other requests that arrive at the same time
+    """
+    # Grab the active model once: it does the scoring AND keys the cache, so
+    # a reload halfway through can't store one model's answer under the other's version
+    active = model_manager.active
+    version = active.version
+    with stage('cache_lookup'):
+        key = cache_key(row) if prediction_cache is not None else None
+        cached = prediction_cache.get(version, key) if key is not None else None
+    if cached is not None:
+        mirror_to_shadow([row], [cached], version)
+        return cached
+
+    if batcher is not None:
+        with stage('microbatch'):
+            log_prediction = batcher.submit(row, active)
+    else:
+        log_prediction = predict_log_prices([row], active)[0]
+
+    if key is not None:
+        prediction_cache.put(version, key, log_prediction)
+    mirror_to_shadow([row], [log_prediction], version)
+    return log_prediction
+
+def record_prediction(features, log_predictions, source):
+    """
+    Hand successfully scored inputs to the drift monitor and the prediction log
+    Both only append to an in-memory buffer here; the work happens in their own threads
+    """
+    # Warmup requests aren't real traffic
+    if not startup['ready']:
+        return
+    if drift_monitor is not None:
+        drift_monitor.observe(features, source)
+    if prediction_logger is not None:
+        timer = g.get('request_timer')
+        latency_ms = (time.perf_counter() - timer.started) * 1000 if timer is not None else None
+        prediction_logger.log(source, model_manager.active.version, latency_ms, features, log_predictions)
+
+def mirror_to_shadow(features, log_predictions, version):
+    """Hand live traffic to the shadow model, if there is one (never blocks)"""
+    # Warmup requests aren't real traffic, so only mirror once we're ready
+    if shadow is not None and startup['ready']:
+        with stage('shadow'):
+            shadow.submit(features, log_predictions, version)
+
+def predict_log_prices(rows, active=None):
+    """
+    Score a list of 23-feature dicts and return the log-scale predictions
+    Uses the compiled kernel when we have one, otherwise the sklearn pipeline
+    active: the LoadedModel to use (default: whichever is live right now)
+    """
+    return (active or model_manager.active).predict(rows)
+
+batcher = None
+if MICROBATCH_ENABLED:
+    batcher = MicroBatcher(predict_log_prices, max_wait_ms=MICROBATCH_WINDOW_MS,
+                           max_batch_size=MICROBATCH_MAX_SIZE)
+
+
+def predict_bulk(form):
+    """
+    Score an NDJSON or .npz payload (see wire.py) in one vectorized pass
+    form: 'full' (23 features), 'simple' (the 6 simple fields) or 'auto' (look at the columns)
+    The schema is checked once for the whole payload, not row by row
+    """
+    try:
+        with stage('parse'):
+            if request.mimetype == NDJSON:
+                columns = read_ndjson_columns(request.stream, MAX_BATCH_SIZE)
+            else:
+                columns = read_npz_columns(request.get_data(), MAX_BATCH_SIZE)
+        
+        with stage('prepare'):
+            if form == 'simple' or (form == 'auto' and not any(f in columns for f in FEATURES_REQUIRED)):
+                unknown = [c for c in columns if c not in SIMPLE_FIELDS]
+                if unknown:
+                    raise PayloadError(f'Unknown fields: {unknown}')
+                arrays, n = validate_columns(columns, list(columns), [])
+                # build_simple_features works on whole columns too; the fixed
+                # defaults come back as single values, so stretch them to n rows
+                features = {name: value if np.ndim(value) else np.full(n, value)
+                            for name, value in build_simple_features(arrays).items()}
+            else:
+                features, n = validate_columns(columns, NUMERIC_FEATURES, CATEGORICAL_FEATURES)
+        
+        with stage('predict'):
+            active = model_manager.active
+            log_predictions = active.predict_columns(features)
+            predicted_prices = np.expm1(log_predictions)
+        mirror_to_shadow(features, log_predictions, active.version)
+        record_prediction(features, log_predictions, {'full': 'predict', 'simple': 'simple'}.get(form, 'batch'))
+    except PayloadTooLarge as e:
+        return jsonify({'error': str(e), 'message': 'Batch too large'}), 413
+    except PayloadError as e:
+        return jsonify({'error': str(e), 'message': 'Invalid payload'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e), 'message': 'Error making prediction'}), 500
+    
+    with stage('serialize'):
+        response_format = negotiate(request.accept_mimetypes)
+        if response_format == NDJSON:
+            return Response(ndjson_lines(predicted_prices), mimetype=NDJSON)
+        if response_format == NPZ:
+            return Response(npz_bytes(predicted_prices), mimetype=NPZ)
+        return jsonify({
+            'predictions': [{'index': i, 'predicted_price': round(price, 2)}
+                            for i, price in enumerate(predicted_prices.tolist())],
+            'count': n,
+            'errors': 0,
+            'model': 'elastic_net_regression',
+            'timestamp': datetime.now().isoformat()
+        })
 
 @app.route('/', methods=['GET'])
 def health_check():
@@ -21,11 +350,25 @@ def health_check():
     GET means this is just for viewing, not sending data
     """
     return jsonify({
-        'status': 'healthy',
+        'status': 'healthy' if startup['ready'] else 'starting',
         'service': 'house-price-api',
         'timestamp': datetime.now().isoformat(),
         'model': 'elastic_net_regression'
-    })
+    }), 200 if startup['ready'] else 503
+
+@app.route('/healthz/live', methods=['GET'])
+def liveness():
+    """Kubernetes liveness probe: the process is up and answering (restart us if not)"""
+    return jsonify({'status': 'alive'})
+
+@app.route('/healthz/ready', methods=['GET'])
+def readiness():
+    """
+    Kubernetes readiness probe: only send us traffic once the model is loaded
+    and warmed up, so the first real users don't pay for the cold start
+    """
+    return jsonify({'status': 'ready' if startup['ready'] else 'starting', **startup}), \
+        200 if startup['ready'] else 503
 
 @app.route('/predict', methods=['POST'])
 def predict_house_price():
@@ -34,36 +377,40 @@ def predict_house_price():
     
     POST = sending data to us (house features) → we send back price prediction
     Uses JSON because it's the web standard and works with Streamlit
+    NDJSON and .npz bodies are scored as a bulk payload (see predict_bulk)
     """
+    if request.mimetype in BULK_FORMATS:
+        return predict_bulk('full')
     try:
         # Get the JSON data that someone sent to our API
         # This is like opening an envelope and reading the letter inside
-        data = request.get_json()
+        with stage('parse'):
+            data = request.get_json(silent=True)  # None (-> 400) if the body isn't JSON
         
         # Check if they actually sent us data
         if not data:
             return jsonify({'error': 'No input data provided'}), 400
         
-        # Convert the JSON into a pandas DataFrame 
-        # Why? Because that's what our model expects (same format as training)
-        # The [data] creates a list with one dictionary, which becomes one row
-        input_df = pd.DataFrame([data])
-        
         # Make the prediction using our trained model
         # Remember: your model was trained on log-transformed prices (you used np.log1p)
-        log_prediction = model.predict(input_df)
+        log_prediction = predict_log_price(data)
+        record_prediction([data], [log_prediction], 'predict')
         
         # Convert back from log scale to actual dollars
         # np.expm1 is the inverse of np.log1p that you used in training
-        predicted_price = np.expm1(log_prediction[0])
+        predicted_price = np.expm1(log_prediction)
+        
+        with stage('timestamp'):
+            timestamp = datetime.now().isoformat()
         
         # Send back the prediction as JSON
-        return jsonify({
-            'predicted_price': round(predicted_price, 2),  # Round to 2 decimal places
-            'model': 'elastic_net_regression',
-            'timestamp': datetime.now().isoformat(),
-            'input_features': data  # Echo back what they sent us
-        })
+        with stage('serialize'):
+            return jsonify({
+                'predicted_price': round(predicted_price, 2),  # Round to 2 decimal places
+                'model': 'elastic_net_regression',
+                'timestamp': timestamp,
+                'input_features': data  # Echo back what they sent us
+            })
         
     except Exception as e:
         # If anything goes wrong, send back an error message
@@ -72,6 +419,82 @@ def predict_house_price():
             'message': 'Error making prediction'
         }), 500
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Score many houses in one call instead of one HTTP request per house
+    
+    Input: {"records": [{...}, {...}]} or just a JSON list of records
+    Each record can be the full 23-feature form (like /predict) or the
+    6-field form (like /predict/simple), and they can be mixed
+    
+    All valid rows go through ONE predict call and ONE np.expm1, so the
+    per-row cost is tiny compared to a round trip per house
+    Results come back in the same order as the input, and a bad row only
+    gets its own error instead of failing the whole batch
+    
+    Bulk callers can also send NDJSON or a columnar .npz instead of JSON
+    (see wire.py); those are validated once per payload, not per row
+    """
+    if request.mimetype in BULK_FORMATS:
+        return predict_bulk('auto')
+    try:
+        with stage('parse'):
+            data = request.get_json(silent=True)
+        
+        records = data.get('records') if isinstance(data, dict) else data
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Provide a non-empty list of records'}), 400
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} records)'}), 413
+        
+        # Validate every row first, remembering which ones are good
+        results = [None] * len(records)
+        rows, row_indices = [], []
+        with stage('prepare'):
+            for i, record in enumerate(records):
+                try:
+                    rows.append(prepare_batch_record(record))
+                    row_indices.append(i)
+                except ValueError as e:
+                    results[i] = {'index': i, 'error': str(e)}
+        
+        if rows:
+            try:
+                # One predict and one expm1 for the whole batch
+                version = model_manager.active.version
+                log_predictions = predict_log_prices(rows)
+                predicted_prices = np.expm1(log_predictions)
+                mirror_to_shadow(rows, log_predictions, version)
+                record_prediction(rows, log_predictions, 'batch')
+                for i, price in zip(row_indices, predicted_prices):
+                    results[i] = {'index': i, 'predicted_price': round(float(price), 2)}
+            except Exception:
+                # Something slipped past validation and broke the whole matrix,
+                # so fall back to row-by-row to find out which records are bad
+                for i, row in zip(row_indices, rows):
+                    try:
+                        price = np.expm1(predict_log_prices([row])[0])
+                        results[i] = {'index': i, 'predicted_price': round(float(price), 2)}
+                    except Exception as e:
+                        results[i] = {'index': i, 'error': str(e)}
+        
+        n_errors = sum(1 for r in results if 'error' in r)
+        with stage('serialize'):
+            return jsonify({
+                'predictions': results,
+                'count': len(results),
+                'errors': n_errors,
+                'model': 'elastic_net_regression',
+                'timestamp': datetime.now().isoformat()
+            })
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'Error making batch prediction'
+        }), 500
+
 @app.route('/predict/simple', methods=['POST'])
 def predict_simple():
     """
@@ -80,51 +503,189 @@ def predict_simple():
     
     Input: {"lot_area": 9605, "overall_qual": 7, "year_built": 2000, 
             "gr_liv_area": 1218, "bedrooms": 3, "bathrooms": 2}
+    NDJSON and .npz bodies with these fields are scored as a bulk payload
     """
+    if request.mimetype in BULK_FORMATS:
+        return predict_bulk('simple')
     try:
-        data = request.get_json()
+        with stage('parse'):
+            data = request.get_json(silent=True)
         
         if not data:
             return jsonify({'error': 'No input data provided'}), 400
         
-        # Create a full feature set using the simple inputs + reasonable defaults
-        # This is like filling out a form where most boxes have default values
-        full_features = {
-            "Lot Frontage": 70.0,  # Default median from your data
-            "Lot Area": data.get("lot_area", 10000),  # Use their input or default
-            "Street": "Pave",  # Most houses have paved streets
-            "Neighborhood": "NAmes",  # Most common neighborhood in your data
-            "Bldg Type": "1Fam",  # Single family home (most common)
-            "House Style": "1Story",  # Most common style
-            "Overall Qual": data.get("overall_qual", 5),  # Their input or average
-            "Overall Cond": 5,  # Average condition
-            "Year Built": data.get("year_built", 1980),  # Their input or default
-            "Roof Style": "Gable",  # Most common roof type
-            "Heating": "GasA",  # Gas heating (most common)
-            "Central Air": "Y",  # Assume yes (most houses have it)
-            "Electrical": "SBrkr",  # Standard electrical (most common)
-            "Full Bath": data.get("bathrooms", 1),  # Their input
-            "Half Bath": 0,  # Default to no half bath
-            "Bedroom AbvGr": data.get("bedrooms", 3),  # Their input
-            "TotRms AbvGrd": data.get("bedrooms", 3) + 3,  # Estimate: bedrooms + 3 other rooms
-            "Gr Liv Area": data.get("gr_liv_area", 1500),  # Their input or default
-            "Functional": "Typ",  # Typical functionality
-            "Screen Porch": 0,  # Most houses don't have screen porches
-            "Pool Area": 0,  # Most houses don't have pools
-            "Yr Sold": 2023,  # Current year
-            "Sale Type": "WD"  # Warranty deed (most common sale type)
-        }
+        # Fill in the other 17 features with reasonable defaults
+        with stage('prepare'):
+            full_features = build_simple_features(data)
         
-        # Convert to DataFrame and make prediction (same as above)
-        input_df = pd.DataFrame([full_features])
-        log_prediction = model.predict(input_df)
-        predicted_price = np.expm1(log_prediction[0])
+        # Make prediction (same as above)
+        log_prediction = predict_log_price(full_features)
+        record_prediction([full_features], [log_prediction], 'simple')
+        predicted_price = np.expm1(log_prediction)
         
+        with stage('timestamp'):
+            timestamp = datetime.now().isoformat()
+        
+        with stage('serialize'):
+            return jsonify({
+                'predicted_price': round(predicted_price, 2),
+                'simplified_input': data,  # Show what they sent us
+                'timestamp': timestamp
+            })
+        
+    except Exception as e:
         return jsonify({
-            'predicted_price': round(predicted_price, 2),
-            'simplified_input': data,  # Show what they sent us
+            'error': str(e),
+            'message': 'Error making prediction'
+        }), 500
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    """
+    Why did a house get its price? Exact per-column breakdown of the prediction
+    
+    Input: one record, {"records": [...]} or a JSON list of records - the same
+    full or simple records /predict/batch takes
+    
+    The model is linear on the log scale, so a column's contribution is just
+    its weight times its transformed value (a text column's one-hot weights
+    summed, see LinearKernel.explain_columns). That's exact - no sampling -
+    and the whole batch is one matrix operation, so it costs about as much as
+    the prediction itself. Dollars are split per column as in
+    kernel.dollar_contributions and rounded with kernel.round_to_cents, so
+    base_price + contributions == predicted_price exactly, to the cent.
+    log_contributions are the same numbers on the log scale (rounded to 6 decimals)
+    
+    Returns 501 if the active model has no compiled linear kernel
+    """
+    active = model_manager.active
+    if active.kernel is None:
+        return jsonify({'error': 'The active model is not a linear pipeline, so it cannot be explained exactly'}), 501
+    try:
+        with stage('parse'):
+            data = request.get_json(silent=True)
+        
+        records = data.get('records', [data]) if isinstance(data, dict) else data
+        if not isinstance(records, list) or not records:
+            return jsonify({'error': 'Provide a record or a non-empty list of records'}), 400
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'Batch too large (max {MAX_BATCH_SIZE} records)'}), 413
+        
+        results = [None] * len(records)
+        rows, row_indices = [], []
+        with stage('prepare'):
+            for i, record in enumerate(records):
+                try:
+                    rows.append(prepare_batch_record(record))
+                    row_indices.append(i)
+                except ValueError as e:
+                    results[i] = {'index': i, 'error': str(e)}
+        
+        kernel = active.kernel
+        base_price = round(float(np.expm1(kernel.base)), 2)
+        if rows:
+            with stage('explain'):
+                columns = {f: [row[f] for row in rows] for f in kernel.features}
+                base, log_contributions = kernel.explain_columns(columns)
+                dollars = dollar_contributions(base, log_contributions)
+                log_predictions = base + log_contributions.sum(axis=1)
+                predicted_prices = np.round(np.expm1(log_predictions), 2)
+            record_prediction(rows, log_predictions, 'explain')
+            with stage('serialize'):
+                dollars = round_to_cents(dollars, predicted_prices - base_price).tolist()
+                logs = np.round(log_contributions, 6).tolist()
+                for i, price, dollar_row, log_row in zip(row_indices, predicted_prices.tolist(), dollars, logs):
+                    results[i] = {
+                        'index': i,
+                        'predicted_price': price,
+                        'contributions': dict(zip(kernel.features, dollar_row)),
+                        'log_contributions': dict(zip(kernel.features, log_row)),
+                    }
+        
+        with stage('serialize'):
+            return jsonify({
+                'explanations': results,
+                'base_price': base_price,
+                'count': len(results),
+                'errors': sum(1 for r in results if 'error' in r),
+                'model_version': active.version,
+                'timestamp': datetime.now().isoformat()
+            })
+    
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'message': 'Error explaining prediction'
+        }), 500
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    """Every model the registry found, and which ones are loaded right now"""
+    return jsonify({
+        'models': [registry.info(name) for name in registry.names()],
+        'registry': registry.stats()
+    })
+
+@app.route('/models/<name>/info', methods=['GET'])
+def registry_model_info(name):
+    """
+    Details for one model (loads it so we can report its features and classes)
+    house_price is described by the ModelManager, which owns the copy /predict serves
+    """
+    if name == PRIMARY_MODEL:
+        return jsonify({'name': name, **model_manager.active.describe()})
+    try:
+        registry.get(name)
+        return jsonify(registry.info(name))
+    except ModelNotFound:
+        return jsonify({'error': f'Unknown model: {name}', 'available': registry.names()}), 404
+
+@app.route('/models/<name>/predict', methods=['POST'])
+def registry_predict(name):
+    """
+    Predict with any registered model
+    
+    Input: one record {...}, a list of records, or {"records": [...]}
+    Classifiers also return class probabilities from predict_proba
+    house_price is the model /predict serves (after any reload), not the registry's copy
+    """
+    try:
+        model_for_name = model_manager.active.model if name == PRIMARY_MODEL else registry.get(name)
+    except ModelNotFound:
+        return jsonify({'error': f'Unknown model: {name}', 'available': registry.names()}), 404
+    
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({'error': 'No input data provided'}), 400
+        
+        records = data.get('records', data) if isinstance(data, dict) else data
+        if isinstance(records, dict):
+            records = [records]
+        input_df = pd.DataFrame(records)
+        
+        predictions = model_for_name.predict(input_df)
+        if name == PRIMARY_MODEL:
+            # Same traffic as /predict, so the drift monitor and prediction log see it too
+            record_prediction(records, predictions, 'registry')
+        result = {
+            'model': name,
+            'count': len(records),
             'timestamp': datetime.now().isoformat()
-        })
+        }
+        
+        if hasattr(model_for_name, 'predict_proba') and hasattr(model_for_name, 'classes_'):
+            classes = [str(c) for c in model_for_name.classes_]
+            probabilities = model_for_name.predict_proba(input_df)
+            result['classes'] = classes
+            result['predictions'] = [str(p) for p in predictions]
+            result['probabilities'] = [dict(zip(classes, np.round(row, 6).tolist())) for row in probabilities]
+        else:
+            result['predictions'] = predictions.tolist()
+            if name in TARGET_TRANSFORMS:
+                result['predictions_original_scale'] = np.round(TARGET_TRANSFORMS[name](predictions), 2).tolist()
+        
+        return jsonify(result)
         
     except Exception as e:
         return jsonify({
@@ -132,21 +693,317 @@ def predict_simple():
             'message': 'Error making prediction'
         }), 500
 
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    """Micro-batching numbers: how big batches are and how long rows wait in line"""
+    if batcher is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **batcher.stats()})
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Prediction cache hit/miss/eviction counters"""
+    if prediction_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_cache.stats()})
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    """
+    In-flight requests, queue depth per priority, admitted and rejected counts of this worker
+    'pod' has in-flight and queued requests summed over every worker of the pod
+    """
+    if admission is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **admission.stats(), 'pod': pod_admission.totals()})
+
+@app.route('/logging/stats', methods=['GET'])
+def logging_stats():
+    """Prediction log counters (written, dropped, buffered, files)"""
+    if prediction_logger is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **prediction_logger.stats()})
+
+def _admin_allowed():
+    """Admin routes need ADMIN_TOKEN to be set AND a matching X-Admin-Token header"""
+    if not ADMIN_TOKEN:
+        return False
+    # compare_digest takes the same time wherever the strings differ, so the
+    # token can't be guessed one character at a time from response times
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), ADMIN_TOKEN.encode())
+
+def _admin_denied():
+    if not ADMIN_TOKEN:
+        return jsonify({'error': 'Admin routes are disabled (ADMIN_TOKEN is not set)'}), 403
+    return jsonify({'error': 'Invalid admin token'}), 403
+
+def _model_path_allowed(path):
+    """
+    Only files under MODELS_DIR/<name>/saved_model or MODELS_DIR/<name>/versions
+    can be loaded through the API: loading a pickle runs code, so a caller must
+    never be able to point us at some other file
+    """
+    relative = os.path.relpath(os.path.realpath(path), os.path.realpath(MODELS_DIR))
+    parts = relative.split(os.sep)
+    return len(parts) >= 3 and parts[0] != os.pardir and parts[1] in ('saved_model', 'versions')
+
+@app.before_request
+def start_model_watcher():
+    # Cheap no-op after the first request in each worker process
+    # Not during the warmup: with preload_app that runs in the gunicorn master, and a
+    # watcher there would reload in the master and could fork workers while it holds
+    # the reload lock (leaving them with a lock nobody will ever release)
+    if startup['ready']:
+        model_manager.ensure_watcher(MODEL_WATCH_INTERVAL)
+
+# Per-endpoint and per-stage latency histograms, request/error counters (see metrics.py)
+# and a sampling profiler that can be switched on at runtime (see profiler.py)
+metrics = Metrics()
+profiler = SamplingProfiler()
+
+@app.before_request
+def start_request_timer():
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    g.request_timer = RequestTimer(metrics, endpoint).start()
+
+@app.before_request
+def admit_request():
+    """Take a slot for prediction routes, or turn the request away if we're overloaded"""
+    priority = ADMISSION_PRIORITIES.get(request.endpoint)
+    if admission is None or priority is None or not startup['ready']:
+        return None
+    # NDJSON/.npz bodies are bulk traffic whichever route they come in on
+    if request.mimetype in BULK_FORMATS:
+        priority = BATCH
+    elif callable(priority):
+        priority = priority()
+    try:
+        admission.acquire(priority)
+    except Rejected as e:
+        response = jsonify({'error': 'Server is busy, please retry', 'reason': e.reason})
+        response.status_code = e.status
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response
+    g.admitted = True
+    return None
+
+@app.teardown_request
+def release_admission(exc):
+    if g.pop('admitted', False):
+        admission.release()
+
+@app.after_request
+def record_request_metrics(response):
+    timer = g.pop('request_timer', None)
+    if timer is not None:
+        timer.finish(response.status_code)
+    return response
+
+def _service_gauges():
+    """Extra numbers sampled when Prometheus scrapes /metrics"""
+    active = model_manager.active
+    samples = [
+        ('house_price_model_info', 'Active model (value is always 1)',
+         {'hash': active.version, 'revision': active.revision,
+          'engine': active.describe()['inference_engine']}, 1),
+        ('house_price_model_revision', 'Revision of the active model, +1 per reload', {}, active.revision),
+        ('house_price_ready', '1 once the model is loaded and warmed up', {}, int(startup['ready'])),
+    ]
+    if prediction_cache is not None:
+        cache = prediction_cache.stats()
+        samples.append(('prediction_cache_entries', 'Predictions in the cache right now', {}, cache['entries']))
+        for field in ('hits', 'misses', 'evictions', 'expirations'):
+            samples.append((f'prediction_cache_{field}_total', f'Prediction cache {field}', {}, cache[field]))
+    if batcher is not None:
+        batching = batcher.stats()
+        samples.append(('microbatch_batches_total', 'Micro-batches scored', {}, batching['batches']))
+        samples.append(('microbatch_rows_total', 'Rows scored through the micro-batcher', {}, batching['rows']))
+        samples.append(('microbatch_queue_depth', 'Rows waiting for a micro-batch', {}, batching['queue_depth']))
+    if shadow is not None:
+        comparison = shadow.stats()
+        samples.append(('shadow_compared_total', 'Predictions scored by the shadow model', {},
+                        comparison['compared']))
+        samples.append(('shadow_dropped_total', 'Mirrored predictions dropped because the shadow queue was full',
+                        {}, comparison['dropped']))
+        samples.append(('shadow_queue_depth', 'Predictions waiting for the shadow model', {},
+                        comparison['queue_depth']))
+        if comparison['compared']:
+            samples.append(('shadow_share_over_threshold', 'Share of shadow predictions that differ by more '
+                            'than the threshold', {'threshold_pct': comparison['threshold_pct']},
+                            comparison['share_over_threshold']))
+    if admission is not None:
+        admitted = admission.stats()
+        # Whole pod (every worker), see PodGauges
+        pod = pod_admission.totals()
+        samples.append(('admission_in_flight', 'Prediction requests running right now in the pod', {},
+                        pod['in_flight']))
+        for priority in ('interactive', 'batch'):
+            samples.append(('admission_queue_depth', 'Prediction requests in the pod waiting for a slot',
+                            {'priority': priority}, pod[f'queued_{priority}']))
+        for name, count in admitted['rejected'].items():
+            priority, reason = name.split('_', 1)
+            samples.append(('admission_rejected_total', 'Requests turned away by admission control',
+                            {'priority': priority, 'reason': reason}, count))
+    if prediction_logger is not None:
+        logged = prediction_logger.stats()
+        samples.append(('prediction_log_written_total', 'Predictions written to the prediction log', {}, logged['written']))
+        samples.append(('prediction_log_dropped_total', 'Predictions dropped from the log because its buffer was full',
+                        {}, logged['dropped']))
+        samples.append(('prediction_log_buffered', 'Predictions waiting to be written', {}, logged['buffered']))
+    if drift_monitor is not None:
+        for name, feature in drift_monitor.report()['features'].items():
+            if feature['psi'] is not None:
+                samples.append(('feature_drift_psi', 'PSI of live inputs vs the training data',
+                                {'feature': name}, round(feature['psi'], 6)))
+    return samples
+
+metrics.add_gauges(_service_gauges)
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Everything above in the Prometheus text format, for scraping"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/profile/start', methods=['POST'])
+def start_profiler():
+    """
+    Start sampling stacks of every thread in this process
+    Input (optional): {"interval_ms": 5, "seconds": 30}
+    Admin only (X-Admin-Token), like the other /debug/profile routes
+    """
+    if not _admin_allowed():
+        return _admin_denied()
+    data = request.get_json(silent=True) or {}
+    try:
+        profiler.start(float(data.get('interval_ms', 5)), float(data.get('seconds', 30)))
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(profiler.status()), 202
+
+@app.route('/debug/profile/stop', methods=['POST'])
+def stop_profiler():
+    if not _admin_allowed():
+        return _admin_denied()
+    profiler.stop()
+    return jsonify(profiler.status())
+
+@app.route('/debug/profile', methods=['GET'])
+def profile_results():
+    """Collected stacks in folded format (feed to flamegraph.pl or speedscope), ?top=N to trim"""
+    if not _admin_allowed():
+        return _admin_denied()
+    if request.args.get('format') == 'json':
+        return jsonify(profiler.status())
+    top = request.args.get('top', type=int)
+    return Response(profiler.folded(top), mimetype='text/plain')
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Load a new model in the background, check it on the canary set, then swap it in
+    
+    Input (optional): {"path": "models/house_price/saved_model/new.pkl", "wait": true}
+    Without a path we reload the current model file (e.g. after replacing it on disk)
+    Requests keep being served by the old model until the swap
+    """
+    if not _admin_allowed():
+        return _admin_denied()
+    data = request.get_json(silent=True) or {}
+    if data.get('path') and not _model_path_allowed(data['path']):
+        return jsonify({'error': f'Model path must be under {MODELS_DIR}/<name>/saved_model or {MODELS_DIR}/<name>/versions'}), 400
+    try:
+        if data.get('wait'):
+            status = model_manager.reload(data.get('path'))
+            return jsonify(status), 200 if status['state'] == 'succeeded' else 422
+        model_manager.reload_async(data.get('path'))
+        return jsonify({'state': 'loading', 'message': 'Reload started, check /model/info'}), 202
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+@app.route('/admin/rollback', methods=['POST'])
+def admin_rollback():
+    """Go back to the model that was active before the last reload"""
+    if not _admin_allowed():
+        return _admin_denied()
+    try:
+        active = model_manager.rollback()
+        return jsonify({'message': 'Rolled back', 'active': active.describe()})
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+@app.route('/monitor/drift', methods=['GET', 'DELETE'])
+def monitor_drift():
+    """
+    How far live inputs are from the training data, per feature (PSI, worst first)
+    ?source=predict|simple|batch looks at one kind of request only
+    /predict/simple fills 17 features with fixed defaults, so expect those to
+    show up as shifted when most traffic comes through it
+    DELETE (admin) starts counting from scratch, e.g. after a new model goes live
+    """
+    if drift_monitor is None:
+        return jsonify({'enabled': False})
+    if request.method == 'DELETE':
+        if not _admin_allowed():
+            return _admin_denied()
+        drift_monitor.reset()
+    return jsonify({'enabled': True, **drift_monitor.report(request.args.get('source'))})
+
+@app.route('/shadow/stats', methods=['GET'])
+def shadow_stats():
+    """How the shadow (candidate) model compares with the live model so far"""
+    if shadow is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **shadow.stats()})
+
+@app.route('/admin/shadow', methods=['POST', 'DELETE'])
+def admin_shadow():
+    """
+    Start shadow scoring with a candidate model, or stop it (DELETE)
+    
+    Input: {"path": "models/house_price/versions/<version>/model.pkl", "threshold_pct": 5}
+    Admin only, and like /admin/reload only model files under MODELS_DIR are accepted
+    Starting again replaces the current candidate and its comparison numbers
+    Like /admin/reload this only affects the worker that gets the call; with several
+    gunicorn workers set SHADOW_MODEL_PATH instead
+    """
+    global shadow
+    if not _admin_allowed():
+        return _admin_denied()
+    if request.method == 'DELETE':
+        if shadow is not None:
+            shadow.stop()
+            shadow = None
+        return jsonify({'enabled': False})
+    
+    data = request.get_json(silent=True) or {}
+    if not data.get('path'):
+        return jsonify({'error': 'Provide the candidate model path'}), 400
+    if not _model_path_allowed(data['path']):
+        return jsonify({'error': f'Model path must be under {MODELS_DIR}/<name>/saved_model or {MODELS_DIR}/<name>/versions'}), 400
+    try:
+        candidate = start_shadow(data['path'], float(data.get('threshold_pct', SHADOW_THRESHOLD_PCT)))
+    except Exception as e:
+        return jsonify({'error': str(e), 'message': 'Could not load the candidate model'}), 422
+    previous, shadow = shadow, candidate
+    if previous is not None:
+        previous.stop()
+    return jsonify({'enabled': True, **shadow.stats()})
+
 @app.route('/model/info', methods=['GET'])
 def model_info():
     """Get information about the loaded model"""
     try:
+        active = model_manager.active
         return jsonify({
             'model_type': 'ElasticNet Regression',
-            'model_path': model_path,
-            'features_required': [
-                "Lot Frontage", "Lot Area", "Street", "Neighborhood", 
-                "Bldg Type", "House Style", "Overall Qual", "Overall Cond",
-                "Year Built", "Roof Style", "Heating", "Central Air", 
-                "Electrical", "Full Bath", "Half Bath", "Bedroom AbvGr",
-                "TotRms AbvGrd", "Gr Liv Area", "Functional", 
-                "Screen Porch", "Pool Area", "Yr Sold", "Sale Type"
-            ],
+            'model_path': active.path,
+            'model_version': active.version,  # content hash, same as previous_version, the cache and the logs
+            'model_revision': active.revision,  # 1 for the model loaded at startup, +1 per successful reload
+            'loaded_at': active.loaded_at,
+            'inference_engine': active.describe()['inference_engine'],
+            'previous_version': model_manager.previous.version if model_manager.previous else None,
+            'reload_status': model_manager.status,
+            'features_required': FEATURES_REQUIRED,
             'target': 'SalePrice (USD)',
             'performance': 'RMSE: 0.1506 (cross-validated)',
             'last_updated': datetime.now().isoformat()
@@ -154,9 +1011,50 @@ def model_info():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def warm_up(rounds):
+    """
+    Push a few predictions through /predict, /predict/simple and /predict/batch
+    before taking traffic. The first call through each path is slow (lazy imports,
+    first numpy/jsonify calls, allocations), and we'd rather pay that here than
+    on a real user's request. Under gunicorn this runs once in the parent
+    before forking, so every worker starts warm.
+    """
+    client = app.test_client()
+    started = time.perf_counter()
+    for i in range(rounds):
+        # Slightly different houses each round so we run the model, not just the cache
+        simple_house = {"lot_area": 8500 + i, "overall_qual": 7, "year_built": 2000,
+                        "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2}
+        full_house = build_simple_features({**simple_house, "lot_area": 9500 + i})
+        first_call = time.perf_counter()
+        responses = [client.post('/predict', json=full_house)]
+        if i == 0:
+            startup['first_prediction_ms'] = round((time.perf_counter() - first_call) * 1000, 2)
+        responses.append(client.post('/predict/simple', json=simple_house))
+        responses.append(client.post('/predict/batch', json={'records': [full_house, simple_house]}))
+        failed = [r.status_code for r in responses if r.status_code != 200]
+        if failed:
+            raise RuntimeError(f'Warmup prediction failed with status {failed}')
+    startup['warmup_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+def start_up(rounds):
+    """Warm up, and only mark the service ready if that worked"""
+    try:
+        warm_up(rounds)
+        metrics.reset()  # warmup calls aren't real traffic
+        startup['ready'] = True
+    except Exception as e:
+        # Stay alive but not ready, so Kubernetes keeps traffic away and the logs say why
+        startup['error'] = str(e)
+        app.logger.error(f'Warmup failed, not marking the service ready: {e}')
+
+start_up(WARMUP_ROUNDS)
+startup['startup_ms'] = round((time.perf_counter() - _import_started) * 1000, 1)
+
 if __name__ == '__main__':
-    # This runs the Flask web server
+    # This runs Flask's DEVELOPMENT web server - handy locally, not for production
+    # In the container we use gunicorn instead (see gunicorn.conf.py)
     # debug=True means it will restart automatically when you change the code
     # host='0.0.0.0' means it accepts connections from anywhere (not just localhost)
-    # port=5001 means it runs on http://localhost:5001
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    # port=5001 means it runs on http://localhost:5001 (override with PORT)
+    app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5001)))
\ No newline at end of file
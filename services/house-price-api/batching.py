@@ -0,0 +1,167 @@
+"""
+Dynamic micro-batching for single-row prediction requests
+
+Under load lots of /predict and /predict/simple calls land within the same
+millisecond, and each one pays for its own model call. The MicroBatcher
+parks each row in a queue for a short window (e.g. 2 ms or until 64 rows
+are waiting), scores everything that arrived as ONE matrix, and then hands
+each waiting request its own answer.
+
+Think of it like an elevator: it waits a moment for more people instead of
+making a separate trip for each person.
+"""
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class _Pending:
+    """One request waiting in line for its prediction"""
+    __slots__ = ('row', 'model', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, row, model=None):
+        self.row = row
+        self.model = model
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Collects single rows from many request threads and scores them together
+    predict_fn takes a list of rows and returns one prediction per row
+    If a row is submitted with a model, it's scored as predict_fn(rows, model),
+    so a reload in the middle of a window can't change which model answers it
+    """
+
+    # Upper edges of the batch size histogram buckets reported in stats()
+    SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+    def __init__(self, predict_fn, max_wait_ms=2.0, max_batch_size=64):
+        self.predict_fn = predict_fn
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._batches = 0
+        self._rows = 0
+        self._largest_batch = 0
+        self._size_counts = [0] * (len(self.SIZE_BUCKETS) + 1)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._recent_waits = deque(maxlen=2048)  # for percentiles without unbounded memory
+
+    def _ensure_worker(self):
+        # Threads don't survive fork(), so a worker process forked from a
+        # parent that already started the batcher needs its own thread
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+                self._worker.start()
+
+    def submit(self, row, model=None, timeout=None):
+        """Queue one row, wait for its batch to be scored, and return its prediction"""
+        self._ensure_worker()
+        pending = _Pending(row, model)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError('Timed out waiting for micro-batch prediction')
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self):
+        """Block for the first row, then keep collecting until the window closes or the batch is full"""
+        first = self._queue.get()
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            # Rows submitted with different models (one before a reload, one
+            # after) are scored separately, each by the model it came with
+            groups = {}
+            for pending in batch:
+                groups.setdefault(id(pending.model), []).append(pending)
+            for group in groups.values():
+                self._score(group)
+            self._record(batch, started)
+            for pending in batch:
+                pending.done.set()
+
+    def _predict(self, rows, model):
+        return self.predict_fn(rows) if model is None else self.predict_fn(rows, model)
+
+    def _score(self, group):
+        model = group[0].model
+        try:
+            predictions = self._predict([p.row for p in group], model)
+            for pending, prediction in zip(group, predictions):
+                pending.result = prediction
+        except Exception:
+            # One bad row shouldn't fail everybody else in the batch,
+            # so score them one at a time to pin the error on the right caller
+            for pending in group:
+                try:
+                    pending.result = self._predict([pending.row], model)[0]
+                except Exception as e:
+                    pending.error = e
+
+    def _record(self, batch, started):
+        size = len(batch)
+        waits = [started - p.enqueued_at for p in batch]
+        with self._lock:
+            self._batches += 1
+            self._rows += size
+            self._largest_batch = max(self._largest_batch, size)
+            bucket = next((i for i, edge in enumerate(self.SIZE_BUCKETS) if size <= edge), len(self.SIZE_BUCKETS))
+            self._size_counts[bucket] += 1
+            self._wait_total += sum(waits)
+            self._wait_max = max(self._wait_max, max(waits))
+            self._recent_waits.extend(waits)
+
+    def stats(self):
+        """Batch size and queue wait numbers, handy for tuning the window"""
+        with self._lock:
+            recent = np.array(self._recent_waits) * 1000 if self._recent_waits else np.zeros(1)
+            labels = [f'<={edge}' for edge in self.SIZE_BUCKETS] + [f'>{self.SIZE_BUCKETS[-1]}']
+            return {
+                'max_wait_ms': self.max_wait * 1000,
+                'max_batch_size': self.max_batch_size,
+                'batches': self._batches,
+                'rows': self._rows,
+                'mean_batch_size': self._rows / self._batches if self._batches else 0.0,
+                'largest_batch': self._largest_batch,
+                'batch_size_histogram': dict(zip(labels, self._size_counts)),
+                'queue_wait_ms': {
+                    'mean': self._wait_total / self._rows * 1000 if self._rows else 0.0,
+                    'max': self._wait_max * 1000,
+                    'p50': float(np.percentile(recent, 50)),
+                    'p99': float(np.percentile(recent, 99)),
+                },
+                'queue_depth': self._queue.qsize(),
+            }
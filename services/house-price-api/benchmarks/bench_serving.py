@@ -0,0 +1,178 @@
+"""
+Serving benchmark: Flask dev server (python app.py) vs gunicorn (gunicorn.conf.py)
+
+Starts each server as a subprocess from the project root, hammers
+/predict/simple with N client threads for a fixed time, and reports
+requests per second plus p50/p99 latency.
+
+Run from the project root:
+    python services/house-price-api/benchmarks/bench_serving.py --concurrency 16 --duration 10
+
+Measured (one pod's worth of CPU, a 500m quota, 1 gunicorn worker with
+36 threads, cache off, concurrency 16, load generator on the same CPU):
+
+    server          req/s     p99 ms
+    dev               145         96
+    gunicorn          156         96      -> about 1.07x
+
+So on half a CPU gunicorn is only a little faster than the dev server and
+the tail latency is the same: both are waiting for the one CPU. What
+gunicorn buys us there is a production server (no reloader, proper
+timeouts and keep-alive), not speed. More throughput comes from more CPU,
+i.e. more workers on a bigger quota, or more pods (hpa.yaml).
+The settings of every run are printed with the results.
+"""
+import argparse
+import json
+import os
+import runpy
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.abspath(os.path.join(SERVICE_DIR, '..', '..'))
+
+
+def server_command(mode):
+    if mode == 'dev':
+        return [sys.executable, os.path.join(SERVICE_DIR, 'app.py')]
+    return [sys.executable, '-m', 'gunicorn',
+            '--config', os.path.join(SERVICE_DIR, 'gunicorn.conf.py'),
+            '--pythonpath', SERVICE_DIR, 'app:app']
+
+
+def start_server(mode, port, env_overrides):
+    env = {**os.environ, 'PORT': str(port), **env_overrides}
+    # New session so we can stop the whole process group (the dev reloader spawns a child)
+    process = subprocess.Popen(server_command(mode), cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        try:
+            if requests.get(url + '/', timeout=2).status_code == 200:
+                return process, url
+        except requests.exceptions.RequestException:
+            pass  # not listening yet
+        time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f'{mode} server did not come up on port {port}')
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=10)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def gunicorn_settings(workers=None):
+    """CPU quota, workers and threads gunicorn.conf.py comes up with here"""
+    conf = runpy.run_path(os.path.join(SERVICE_DIR, 'gunicorn.conf.py'))
+    return {'cpu_quota': conf['cpu_quota'](), 'workers': int(workers) if workers else conf['workers'],
+            'threads': conf['threads']}
+
+
+def load_payloads():
+    """Real houses from the training data so requests aren't all identical"""
+    train = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'train_new.csv'))
+    return [{
+        "lot_area": int(row["Lot Area"]), "overall_qual": int(row["Overall Qual"]),
+        "year_built": int(row["Year Built"]), "gr_liv_area": int(row["Gr Liv Area"]),
+        "bedrooms": int(row["Bedroom AbvGr"]), "bathrooms": int(row["Full Bath"]),
+    } for _, row in train.iterrows()]
+
+
+def run_load(url, payloads, concurrency, duration):
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(offset):
+        session = requests.Session()
+        mine, failed, i = [], 0, offset
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                ok = session.post(url + '/predict/simple', json=payloads[i % len(payloads)], timeout=10).ok
+            except requests.exceptions.RequestException:
+                ok = False
+            mine.append(time.perf_counter() - started)
+            failed += not ok
+            i += concurrency
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p99_ms': float(np.percentile(ms, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', nargs='+', default=['dev', 'gunicorn'], choices=['dev', 'gunicorn'])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load per server')
+    parser.add_argument('--port', type=int, default=5101)
+    parser.add_argument('--workers', help='WEB_CONCURRENCY for gunicorn (default: from CPU quota)')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='leave the prediction cache on (off by default so we measure the server)')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    env = {} if args.with_cache else {'PREDICTION_CACHE_SIZE': '0'}
+    if args.workers:
+        env['WEB_CONCURRENCY'] = args.workers
+    payloads = load_payloads()
+
+    results = {}
+    for mode in args.modes:
+        process, url = start_server(mode, args.port, env)
+        try:
+            run_load(url, payloads, args.concurrency, min(2.0, args.duration))  # warm up
+            results[mode] = run_load(url, payloads, args.concurrency, args.duration)
+        finally:
+            stop_server(process)
+
+    settings = gunicorn_settings(args.workers)
+    print(f"CPU quota {settings['cpu_quota']:g}, gunicorn {settings['workers']} worker(s) x "
+          f"{settings['threads']} threads, concurrency {args.concurrency}, "
+          f"cache {'on' if args.with_cache else 'off'}\n")
+    print(f"{'server':<10} {'req/s':>10} {'p50 ms':>10} {'p99 ms':>10} {'errors':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['requests_per_second']:>10.1f} {r['p50_ms']:>10.2f} "
+              f"{r['p99_ms']:>10.2f} {r['errors']:>8}")
+    if 'dev' in results and 'gunicorn' in results:
+        speedup = results['gunicorn']['requests_per_second'] / results['dev']['requests_per_second']
+        print(f"\ngunicorn vs dev server: {speedup:.2f}x throughput")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'concurrency': args.concurrency, 'duration': args.duration, 'settings': settings,
+                       'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Startup benchmark: how long a fresh pod takes before it can serve a fast prediction
+
+Every measurement runs in a brand new Python process (that's what a new pod is):
+  - import time of each heavy library on its own (numpy, pandas, sklearn, joblib, flask)
+  - app.py import, model load and warmup, as recorded in app.startup
+  - first and second /predict latency WITHOUT warmup (the spike users would see)
+  - first /predict latency WITH warmup (what they see now)
+
+Run from the project root:
+    python services/house-price-api/benchmarks/bench_startup.py --runs 5 --budget-ms 5000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.abspath(os.path.join(SERVICE_DIR, '..', '..'))
+
+LIBRARIES = ['numpy', 'pandas', 'sklearn.compose', 'joblib', 'flask']
+
+IMPORT_ONE = """
+import time, json
+started = time.perf_counter()
+import {module}
+print(json.dumps({{'ms': (time.perf_counter() - started) * 1000}}))
+"""
+
+START_APP = """
+import json, time
+import app
+client = app.app.test_client()
+house = app.build_simple_features({'lot_area': 12345, 'overall_qual': 6})
+timings = []
+for _ in range(2):
+    started = time.perf_counter()
+    assert client.post('/predict', json=house).status_code == 200
+    timings.append((time.perf_counter() - started) * 1000)
+    house = {**house, 'Lot Area': house['Lot Area'] + 1}  # skip the cache on the 2nd call
+print(json.dumps({**app.startup, 'first_request_ms': timings[0], 'second_request_ms': timings[1]}))
+"""
+
+
+def run_fresh(code, env_overrides=None):
+    env = {**os.environ, 'PYTHONPATH': SERVICE_DIR, **(env_overrides or {})}
+    output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def median_of(runs, key):
+    return round(statistics.median(r[key] for r in runs), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3, help='fresh processes per measurement (median reported)')
+    parser.add_argument('--budget-ms', type=float,
+                        help='fail (exit 1) if the median time until ready is above this')
+    parser.add_argument('--json', help='also write results to this file')
+    args = parser.parse_args()
+
+    results = {'imports_ms': {}}
+    for module in LIBRARIES:
+        runs = [run_fresh(IMPORT_ONE.format(module=module)) for _ in range(args.runs)]
+        results['imports_ms'][module] = median_of(runs, 'ms')
+
+    cold = [run_fresh(START_APP, {'WARMUP_ROUNDS': '0'}) for _ in range(args.runs)]
+    warm = [run_fresh(START_APP) for _ in range(args.runs)]
+    results['app_import_ms'] = median_of(warm, 'import_ms')
+    results['model_load_ms'] = median_of(warm, 'model_load_ms')
+    results['warmup_ms'] = median_of(warm, 'warmup_ms')
+    results['time_to_ready_ms'] = median_of(warm, 'startup_ms')
+    results['without_warmup'] = {'first_request_ms': median_of(cold, 'first_request_ms'),
+                                 'second_request_ms': median_of(cold, 'second_request_ms')}
+    results['with_warmup'] = {'first_request_ms': median_of(warm, 'first_request_ms'),
+                              'second_request_ms': median_of(warm, 'second_request_ms')}
+
+    print('Library imports (each in a fresh process):')
+    for module, ms in results['imports_ms'].items():
+        print(f'  {module:<16} {ms:>8.1f} ms')
+    print(f"app.py imports     {results['app_import_ms']:>8.1f} ms")
+    print(f"model load         {results['model_load_ms']:>8.1f} ms")
+    print(f"warmup             {results['warmup_ms']:>8.1f} ms")
+    print(f"time to ready      {results['time_to_ready_ms']:>8.1f} ms")
+    print(f"first /predict     {results['without_warmup']['first_request_ms']:>8.2f} ms without warmup, "
+          f"{results['with_warmup']['first_request_ms']:.2f} ms with warmup")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.budget_ms is not None and results['time_to_ready_ms'] > args.budget_ms:
+        print(f"\nFAIL: time to ready {results['time_to_ready_ms']} ms is over the {args.budget_ms} ms budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Concurrent load test for the house price API
+
+Drives the app with a mix of /predict, /predict/simple and /predict/batch calls
+from several client threads for a fixed time, then reports throughput and
+p50/p95/p99 latency per endpoint.
+
+Two ways to run it:
+  - in-process (default): calls the Flask app through its test client, no server needed
+  - --url http://localhost:5001: against a running server (dev, gunicorn, a pod...)
+
+Results can be written as JSON and compared with a stored baseline; any endpoint
+whose throughput drops or whose p99 grows by more than --tolerance makes the
+run exit with status 1, so a CI job fails loudly on a regression.
+
+Run from the project root:
+    python services/house-price-api/benchmarks/loadtest.py --concurrency 8 --duration 10 \\
+        --mix predict=1,simple=3,batch=1 --output results.json --baseline baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.abspath(os.path.join(SERVICE_DIR, '..', '..'))
+sys.path.insert(0, SERVICE_DIR)
+
+# The API's own list of the 23 model columns, so the two can't drift apart
+from features import FEATURES_REQUIRED  # noqa: E402
+
+ENDPOINTS = {'predict': '/predict', 'simple': '/predict/simple', 'batch': '/predict/batch'}
+
+
+def parse_mix(text):
+    """'predict=1,simple=3,batch=1' -> {'predict': 1.0, 'simple': 3.0, 'batch': 1.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f'Unknown endpoint {name!r}, use {list(ENDPOINTS)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_payloads(batch_size):
+    """Real houses from the training data, in the shape each endpoint expects"""
+    train = pd.read_csv(os.path.join(PROJECT_ROOT, 'data', 'train_new.csv')).dropna()
+    full = train[FEATURES_REQUIRED].to_dict(orient='records')
+    simple = [{
+        "lot_area": r["Lot Area"], "overall_qual": r["Overall Qual"], "year_built": r["Year Built"],
+        "gr_liv_area": r["Gr Liv Area"], "bedrooms": r["Bedroom AbvGr"], "bathrooms": r["Full Bath"],
+    } for r in full]
+    batches = [{'records': full[i:i + batch_size]} for i in range(0, len(full) - batch_size + 1, batch_size)]
+    return {'predict': full, 'simple': simple, 'batch': batches}
+
+
+class InProcessClient:
+    """Calls the Flask app directly - measures the app itself, with no network in the way"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def post(self, path, payload):
+        return self.client.post(path, json=payload).status_code
+
+
+class HttpClient:
+    """Calls a running server over HTTP with a keep-alive session"""
+
+    def __init__(self, url):
+        import requests
+        self.url = url.rstrip('/')
+        self.session = requests.Session()
+
+    def post(self, path, payload):
+        try:
+            return self.session.post(self.url + path, json=payload, timeout=30).status_code
+        except Exception:
+            return 0
+
+
+def run(make_client, payloads, mix, concurrency, duration, seed=0):
+    """Hammer the app for `duration` seconds and return per-endpoint results"""
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        client = make_client()
+        mine = {name: [] for name in names}
+        failed = {name: 0 for name in names}
+        while time.perf_counter() < stop_at:
+            name = rng.choices(names, weights)[0]
+            payload = rng.choice(payloads[name])
+            started = time.perf_counter()
+            status = client.post(ENDPOINTS[name], payload)
+            mine[name].append(time.perf_counter() - started)
+            failed[name] += status != 200
+        with lock:
+            for name in names:
+                latencies[name].extend(mine[name])
+                errors[name] += failed[name]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for name in names:
+        ms = np.array(latencies[name]) * 1000
+        if len(ms) == 0:
+            continue
+        results[name] = {
+            'requests': int(len(ms)),
+            'errors': errors[name],
+            'throughput_rps': len(ms) / elapsed,
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p95_ms': float(np.percentile(ms, 95)),
+            'p99_ms': float(np.percentile(ms, 99)),
+        }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    List of human-readable regressions: lower throughput or higher p99 than the
+    baseline by more than `tolerance` (0.2 = 20%), or any new errors
+    """
+    problems = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            problems.append(f"{name}: throughput {current['throughput_rps']:.1f} req/s "
+                            f"vs baseline {base['throughput_rps']:.1f} req/s")
+        if current['p99_ms'] > base['p99_ms'] * (1 + tolerance):
+            problems.append(f"{name}: p99 {current['p99_ms']:.2f} ms vs baseline {base['p99_ms']:.2f} ms")
+        if current['errors'] > base.get('errors', 0):
+            problems.append(f"{name}: {current['errors']} errors vs baseline {base.get('errors', 0)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='run against this server instead of in-process')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of load')
+    parser.add_argument('--warmup', type=float, default=1.0, help='seconds of unmeasured load first')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('predict=1,simple=3,batch=1'))
+    parser.add_argument('--batch-size', type=int, default=50, help='records per /predict/batch call')
+    parser.add_argument('--with-cache', action='store_true',
+                        help='in-process only: keep the prediction cache on (off by default)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare with results stored in this JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='write these results to --baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+    else:
+        if not args.with_cache:
+            os.environ['PREDICTION_CACHE_SIZE'] = '0'
+        os.chdir(PROJECT_ROOT)
+        import app as service
+        make_client = lambda: InProcessClient(service.app)  # noqa: E731
+
+    payloads = load_payloads(args.batch_size)
+    if args.warmup > 0:
+        run(make_client, payloads, args.mix, args.concurrency, args.warmup)
+    results = run(make_client, payloads, args.mix, args.concurrency, args.duration)
+
+    print(f"{'endpoint':<10} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['requests']:>9} {r['throughput_rps']:>9.1f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['errors']:>7}")
+
+    report = {
+        'target': args.url or 'in-process',
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'mix': args.mix,
+        'batch_size': args.batch_size,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nSaved baseline to {args.baseline}')
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        problems = compare_to_baseline(results, baseline, args.tolerance)
+        if problems:
+            print(f'\nREGRESSION vs {args.baseline} (tolerance {args.tolerance:.0%}):')
+            for problem in problems:
+                print(f'  - {problem}')
+            sys.exit(1)
+        print(f'\nNo regressions vs {args.baseline} (tolerance {args.tolerance:.0%})')
+
+
+if __name__ == '__main__':
+    main()
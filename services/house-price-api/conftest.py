@@ -0,0 +1,5 @@
+import os
+
+# app.py loads the model with a path relative to the project root (that's the
+# /app folder inside Docker), so run the in-process tests from the repo root
+os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -0,0 +1,351 @@
+"""
+Online drift monitoring: how far are live inputs from the training data?
+
+For every model input we keep a small, fixed-size summary of what live
+traffic looked like, and compare it with the same summary of data/train_new.csv:
+  - numbers: running mean/variance (Welford) and a histogram over the training
+    quantiles, which doubles as a quantile sketch (p5/p50/p95 by interpolation)
+  - text columns: counts per training category, plus the categories training
+    never saw. OneHotEncoder(handle_unknown="ignore") turns those into all
+    zeros without complaint, so they're worth watching. Only the first
+    max_unseen distinct unseen values get their own counter; the rest are
+    lumped together, so memory stays bounded
+Memory per feature doesn't grow with traffic.
+
+The distance per feature is the Population Stability Index (PSI) over those
+bins/categories. Rule of thumb: < 0.1 stable, 0.1-0.25 drifting, > 0.25 shifted.
+
+Request threads only append to a deque (no numpy); a background thread folds
+whatever piled up into the summaries every fold_interval seconds. At most
+max_pending ROWS wait there: a bulk payload that doesn't fit is dropped whole
+and its rows are counted in `dropped`.
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+PSI_DRIFTING = 0.1
+PSI_SHIFTED = 0.25
+
+
+def psi(expected_shares, actual_counts, eps=1e-4):
+    """Population Stability Index between reference shares and live counts"""
+    total = actual_counts.sum()
+    if total == 0:
+        return None
+    expected = np.clip(expected_shares, eps, None)
+    actual = np.clip(actual_counts / total, eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def reference_edges(values, bins):
+    """
+    Bin edges at the reference quantiles, plus extra ones in the tails
+    (1%, 2.5%, 97.5%, 99%) so p5/p95 don't fall in a wide open-ended bin
+    """
+    levels = np.union1d(np.linspace(0, 1, bins + 1)[1:-1], [0.01, 0.025, 0.975, 0.99])
+    return np.unique(np.quantile(values, levels))
+
+
+def row_count(features):
+    """Rows in a list of dicts or a {column: array} payload"""
+    if isinstance(features, dict):
+        return len(next(iter(features.values()))) if features else 0
+    return len(features)
+
+
+def drift_status(value):
+    if value is None:
+        return 'no_data'
+    return 'shifted' if value > PSI_SHIFTED else 'drifting' if value > PSI_DRIFTING else 'stable'
+
+
+class NumericSummary:
+    """Welford mean/variance, min/max and a histogram over fixed bin edges"""
+
+    def __init__(self, edges):
+        self.edges = edges                          # interior edges; bins: (-inf, e0), [e0, e1), ..., [e_last, inf)
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.invalid = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        finite = np.isfinite(values)
+        self.invalid += int((~finite).sum())
+        values = values[finite]
+        if len(values) == 0:
+            return
+        # Chan et al.'s parallel form of Welford: merge the batch's mean/M2 into the running ones
+        n, batch_mean = len(values), float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.counts += np.bincount(np.searchsorted(self.edges, values, side='right'), minlength=len(self.counts))
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quantile(self, q):
+        """Approximate quantile: find the bin, then interpolate linearly inside it"""
+        if self.count == 0:
+            return None
+        lows = np.concatenate([[self.min], self.edges])
+        highs = np.concatenate([self.edges, [self.max]])
+        cumulative = np.cumsum(self.counts)
+        target = q * self.count
+        i = int(np.searchsorted(cumulative, target))
+        i = min(i, len(self.counts) - 1)
+        before = cumulative[i - 1] if i > 0 else 0
+        low, high = max(lows[i], self.min), min(highs[i], self.max)
+        share = (target - before) / self.counts[i] if self.counts[i] else 0.0
+        return float(low + (high - low) * min(max(share, 0.0), 1.0))
+
+
+class CategoricalSummary:
+    """Counts per known category, plus a bounded set of unseen ones"""
+
+    def __init__(self, categories, max_unseen):
+        self.index = {category: i for i, category in enumerate(categories)}
+        self.counts = np.zeros(len(categories), dtype=np.int64)
+        self.max_unseen = max_unseen
+        self.unseen = {}          # first max_unseen distinct unseen values -> count
+        self.unseen_other = 0     # every unseen value after that
+        self.count = 0
+
+    def update(self, values):
+        values, counts = np.unique(np.asarray(values, dtype=str), return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            i = self.index.get(value)
+            if i is not None:
+                self.counts[i] += count
+            elif value in self.unseen or len(self.unseen) < self.max_unseen:
+                self.unseen[value] = self.unseen.get(value, 0) + count
+            else:
+                self.unseen_other += count
+            self.count += count
+
+    @property
+    def unseen_count(self):
+        return sum(self.unseen.values()) + self.unseen_other
+
+
+class DriftMonitor:
+    """
+    Compares live model inputs with reference (training) data, per feature
+    observe() is what request handlers call; it only appends to a deque
+    max_pending: how many rows can wait to be folded
+    """
+
+    def __init__(self, reference, numeric, categorical, bins=20, max_unseen=50,
+                 max_pending=10000, fold_interval=1.0):
+        self.numeric = list(numeric)
+        self.categorical = list(categorical)
+        self.bins = bins
+        self.max_unseen = max_unseen
+        self.fold_interval = fold_interval
+        self.reference_rows = len(reference)
+        self._reference = {}
+        for name in self.numeric:
+            values = reference[name].to_numpy(dtype=float)
+            edges = reference_edges(values, bins)
+            shares = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1) / len(values)
+            self._reference[name] = {
+                'edges': edges, 'shares': shares,
+                'mean': float(values.mean()), 'std': float(values.std(ddof=1)),
+                'p5': float(np.quantile(values, 0.05)), 'p50': float(np.quantile(values, 0.5)),
+                'p95': float(np.quantile(values, 0.95)),
+            }
+        for name in self.categorical:
+            shares = reference[name].astype(str).value_counts(normalize=True)
+            self._reference[name] = {'categories': shares.index.tolist(), 'shares': shares.to_numpy()}
+
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._pending_rows = 0
+        self._pending_lock = threading.Lock()  # keeps the deque and its row count in step
+        self.dropped = 0                        # rows
+        self._lock = threading.Lock()
+        self._summaries = {}      # source -> {feature: summary}
+        self._rows = {}           # source -> rows folded
+        self._worker = None
+        self._worker_pid = None
+        self.started_at = time.time()
+
+    @classmethod
+    def from_csv(cls, path, numeric, categorical, **kwargs):
+        """Reference statistics from the training CSV, cleaned the same way as in training"""
+        reference = pd.read_csv(path, usecols=list(numeric) + list(categorical))
+        reference['Lot Frontage'] = reference['Lot Frontage'].fillna(reference['Lot Frontage'].median())
+        reference['Electrical'] = reference['Electrical'].fillna(reference['Electrical'].mode()[0])
+        return cls(reference, numeric, categorical, **kwargs)
+
+    def _new_summaries(self):
+        summaries = {name: NumericSummary(self._reference[name]['edges']) for name in self.numeric}
+        for name in self.categorical:
+            summaries[name] = CategoricalSummary(self._reference[name]['categories'], self.max_unseen)
+        return summaries
+
+    def observe(self, features, source):
+        """
+        Record model inputs. features: a list of 23-feature dicts or {column: array}
+        Costs one deque append - the real work happens in the background
+        """
+        rows = row_count(features)
+        with self._pending_lock:
+            if self._pending_rows + rows > self.max_pending:
+                self.dropped += rows
+                return
+            self._pending_rows += rows
+            self._pending.append((source, features))
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='drift-monitor', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.fold_interval)
+            self.fold()
+
+    def fold(self):
+        """Move everything waiting in the deque into the summaries, one vectorized update per feature"""
+        batches = {}  # source -> ([rows], [column dicts])
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    break
+                source, features = self._pending.popleft()
+                self._pending_rows -= row_count(features)
+            rows, column_sets = batches.setdefault(source, ([], []))
+            if isinstance(features, dict):
+                column_sets.append(features)
+            else:
+                rows.extend(features)
+
+        with self._lock:
+            for source, (rows, column_sets) in batches.items():
+                summaries = self._summaries.get(source)
+                if summaries is None:
+                    summaries = self._summaries[source] = self._new_summaries()
+                n = len(rows) + sum(row_count(c) for c in column_sets)
+                for name, summary in summaries.items():
+                    parts = [[row.get(name) for row in rows]] if rows else []
+                    parts += [columns[name] for columns in column_sets if name in columns]
+                    if not parts:
+                        continue
+                    values = np.concatenate([np.asarray(part, dtype=object) for part in parts])
+                    if isinstance(summary, NumericSummary):
+                        values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+                    summary.update(values)
+                self._rows[source] = self._rows.get(source, 0) + n
+
+    def reset(self):
+        with self._lock, self._pending_lock:
+            self._pending.clear()
+            self._pending_rows = 0
+            self._summaries.clear()
+            self._rows.clear()
+            self.dropped = 0
+
+    def _merged(self, sources):
+        """One summary per feature over the given sources (bins are identical, so counts just add up)"""
+        merged = self._new_summaries()
+        for source in sources:
+            for name, summary in self._summaries[source].items():
+                target = merged[name]
+                if isinstance(summary, NumericSummary):
+                    if summary.count:
+                        total = target.count + summary.count
+                        delta = summary.mean - target.mean
+                        target.m2 += summary.m2 + delta ** 2 * target.count * summary.count / total
+                        target.mean += delta * summary.count / total
+                        target.count = total
+                        target.min, target.max = min(target.min, summary.min), max(target.max, summary.max)
+                    target.counts += summary.counts
+                    target.invalid += summary.invalid
+                else:
+                    target.counts += summary.counts
+                    target.count += summary.count
+                    target.unseen_other += summary.unseen_other
+                    for value, count in summary.unseen.items():
+                        if value in target.unseen or len(target.unseen) < target.max_unseen:
+                            target.unseen[value] = target.unseen.get(value, 0) + count
+                        else:
+                            target.unseen_other += count
+        return merged
+
+    def report(self, source=None):
+        """Per-feature distance from the reference data, worst first"""
+        self.fold()
+        with self._lock:
+            sources = [source] if source is not None else list(self._summaries)
+            sources = [s for s in sources if s in self._summaries]
+            merged = self._merged(sources)
+            rows = sum(self._rows[s] for s in sources)
+
+            features = {}
+            for name in self.numeric:
+                live, ref = merged[name], self._reference[name]
+                value = psi(ref['shares'], live.counts)
+                features[name] = {
+                    'type': 'numeric',
+                    'psi': value,
+                    'status': drift_status(value),
+                    'count': live.count,
+                    'invalid': live.invalid,
+                    'mean_shift_std': (live.mean - ref['mean']) / ref['std'] if live.count and ref['std'] else None,
+                    'live': {'mean': live.mean if live.count else None, 'std': live.std if live.count else None,
+                             'min': live.min if live.count else None, 'max': live.max if live.count else None,
+                             'p5': live.quantile(0.05), 'p50': live.quantile(0.5), 'p95': live.quantile(0.95)},
+                    'reference': {k: ref[k] for k in ('mean', 'std', 'p5', 'p50', 'p95')},
+                }
+            for name in self.categorical:
+                live, ref = merged[name], self._reference[name]
+                # Unseen categories are one more bin that training had (almost) none of
+                value = psi(np.append(ref['shares'], 0.0), np.append(live.counts, live.unseen_count))
+                top = sorted(zip(ref['categories'], live.counts.tolist()), key=lambda item: -item[1])[:5]
+                features[name] = {
+                    'type': 'categorical',
+                    'psi': value,
+                    'status': drift_status(value),
+                    'count': live.count,
+                    'unseen_share': live.unseen_count / live.count if live.count else None,
+                    'unseen_values': dict(sorted(live.unseen.items(), key=lambda item: -item[1])),
+                    'unseen_other': live.unseen_other,
+                    'top_live': {category: count / live.count for category, count in top if count} if live.count else {},
+                }
+
+        ranked = dict(sorted(features.items(), key=lambda item: -(item[1]['psi'] or 0)))
+        return {
+            'source': source or 'all',
+            'rows': rows,
+            'rows_by_source': {s: self._rows[s] for s in sources},
+            'reference_rows': self.reference_rows,
+            'dropped': self.dropped,
+            'thresholds': {'drifting': PSI_DRIFTING, 'shifted': PSI_SHIFTED},
+            'summary': {status: [n for n, f in ranked.items() if f['status'] == status]
+                        for status in ('shifted', 'drifting')},
+            'features': ranked,
+        }
@@ -0,0 +1,218 @@
+"""
+Offline accuracy check of /predict and /predict/simple - no HTTP involved
+
+Scores every row of a labelled CSV (train_new.csv by default) twice, with
+whole-column calls into the model:
+  - full:   all 23 columns, missing values filled like in training
+  - simple: only the 6 /predict/simple inputs, the rest filled with the same
+            defaults the API uses (features.build_simple_features)
+and reports the error of both on the log scale (RMSE, what the model was
+trained on) and in dollars (MAE).
+
+The error estimates come with bootstrap confidence intervals. Resampling is
+paired (full and simple are scored on the same resampled houses), so the
+"simple minus full" interval is much tighter than the two intervals side by
+side would suggest. Resamples are split into fixed-size chunks, each with its
+own seed, and the chunks run in a pool of worker processes - the result is the
+same whatever the number of workers.
+
+Finally, for every column /predict/simple fills with a default, two numbers:
+  - gain if asked: how much the simple path improves if that one column used
+    the true value instead of the default
+  - cost of default: how much the full path gets worse if only that column
+    were replaced by the default
+That's the list to look at when deciding which input /predict/simple should ask for next.
+
+Run from the project root:
+    python services/house-price-api/evaluate.py --resamples 2000 --workers 4
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURES_REQUIRED, build_simple_features
+from model_manager import load_model
+from score_csv import DEFAULT_MODEL, training_fill_values
+
+DEFAULT_DATA = 'data/train_new.csv'
+
+# Which column of a training row each /predict/simple input is read from
+SIMPLE_FROM_COLUMNS = {
+    'lot_area': 'Lot Area',
+    'overall_qual': 'Overall Qual',
+    'year_built': 'Year Built',
+    'gr_liv_area': 'Gr Liv Area',
+    'bedrooms': 'Bedroom AbvGr',
+    'bathrooms': 'Full Bath',
+}
+
+# Everything else is a default (or, for TotRms AbvGrd, a guess from bedrooms)
+DEFAULTED_FEATURES = [f for f in FEATURES_REQUIRED if f not in SIMPLE_FROM_COLUMNS.values()]
+
+# Resamples per chunk handed to a worker process
+BOOTSTRAP_CHUNK = 250
+
+
+def load_labelled(path, reference_csv=None):
+    """The 23 model columns as {column: array} (missing values filled like training) and the true log prices"""
+    data = pd.read_csv(path)
+    data = data.fillna(training_fill_values(reference_csv or path))
+    columns = {f: data[f].to_numpy() for f in FEATURES_REQUIRED}
+    return columns, np.log1p(data['SalePrice'].to_numpy(dtype=float))
+
+
+def simple_columns(full):
+    """What /predict/simple would score for every row: the 6 inputs plus the API's defaults"""
+    inputs = {field: full[column] for field, column in SIMPLE_FROM_COLUMNS.items()}
+    n = len(full[FEATURES_REQUIRED[0]])
+    # Same stretch as the bulk path in app.py: fixed defaults come back as single values
+    return {name: value if np.ndim(value) else np.full(n, value)
+            for name, value in build_simple_features(inputs).items()}
+
+
+def errors(predicted_log, true_log):
+    """Per-row squared log error and absolute dollar error"""
+    squared = (predicted_log - true_log) ** 2
+    absolute = np.abs(np.expm1(predicted_log) - np.expm1(true_log))
+    return squared, absolute
+
+
+def summarize(squared, absolute):
+    return {'rmse_log': float(np.sqrt(squared.mean())), 'mae': float(absolute.mean())}
+
+
+def _bootstrap_chunk(per_row, resamples, seed):
+    """
+    RMSE/MAE of `resamples` bootstrap samples for every path in per_row
+    per_row: {path: (squared, absolute)}, all the same length
+    """
+    rng = np.random.default_rng(seed)
+    n = len(next(iter(per_row.values()))[0])
+    rows = rng.integers(0, n, size=(resamples, n))
+    return {path: (np.sqrt(squared[rows].mean(axis=1)), absolute[rows].mean(axis=1))
+            for path, (squared, absolute) in per_row.items()}
+
+
+def bootstrap(per_row, resamples=1000, seed=0, workers=None, confidence=0.95):
+    """
+    Percentile confidence intervals for RMSE (log) and MAE of every path,
+    plus the paired difference simple - full
+    """
+    chunks = [BOOTSTRAP_CHUNK] * (resamples // BOOTSTRAP_CHUNK)
+    if resamples % BOOTSTRAP_CHUNK:
+        chunks.append(resamples % BOOTSTRAP_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers == 1:
+        results = [_bootstrap_chunk(per_row, size, s) for size, s in zip(chunks, seeds)]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_bootstrap_chunk, [per_row] * len(chunks), chunks, seeds))
+
+    samples = {path: {'rmse_log': np.concatenate([r[path][0] for r in results]),
+                      'mae': np.concatenate([r[path][1] for r in results])}
+               for path in per_row}
+    samples['simple_minus_full'] = {metric: samples['simple'][metric] - samples['full'][metric]
+                                    for metric in ('rmse_log', 'mae')}
+    tail = (1 - confidence) / 2 * 100
+    return {path: {metric: [float(v) for v in np.percentile(values, [tail, 100 - tail])]
+                   for metric, values in metrics.items()}
+            for path, metrics in samples.items()}
+
+
+def default_tradeoff(model, full, simple, true_log, baseline):
+    """Gain of asking for each defaulted column, and cost of defaulting only that column"""
+    rows = []
+    for feature in DEFAULTED_FEATURES:
+        asked = summarize(*errors(model.predict_columns({**simple, feature: full[feature]}), true_log))
+        alone = summarize(*errors(model.predict_columns({**full, feature: simple[feature]}), true_log))
+        rows.append({
+            'feature': feature,
+            'share_not_default': float(np.mean(full[feature] != simple[feature])),
+            'gain_if_asked_rmse_log': baseline['simple']['rmse_log'] - asked['rmse_log'],
+            'gain_if_asked_mae': baseline['simple']['mae'] - asked['mae'],
+            'cost_of_default_rmse_log': alone['rmse_log'] - baseline['full']['rmse_log'],
+            'cost_of_default_mae': alone['mae'] - baseline['full']['mae'],
+        })
+    return sorted(rows, key=lambda row: row['gain_if_asked_rmse_log'], reverse=True)
+
+
+def evaluate(data_path=DEFAULT_DATA, model_path=DEFAULT_MODEL, reference_csv=None, resamples=1000,
+             seed=0, workers=None, confidence=0.95, use_kernel=True):
+    """Score data_path on both paths and return the whole report as a dict"""
+    started = time.perf_counter()
+    model = load_model(model_path, use_kernel=use_kernel)
+    full, true_log = load_labelled(data_path, reference_csv)
+    simple = simple_columns(full)
+
+    per_row = {'full': errors(model.predict_columns(full), true_log),
+               'simple': errors(model.predict_columns(simple), true_log)}
+    point = {path: summarize(*values) for path, values in per_row.items()}
+    point['simple_minus_full'] = {metric: point['simple'][metric] - point['full'][metric]
+                                  for metric in ('rmse_log', 'mae')}
+    scored = time.perf_counter()
+
+    intervals = bootstrap(per_row, resamples, seed, workers, confidence) if resamples else None
+    tradeoff = default_tradeoff(model, full, simple, true_log, point)
+    return {
+        'data': data_path,
+        'model_version': model.version,
+        'rows': len(true_log),
+        'metrics': point,
+        'confidence': confidence,
+        'resamples': resamples,
+        'intervals': intervals,
+        'default_tradeoff': tradeoff,
+        'seconds': {'scoring': round(scored - started, 3), 'total': round(time.perf_counter() - started, 3)},
+    }
+
+
+def print_report(report):
+    print(f"{report['rows']:,} rows of {report['data']}, model {report['model_version']}")
+    ci = report['intervals']
+    label = f"{report['confidence']:.0%} CI" if ci else ''
+    print(f"\n{'':20}{'RMSE (log)':>12}{label:>20}{'MAE ($)':>12}{label:>22}")
+    for path in ('full', 'simple', 'simple_minus_full'):
+        m = report['metrics'][path]
+        rmse_ci = '[{:.4f}, {:.4f}]'.format(*ci[path]['rmse_log']) if ci else ''
+        mae_ci = '[{:,.0f}, {:,.0f}]'.format(*ci[path]['mae']) if ci else ''
+        print(f"{path:20}{m['rmse_log']:>12.4f}{rmse_ci:>20}{m['mae']:>12,.0f}{mae_ci:>22}")
+
+    print(f"\n{'defaulted column':20}{'not default':>12}{'gain if asked':>24}{'cost of default':>24}")
+    print(f"{'':20}{'':>12}{'RMSE (log)':>12}{'MAE ($)':>12}{'RMSE (log)':>12}{'MAE ($)':>12}")
+    for row in report['default_tradeoff']:
+        print(f"{row['feature']:20}{row['share_not_default']:>12.0%}"
+              f"{row['gain_if_asked_rmse_log']:>12.4f}{row['gain_if_asked_mae']:>12,.0f}"
+              f"{row['cost_of_default_rmse_log']:>12.4f}{row['cost_of_default_mae']:>12,.0f}")
+    print(f"\nScored in {report['seconds']['scoring']}s, {report['seconds']['total']}s in total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DEFAULT_DATA, help='CSV with the 23 model columns and SalePrice')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--reference', help='training CSV used for the missing-value fill (default: --data)')
+    parser.add_argument('--resamples', type=int, default=1000, help='bootstrap resamples (0 turns them off)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='worker processes for the bootstrap (default: all CPUs)')
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--no-kernel', action='store_true', help='score with sklearn instead of the compiled kernel')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    report = evaluate(args.data, args.model, args.reference, args.resamples, args.seed,
+                      args.workers, args.confidence, not args.no_kernel)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+The model's input columns and the defaults /predict/simple fills in
+
+Kept apart from app.py so offline tools (see evaluate.py) can build exactly
+the same rows as the API without starting the web app.
+"""
+
+
+# The 23 columns the model was trained on (same order as train_new.csv minus PID/SalePrice)
+FEATURES_REQUIRED = [
+    "Lot Frontage", "Lot Area", "Street", "Neighborhood", 
+    "Bldg Type", "House Style", "Overall Qual", "Overall Cond",
+    "Year Built", "Roof Style", "Heating", "Central Air", 
+    "Electrical", "Full Bath", "Half Bath", "Bedroom AbvGr",
+    "TotRms AbvGrd", "Gr Liv Area", "Functional", 
+    "Screen Porch", "Pool Area", "Yr Sold", "Sale Type"
+]
+
+# Text columns get one-hot encoded, everything else is a number that gets standardized
+CATEGORICAL_FEATURES = [
+    "Street", "Neighborhood", "Bldg Type", "House Style", "Roof Style",
+    "Heating", "Central Air", "Electrical", "Functional", "Sale Type"
+]
+NUMERIC_FEATURES = [f for f in FEATURES_REQUIRED if f not in CATEGORICAL_FEATURES]
+
+# The 6 inputs /predict/simple understands
+SIMPLE_FIELDS = ["lot_area", "overall_qual", "year_built", "gr_liv_area", "bedrooms", "bathrooms"]
+
+
+def build_simple_features(data):
+    """
+    Turn the 6 simple inputs into the full 23-feature row the model expects
+    Shared by /predict/simple and /predict/batch so both use the same defaults
+    """
+    # Create a full feature set using the simple inputs + reasonable defaults
+    # This is like filling out a form where most boxes have default values
+    full_features = {
+        "Lot Frontage": 70.0,  # Default median from your data
+        "Lot Area": data.get("lot_area", 10000),  # Use their input or default
+        "Street": "Pave",  # Most houses have paved streets
+        "Neighborhood": "NAmes",  # Most common neighborhood in your data
+        "Bldg Type": "1Fam",  # Single family home (most common)
+        "House Style": "1Story",  # Most common style
+        "Overall Qual": data.get("overall_qual", 5),  # Their input or average
+        "Overall Cond": 5,  # Average condition
+        "Year Built": data.get("year_built", 1980),  # Their input or default
+        "Roof Style": "Gable",  # Most common roof type
+        "Heating": "GasA",  # Gas heating (most common)
+        "Central Air": "Y",  # Assume yes (most houses have it)
+        "Electrical": "SBrkr",  # Standard electrical (most common)
+        "Full Bath": data.get("bathrooms", 1),  # Their input
+        "Half Bath": 0,  # Default to no half bath
+        "Bedroom AbvGr": data.get("bedrooms", 3),  # Their input
+        "TotRms AbvGrd": data.get("bedrooms", 3) + 3,  # Estimate: bedrooms + 3 other rooms
+        "Gr Liv Area": data.get("gr_liv_area", 1500),  # Their input or default
+        "Functional": "Typ",  # Typical functionality
+        "Screen Porch": 0,  # Most houses don't have screen porches
+        "Pool Area": 0,  # Most houses don't have pools
+        "Yr Sold": 2023,  # Current year
+        "Sale Type": "WD"  # Warranty deed (most common sale type)
+    }
+    return full_features
@@ -0,0 +1,72 @@
+# Gunicorn settings for running the API in production
+# Run with: gunicorn --config gunicorn.conf.py app:app
+#
+# Why not app.run()? That's Flask's development server: one process, the
+# debug reloader, and not built for real traffic. Gunicorn runs several
+# worker processes (each with a few threads) behind one port.
+import gc
+import math
+import os
+
+
+def cpu_quota():
+    """
+    How many CPUs this container is allowed to use
+    Kubernetes limits (like cpu: "500m") show up as a cgroup quota, which
+    os.cpu_count() ignores - it reports every core on the node
+    """
+    try:
+        # cgroup v2: "max 100000" (no limit) or "50000 100000" (half a CPU)
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1: quota of -1 means no limit
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# Scoring is CPU-bound, so one worker per CPU we're allowed to use (at least 1)
+# Override with WEB_CONCURRENCY, e.g. WEB_CONCURRENCY=4
+workers = int(os.environ.get('WEB_CONCURRENCY', max(1, math.ceil(cpu_quota()))))
+
+# Several workers per pod are fine for the autoscaler too: the in-flight and queue
+# numbers hpa.yaml scales on are summed over all workers (PodGauges in metrics.py)
+
+# Threads let one worker overlap request parsing/JSON with another request's predict
+# Requests only reach app.py's admission control once a thread picks them up, so
+# by default there's a thread for every running request and every place in line,
+# plus 16 spare ones that can answer overflow with a quick 429
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS') or
+              int(os.environ.get('ADMISSION_MAX_CONCURRENT', 4)) + int(os.environ.get('ADMISSION_MAX_QUEUE', 16)) + 16)
+
+# Load app.py (and the model) ONCE in the parent before forking the workers
+# The workers then share that memory copy-on-write instead of each loading its own copy
+preload_app = True
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')  # e.g. "-" for stdout, off by default
+errorlog = '-'
+
+
+def when_ready(server):
+    # Runs in the parent after the app is loaded and before workers are forked
+    # Moving everything that exists now (the model, pandas, sklearn...) into the
+    # permanent generation stops the garbage collector from touching those
+    # objects in the workers, which would otherwise copy the shared pages
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,201 @@
+"""
+Compiled scoring kernel for linear sklearn pipelines
+
+The saved house price model is a Pipeline of
+    ColumnTransformer(OneHotEncoder + StandardScaler) -> ElasticNet
+Because everything after the encoder is linear, the whole thing collapses to:
+    log_price = intercept + sum(weight of each category) + numbers @ folded_weights
+
+So at load time we "compile" the pipeline into:
+  - one lookup table per text column: {category: coefficient}
+    (unknown categories get 0, exactly like OneHotEncoder(handle_unknown="ignore"))
+  - one weight vector for the number columns with the StandardScaler folded in:
+    coef * (x - mean) / scale  ==  x * (coef / scale) - mean * coef / scale
+  - one intercept that soaks up all the constant terms
+
+Scoring a request is then a few dictionary lookups and one dot product,
+with no DataFrame and no sklearn transform machinery in the way.
+
+The same pieces give exact explanations for free (explain_columns): each
+column's share of the log price is its lookup value or x * weight - offset,
+and those shares plus the model intercept add up to the prediction.
+"""
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+
+class LinearKernel:
+    """Flat version of a fitted linear pipeline - same predictions, less overhead"""
+
+    def __init__(self, category_tables, numeric_features, numeric_weights, intercept, numeric_offsets=None):
+        self.category_tables = category_tables    # {column: {category: weight}}
+        self.numeric_features = numeric_features  # column names, in weight order
+        self.numeric_weights = numeric_weights    # coef / scale for each number column
+        self.intercept = intercept                # model intercept minus mean * coef / scale
+        # mean * coef / scale for each number column (the part folded into the intercept)
+        self.numeric_offsets = (np.zeros(len(numeric_weights)) if numeric_offsets is None
+                                else np.asarray(numeric_offsets, dtype=np.float64))
+        self.base = intercept + float(self.numeric_offsets.sum())   # the model's own intercept
+        self.features = list(category_tables) + list(numeric_features)
+
+    def predict_columns(self, columns):
+        """
+        Score a batch given as {column name: sequence of values}
+        Returns the model output (log price) for every row as a numpy array
+        """
+        missing = [f for f in self.features if f not in columns]
+        if missing:
+            raise ValueError(f'columns are missing: {set(missing)}')
+
+        if self.numeric_features:
+            numbers = np.column_stack([
+                np.asarray(columns[f], dtype=np.float64) for f in self.numeric_features
+            ])
+            # sklearn refuses to score NaN, so we refuse too instead of returning NaN
+            if np.isnan(numbers).any():
+                raise ValueError('Input X contains NaN.')
+            output = numbers @ self.numeric_weights + self.intercept
+        else:
+            output = np.full(len(next(iter(columns.values()))), self.intercept)
+
+        for feature, table in self.category_tables.items():
+            output += np.fromiter((table.get(value, 0.0) for value in columns[feature]),
+                                  dtype=np.float64, count=len(output))
+        return output
+
+    def explain_columns(self, columns):
+        """
+        Exact per-column contributions to the log price, for a batch given as {column: values}
+        Returns (base, contributions): contributions has one row per house and one
+        column per entry of self.features, and base + row sum == predict_columns
+        """
+        missing = [f for f in self.features if f not in columns]
+        if missing:
+            raise ValueError(f'columns are missing: {set(missing)}')
+        n = len(columns[self.features[0]])
+
+        contributions = np.empty((n, len(self.features)))
+        for j, (feature, table) in enumerate(self.category_tables.items()):
+            contributions[:, j] = np.fromiter((table.get(value, 0.0) for value in columns[feature]),
+                                              dtype=np.float64, count=n)
+        if self.numeric_features:
+            numbers = np.column_stack([
+                np.asarray(columns[f], dtype=np.float64) for f in self.numeric_features
+            ])
+            if np.isnan(numbers).any():
+                raise ValueError('Input X contains NaN.')
+            # All number columns in one go: coef * (x - mean) / scale for every cell
+            contributions[:, len(self.category_tables):] = numbers * self.numeric_weights - self.numeric_offsets
+        return self.base, contributions
+
+    def predict_records(self, records):
+        """Score a list of feature dicts (the JSON shape the API receives)"""
+        columns = {}
+        for feature in self.features:
+            try:
+                columns[feature] = [record[feature] for record in records]
+            except KeyError:
+                missing = {f for f in self.features if any(f not in r for r in records)}
+                raise ValueError(f'columns are missing: {missing}') from None
+        return self.predict_columns(columns)
+
+
+def compile_pipeline(pipeline):
+    """
+    Turn a fitted Pipeline(ColumnTransformer, linear model) into a LinearKernel
+    Raises ValueError if the pipeline uses anything we can't fold exactly,
+    so the caller can fall back to plain model.predict
+    """
+    if not isinstance(pipeline, Pipeline) or len(pipeline.steps) != 2:
+        raise ValueError('Expected a Pipeline with a preprocessor and a model step')
+    preprocessor, estimator = pipeline.steps[0][1], pipeline.steps[1][1]
+
+    if not isinstance(preprocessor, ColumnTransformer):
+        raise ValueError('Preprocessor is not a ColumnTransformer')
+    coef = np.asarray(getattr(estimator, 'coef_', None), dtype=np.float64)
+    intercept = getattr(estimator, 'intercept_', None)
+    if coef.ndim != 1 or np.ndim(intercept) != 0:
+        raise ValueError(f'{type(estimator).__name__} is not a single-output linear model')
+    intercept = float(intercept)
+
+    category_tables = {}
+    numeric_features, numeric_weights, numeric_offsets = [], [], []
+    for name, transformer, columns in preprocessor.transformers_:
+        output_slice = preprocessor.output_indices_[name]
+        weights = coef[output_slice]
+        if transformer == 'drop' or len(weights) == 0:
+            continue
+
+        if isinstance(transformer, OneHotEncoder):
+            if (transformer.drop_idx_ is not None or transformer.min_frequency is not None
+                    or transformer.max_categories is not None):
+                raise ValueError('OneHotEncoder with drop/infrequent categories is not supported')
+            if transformer.handle_unknown != 'ignore':
+                raise ValueError('OneHotEncoder must use handle_unknown="ignore"')
+            position = 0
+            for column, categories in zip(columns, transformer.categories_):
+                category_tables[column] = {
+                    category: float(weight)
+                    for category, weight in zip(categories, weights[position:position + len(categories)])
+                }
+                position += len(categories)
+
+        elif isinstance(transformer, StandardScaler):
+            mean = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+            scale = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+            folded = weights / scale
+            intercept -= float(mean @ folded)
+            numeric_features.extend(columns)
+            numeric_weights.extend(folded)
+            numeric_offsets.extend(mean * folded)
+
+        elif transformer == 'passthrough':
+            numeric_features.extend(columns)
+            numeric_weights.extend(weights)
+            numeric_offsets.extend(np.zeros(len(columns)))
+
+        else:
+            raise ValueError(f'Cannot compile transformer {name!r} ({type(transformer).__name__})')
+
+    return LinearKernel(category_tables, numeric_features,
+                        np.asarray(numeric_weights, dtype=np.float64), intercept, numeric_offsets)
+
+
+def dollar_contributions(base, log_contributions):
+    """
+    Split each house's price - base price into dollars per column
+
+    The model adds up log prices, so dollars don't add up on their own: a
+    column that adds 0.1 to the log price is worth more dollars on a big
+    house than on a small one. Each column gets a share of the total dollar
+    change in proportion to its share of the total log change:
+        dollars_j = log_j * (price - base_price) / (log price - log base_price)
+    which sums exactly to price - base_price. When the log changes cancel
+    out, the ratio tends to exp(base), which is what we use there.
+    """
+    total = log_contributions.sum(axis=1)
+    ratio = np.full(len(total), np.exp(base))
+    moved = total != 0
+    ratio[moved] = np.exp(base) * np.expm1(total[moved]) / total[moved]
+    return log_contributions * ratio[:, None]
+
+
+def round_to_cents(dollars, totals):
+    """
+    Round every row of dollars to cents so that it adds up exactly to totals
+    (which should already be whole cents). Rounding each number on its own
+    can be off by a few cents per row, so instead we round everything down
+    and hand the missing cents to the numbers that lost the most
+    (the largest remainder method)
+    """
+    cents = np.asarray(dollars, dtype=np.float64) * 100
+    floored = np.floor(cents)
+    remainders = cents - floored
+    missing = np.rint(np.asarray(totals, dtype=np.float64) * 100) - floored.sum(axis=1)
+    # rank 0 = biggest remainder in its row
+    rank = np.argsort(np.argsort(-remainders, axis=1, kind='stable'), axis=1)
+    n = cents.shape[1]
+    adjust = (rank < missing[:, None]).astype(np.float64) - (rank >= n + missing[:, None]).astype(np.float64)
+    return (floored + adjust) / 100
@@ -0,0 +1,238 @@
+"""
+Low-overhead latency metrics in the Prometheus text format
+
+Every request gets a RequestTimer. Code inside the request wraps its steps in
+    with stage('parse'): ...
+and the time spent is added to a histogram per (endpoint, stage). Outside a
+request (e.g. in the micro-batcher's thread) stage() does nothing, so library
+code like model_manager.py can call it freely.
+
+Recording a sample is one perf_counter() pair and a few list updates under a
+lock - a couple of microseconds against a request that takes ~1 ms.
+
+Note: most numbers are per process. With several gunicorn workers each
+worker reports its own counts, labelled with its pid, and a scrape only
+reaches one of them. The few numbers the autoscaler needs for the whole pod
+(admission in-flight and queue depth) go through PodGauges instead: shared
+memory every worker writes its own row of, summed at scrape time.
+"""
+import bisect
+import contextvars
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency buckets: 50us ... 10s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+_current_timer = contextvars.ContextVar('request_timer', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram like Prometheus expects"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """All counters and histograms for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.request_latency = {}   # endpoint -> Histogram
+        self.stage_latency = {}     # (endpoint, stage) -> Histogram
+        self.requests = {}          # (endpoint, status) -> count
+        self.errors = {}            # endpoint -> count of 5xx responses
+        self.gauges = []            # functions returning [(name, help, labels, value)]
+
+    def observe_request(self, endpoint, status, seconds):
+        with self._lock:
+            histogram = self.request_latency.get(endpoint)
+            if histogram is None:
+                histogram = self.request_latency[endpoint] = Histogram()
+            histogram.observe(seconds)
+            self.requests[(endpoint, status)] = self.requests.get((endpoint, status), 0) + 1
+            if status >= 500:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def observe_stage(self, endpoint, stage_name, seconds):
+        with self._lock:
+            histogram = self.stage_latency.get((endpoint, stage_name))
+            if histogram is None:
+                histogram = self.stage_latency[(endpoint, stage_name)] = Histogram()
+            histogram.observe(seconds)
+
+    def reset(self):
+        """Forget everything recorded so far (used after warmup, which isn't real traffic)"""
+        with self._lock:
+            self.request_latency.clear()
+            self.stage_latency.clear()
+            self.requests.clear()
+            self.errors.clear()
+
+    def add_gauges(self, collect):
+        """
+        Register a function that returns extra (name, help, labels, value) samples at scrape time
+        Names ending in _total are exported as counters (numbers that only go up), the rest as gauges
+        """
+        self.gauges.append(collect)
+
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        pid = str(os.getpid())
+        lines = []
+
+        def histogram_lines(name, histograms, label_names):
+            for key, histogram in sorted(histograms.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                labels = ','.join(f'{n}="{v}"' for n, v in zip(label_names, key)) + f',pid="{pid}"'
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.9f}')
+                lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines += ['# HELP http_request_duration_seconds Request latency per endpoint',
+                      '# TYPE http_request_duration_seconds histogram']
+            histogram_lines('http_request_duration_seconds', self.request_latency, ['endpoint'])
+            lines += ['# HELP http_stage_duration_seconds Latency of each stage inside a request',
+                      '# TYPE http_stage_duration_seconds histogram']
+            histogram_lines('http_stage_duration_seconds', self.stage_latency, ['endpoint', 'stage'])
+            lines += ['# HELP http_requests_total Requests per endpoint and status code',
+                      '# TYPE http_requests_total counter']
+            for (endpoint, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{endpoint}",status="{status}",pid="{pid}"}} {count}')
+            lines += ['# HELP http_request_errors_total Requests that ended in a 5xx response',
+                      '# TYPE http_request_errors_total counter']
+            for endpoint, count in sorted(self.errors.items()):
+                lines.append(f'http_request_errors_total{{endpoint="{endpoint}",pid="{pid}"}} {count}')
+
+        described = set()
+        for collect in self.gauges:
+            for name, help_text, labels, value in collect():
+                if name not in described:
+                    kind = 'counter' if name.endswith('_total') else 'gauge'
+                    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                    described.add(name)
+                label_text = ','.join(f'{k}="{v}"' for k, v in {**labels, 'pid': pid}.items())
+                lines.append(f'{name}{{{label_text}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class PodGauges:
+    """
+    Gauges summed over every worker process of the pod
+
+    The memory is created by whoever builds this object. Build it at import
+    time of app.py: with gunicorn's preload_app that's the master, before the
+    fork, so all workers share it. (Without preloading every worker gets its
+    own copy and the totals are per process again.)
+
+    Each process claims one row (its pid plus one value per name) and only
+    ever writes its own row, so writes need no cross-process lock. Rows of
+    processes that have exited are skipped when summing and reused by new workers.
+    """
+
+    def __init__(self, names, slots=64):
+        self.names = list(names)
+        self.slots = slots
+        self._width = len(self.names) + 1   # pid, then the values
+        self._values = multiprocessing.Array('q', slots * self._width, lock=False)
+        self._claim_lock = multiprocessing.Lock()
+        self._row = None
+        self._row_pid = None
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)   # signal 0 only checks that the process exists
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+
+    def _my_row(self):
+        """Start index of this process's row, claiming one on first use (None if all are taken)"""
+        pid = os.getpid()
+        if self._row_pid == pid:
+            return self._row
+        with self._claim_lock:
+            owners = [self._values[i * self._width] for i in range(self.slots)]
+            # Our own row from before (a reused pid), else a free one or one of an exited process
+            free = next((i for i, owner in enumerate(owners) if owner == pid), None)
+            if free is None:
+                free = next((i for i, owner in enumerate(owners) if owner == 0 or not self._alive(owner)), None)
+            if free is None:
+                return None
+            start = free * self._width
+            self._values[start:start + self._width] = [pid] + [0] * len(self.names)
+        self._row, self._row_pid = start, pid
+        return start
+
+    def set(self, **values):
+        """Publish this process's current values, e.g. set(in_flight=3)"""
+        start = self._my_row()
+        if start is None:
+            return
+        for name, value in values.items():
+            self._values[start + 1 + self.names.index(name)] = value
+
+    def totals(self):
+        """{name: sum over every live worker}"""
+        totals = dict.fromkeys(self.names, 0)
+        for i in range(self.slots):
+            start = i * self._width
+            owner = self._values[start]
+            if owner == 0 or (owner != os.getpid() and not self._alive(owner)):
+                continue
+            for j, name in enumerate(self.names):
+                totals[name] += self._values[start + 1 + j]
+        return totals
+
+
+class RequestTimer:
+    """Times one request and its stages"""
+    __slots__ = ('metrics', 'endpoint', 'started')
+
+    def __init__(self, metrics, endpoint):
+        self.metrics = metrics
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+
+    def start(self):
+        """Make this the timer that stage() reports to in the current thread/context"""
+        _current_timer.set(self)
+        return self
+
+    def finish(self, status):
+        self.metrics.observe_request(self.endpoint, status, time.perf_counter() - self.started)
+        _current_timer.set(None)
+
+
+@contextmanager
+def stage(name):
+    """Time a block as one stage of the current request (no-op outside a request)"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.metrics.observe_stage(timer.endpoint, name, time.perf_counter() - started)
@@ -0,0 +1,241 @@
+"""
+Hot reloading of the served model without restarting the pod
+
+The model, its compiled kernel and its version always travel together in one
+LoadedModel snapshot. Swapping models is a single assignment of that snapshot,
+so a request either sees the old model completely or the new one completely,
+and requests already running just finish on the model they started with.
+
+A reload:
+  1. loads the new .pkl in a background thread (requests keep using the old model)
+  2. validates it by scoring a canary set from data/train_new.csv
+  3. swaps it in, keeping the old one around for a one-step rollback
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+from kernel import compile_pipeline
+from metrics import stage
+
+
+class ModelValidationError(Exception):
+    """The candidate model failed its canary check and was not swapped in"""
+
+
+class LoadedModel:
+    """Everything about one loaded model version, never modified after creation"""
+
+    def __init__(self, path, model, kernel, version, revision):
+        self.path = path
+        self.model = model
+        self.kernel = kernel            # None when the model can't be (or shouldn't be) compiled
+        self.version = version          # short sha256 of the .pkl contents
+        self.revision = revision        # 1 for the model loaded at startup, +1 per reload
+        self.loaded_at = datetime.now().isoformat()
+
+    def predict(self, rows):
+        """Log-scale predictions for a list of 23-feature dicts"""
+        if self.kernel is not None:
+            with stage('kernel'):
+                return self.kernel.predict_records(rows)
+        with stage('dataframe'):
+            input_df = pd.DataFrame(rows)
+        if not isinstance(self.model, Pipeline):
+            with stage('model'):
+                return self.model.predict(input_df)
+        # Same as self.model.predict, split up so /metrics shows where the time goes
+        with stage('transform'):
+            transformed = self.model[:-1].transform(input_df)
+        with stage('model'):
+            return self.model[-1].predict(transformed)
+
+    def predict_columns(self, columns):
+        """Log-scale predictions for a whole payload given as {column: array}"""
+        if self.kernel is not None:
+            with stage('kernel'):
+                return self.kernel.predict_columns(columns)
+        with stage('dataframe'):
+            input_df = pd.DataFrame(columns)
+        with stage('model'):
+            return self.model.predict(input_df)
+
+    def describe(self):
+        return {
+            'version': self.version,
+            'revision': self.revision,
+            'path': self.path,
+            'loaded_at': self.loaded_at,
+            'inference_engine': 'compiled_kernel' if self.kernel is not None else 'sklearn',
+        }
+
+
+def content_hash(data):
+    """Short fingerprint of a model file's bytes so we know exactly which model is loaded"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def load_model(path, use_kernel=True, logger=None, revision=0):
+    """Load a .pkl and compile its kernel (if it can be compiled) into a LoadedModel"""
+    # Read the file once and unpickle those same bytes, so the version always
+    # matches the model even if the file is replaced while we're loading it
+    with open(path, 'rb') as f:
+        data = f.read()
+    model = joblib.load(io.BytesIO(data))
+    kernel = None
+    if use_kernel:
+        try:
+            kernel = compile_pipeline(model)
+        except ValueError as e:
+            if logger:
+                logger.warning(f'Could not compile model, using sklearn predict instead: {e}')
+    return LoadedModel(path, model, kernel, content_hash(data), revision)
+
+
+def load_canary(path, features, rows):
+    """
+    First rows of the training data, cleaned the same way as in training
+    (median Lot Frontage, most common Electrical), plus their true log prices
+    """
+    canary = pd.read_csv(path).head(rows)
+    canary['Lot Frontage'] = canary['Lot Frontage'].fillna(canary['Lot Frontage'].median())
+    canary['Electrical'] = canary['Electrical'].fillna(canary['Electrical'].mode()[0])
+    return canary[features].to_dict(orient='records'), np.log1p(canary['SalePrice'].to_numpy())
+
+
+class ModelManager:
+    """Owns the active model and handles reloads, validation and rollback"""
+
+    def __init__(self, path, use_kernel=True, logger=None, canary_path=None,
+                 canary_rows=200, max_canary_rmse=0.5, features=None):
+        self.use_kernel = use_kernel
+        self.logger = logger
+        self.canary_path = canary_path
+        self.canary_rows = canary_rows
+        self.max_canary_rmse = max_canary_rmse
+        self.features = features
+        self._revision = 0
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._watcher_pid = None
+        self._ignored_versions = set()  # file versions the watcher must not load again
+        self.previous = None
+        self.status = {'state': 'idle'}
+        self.active = self._load(path)
+
+    def _load(self, path):
+        self._revision += 1
+        return load_model(path, self.use_kernel, self.logger, self._revision)
+
+    def validate(self, candidate):
+        """Score the canary set and make sure the answers are sane before going live"""
+        if not self.canary_path or not os.path.exists(self.canary_path):
+            return {'skipped': 'no canary data available'}
+        rows, actual = load_canary(self.canary_path, self.features, self.canary_rows)
+        predictions = np.asarray(candidate.predict(rows), dtype=float)
+        if predictions.shape != actual.shape or not np.isfinite(predictions).all():
+            raise ModelValidationError('Candidate returned missing or non-finite predictions')
+        rmse = float(np.sqrt(np.mean((predictions - actual) ** 2)))
+        report = {'rows': len(rows), 'rmse_log': round(rmse, 4)}
+        if rmse > self.max_canary_rmse:
+            raise ModelValidationError(f'Canary RMSE {rmse:.4f} is above the limit of {self.max_canary_rmse}')
+        if self.active is not None:
+            current = np.asarray(self.active.predict(rows), dtype=float)
+            report['mean_abs_change_vs_active'] = round(float(np.mean(np.abs(predictions - current))), 4)
+        return report
+
+    def reload(self, path=None):
+        """Load, validate and swap in a model (blocking). Returns the status dict"""
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError('A reload is already in progress')
+        return self._reload(path)
+
+    def _reload(self, path):
+        """The reload itself; the caller has already taken _reload_lock, and this releases it"""
+        path = path or self.active.path
+        candidate = None
+        try:
+            self.status = {'state': 'loading', 'path': path, 'started_at': datetime.now().isoformat()}
+            candidate = self._load(path)
+            canary = self.validate(candidate)
+            # The swap itself: one assignment, so readers never see a half-updated model
+            self.previous, self.active = self.active, candidate
+            self.status = {'state': 'succeeded', 'path': path, 'version': candidate.version,
+                           'canary': canary, 'finished_at': datetime.now().isoformat()}
+        except Exception as e:
+            self.status = {'state': 'failed', 'path': path, 'error': str(e),
+                           'finished_at': datetime.now().isoformat()}
+            if candidate is not None:
+                self._ignored_versions.add(candidate.version)
+        finally:
+            self._reload_lock.release()
+        return self.status
+
+    def reload_async(self, path=None):
+        """Start a reload in the background and return straight away"""
+        # Take the lock here, not in the thread: otherwise another reload could
+        # sneak in between, and the caller would be told "started" for a reload
+        # whose thread then dies on "already in progress"
+        if not self._reload_lock.acquire(blocking=False):
+            raise RuntimeError('A reload is already in progress')
+        try:
+            threading.Thread(target=self._reload, args=(path,), name='model-reload', daemon=True).start()
+        except Exception:
+            self._reload_lock.release()
+            raise
+
+    def rollback(self):
+        """Swap back to the model that was active before the last reload"""
+        if self.previous is None:
+            raise RuntimeError('No previous model to roll back to')
+        self.active, self.previous = self.previous, self.active
+        # The bad file is probably still on disk, so keep the watcher from reloading it
+        self._ignored_versions.add(self.previous.version)
+        return self.active
+
+    def ensure_watcher(self, interval):
+        """
+        Poll the active model file and reload when it changes on disk
+        Started lazily (and again after a fork) because threads don't survive fork(),
+        and every gunicorn worker needs its own watcher to pick up the new file.
+        Also started again if the old one ever died
+        """
+        if interval <= 0 or (self._watcher is not None and self._watcher_pid == os.getpid()
+                             and self._watcher.is_alive()):
+            return
+        self._watcher_pid = os.getpid()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                version = file_hash(self.active.path)
+                if version == self.active.version or version in self._ignored_versions:
+                    continue
+                # An admin reload is running right now: look again next time
+                if not self._reload_lock.acquire(blocking=False):
+                    continue
+                status = self._reload(None)
+                if self.logger:
+                    self.logger.warning(f'Model file changed, reload {status["state"]}: {status}')
+            except OSError:
+                pass  # file is being replaced right now, try again next time
+            except Exception as e:
+                # Whatever went wrong, the watcher has to keep running
+                if self.logger:
+                    self.logger.exception(f'Model watcher check failed: {e}')
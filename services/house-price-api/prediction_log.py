@@ -0,0 +1,183 @@
+"""
+Durable log of every prediction, written off the request path
+
+Handlers call log(), which only appends to an in-memory buffer. A background
+thread wakes up every flush_interval seconds (sooner once flush_rows are
+waiting), turns what piled up into JSON lines, one per prediction:
+    {"ts": ..., "endpoint": "simple", "model_version": "3f2a...", "latency_ms": 0.41,
+     "features": {...23 model inputs...}, "predicted_price": 181234.56}
+and appends them to a gzip file in one write.
+
+Files rotate when they reach max_file_bytes (compressed) or max_file_seconds
+of age. The file being written ends in .open and is renamed to .jsonl.gz
+when it's closed, so anything with the final name is complete. Every worker
+process writes its own files (the pid is in the name).
+
+If the disk can't keep up and the buffer is full, new predictions are
+dropped and counted - requests never wait for the log. close() (also run at
+exit) writes out everything still buffered.
+"""
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+
+class PredictionLogger:
+    """Buffered, rotating, gzip JSON-lines prediction log"""
+
+    def __init__(self, directory, max_buffer=100_000, flush_interval=1.0, flush_rows=5000,
+                 max_file_bytes=64 * 1024 * 1024, max_file_seconds=3600):
+        self.directory = directory
+        self.max_buffer = max_buffer            # rows, not log() calls
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        os.makedirs(directory, exist_ok=True)
+        self._buffer = deque()
+        self._buffered_rows = 0
+        self._wake = threading.Event()
+        self._buffer_lock = threading.Lock()   # held for a few microseconds by log()
+        self._write_lock = threading.Lock()    # held by the background thread while writing
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._closed = False
+        self._file = None
+        self._file_path = None
+        self._file_opened = None
+        self._sequence = 0
+        self.written = 0
+        self.dropped = 0
+        self.files_closed = 0
+        self.write_errors = 0
+        atexit.register(self.close)
+
+    def log(self, endpoint, model_version, latency_ms, features, log_predictions):
+        """
+        Queue the predictions of one request. Never blocks
+        features: a list of 23-feature dicts, or {column: array} for bulk payloads
+        Returns False if the buffer was full and the predictions were dropped
+        """
+        rows = len(log_predictions)
+        self._ensure_worker()
+        with self._buffer_lock:
+            if self._closed or self._buffered_rows + rows > self.max_buffer:
+                self.dropped += rows
+                return False
+            self._buffer.append((time.time(), endpoint, model_version, latency_ms, features, log_predictions))
+            self._buffered_rows += rows
+            full_enough = self._buffered_rows >= self.flush_rows
+        if full_enough:
+            self._wake.set()
+        return True
+
+    def _ensure_worker(self):
+        # Threads and open files don't carry over a fork, so each process starts its own
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._buffer.clear()
+                self._buffered_rows = 0
+                self._file = None
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='prediction-log', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    @staticmethod
+    def _lines(item):
+        timestamp, endpoint, model_version, latency_ms, features, log_predictions = item
+        prices = np.round(np.expm1(np.asarray(log_predictions, dtype=float)), 2).tolist()
+        if isinstance(features, dict):
+            columns = {name: np.asarray(values).tolist() for name, values in features.items()}
+            features = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        ts = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+        latency = round(latency_ms, 3) if latency_ms is not None else None
+        for row, price in zip(features, prices):
+            yield json.dumps({'ts': ts, 'endpoint': endpoint, 'model_version': model_version,
+                              'latency_ms': latency, 'features': row, 'predicted_price': price},
+                             default=str) + '\n'
+
+    def flush(self):
+        """Write everything buffered so far (called by the background thread and by close)"""
+        with self._write_lock:
+            with self._buffer_lock:
+                items = list(self._buffer)
+                self._buffer.clear()
+                self._buffered_rows = 0
+            if not items:
+                self._rotate_if_due()
+                return
+            try:
+                text = ''.join(line for item in items for line in self._lines(item))
+                self._rotate_if_due()
+                if self._file is None:
+                    self._open()
+                self._file.write(text.encode('utf-8'))
+                self._file.flush()   # sync flush, so a crash loses at most the unflushed buffer
+                self.written += text.count('\n')
+                self._rotate_if_due()
+            except Exception:
+                self.write_errors += 1
+                self.dropped += sum(len(item[5]) for item in items)
+
+    def _open(self):
+        self._sequence += 1
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        name = f'predictions-{stamp}-{os.getpid()}-{self._sequence:04d}.jsonl.gz'
+        self._file_path = os.path.join(self.directory, name)
+        self._file = gzip.open(self._file_path + '.open', 'wb')
+        self._file_opened = time.time()
+
+    def _rotate_if_due(self):
+        if self._file is None:
+            return
+        too_big = self._file.fileobj.tell() >= self.max_file_bytes
+        too_old = time.time() - self._file_opened >= self.max_file_seconds
+        if too_big or too_old:
+            self._close_file()
+
+    def _close_file(self):
+        self._file.close()
+        os.replace(self._file_path + '.open', self._file_path)
+        self._file = None
+        self.files_closed += 1
+
+    def close(self):
+        """Stop the background thread, write what's left and close the current file"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._worker is not None and self._worker_pid == os.getpid():
+            self._worker.join(timeout=10)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._close_file()
+
+    def stats(self):
+        return {
+            'directory': self.directory,
+            'written': self.written,
+            'dropped': self.dropped,
+            'buffered': self._buffered_rows,
+            'max_buffer': self.max_buffer,
+            'files_closed': self.files_closed,
+            'current_file': os.path.basename(self._file_path) if self._file is not None else None,
+            'write_errors': self.write_errors,
+        }
@@ -0,0 +1,94 @@
+"""
+Sampling profiler that can be switched on in a live pod
+
+A background thread wakes up every few milliseconds, looks at what every other
+thread is executing (sys._current_frames) and counts each call stack. Stacks
+that show up often are where the time goes. Nothing is hooked into the code
+being profiled, so the cost is just the sampling thread, and only while it runs.
+
+Output is the "folded" format used by flamegraph.pl / speedscope:
+    app.py:predict_simple;app.py:predict_log_price;kernel.py:predict_records 42
+
+The /debug/profile routes in app.py that drive it are admin routes: they need
+the X-Admin-Token header and are switched off when ADMIN_TOKEN isn't set.
+"""
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """Start it, let traffic run, read the folded stacks"""
+
+    def __init__(self, max_stacks=5000):
+        self.max_stacks = max_stacks  # distinct stacks kept, so memory stays bounded
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.stacks = {}
+        self.samples = 0
+        self.dropped = 0
+        self.interval = None
+        self.started_at = None
+        self.ends_at = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_ms=5.0, seconds=30.0):
+        """Sample every interval_ms for up to `seconds` (results from any earlier run are cleared)"""
+        if self.running:
+            raise RuntimeError('Profiler is already running')
+        with self._lock:
+            self.stacks, self.samples, self.dropped = {}, 0, 0
+        self.interval = interval_ms / 1000.0
+        self.started_at = time.time()
+        self.ends_at = self.started_at + seconds
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval) and time.time() < self.ends_at:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                key = ';'.join(reversed(stack))
+                with self._lock:
+                    self.samples += 1
+                    if key in self.stacks:
+                        self.stacks[key] += 1
+                    elif len(self.stacks) < self.max_stacks:
+                        self.stacks[key] = 1
+                    else:
+                        self.dropped += 1
+
+    def folded(self, top=None):
+        """Stacks in folded format, most frequent first"""
+        with self._lock:
+            ranked = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return '\n'.join(f'{stack} {count}' for stack, count in ranked[:top]) + '\n'
+
+    def status(self):
+        return {
+            'running': self.running,
+            'interval_ms': self.interval * 1000 if self.interval else None,
+            'started_at': self.started_at,
+            'ends_at': self.ends_at,
+            'samples': self.samples,
+            'distinct_stacks': len(self.stacks),
+            'dropped_samples': self.dropped,
+        }
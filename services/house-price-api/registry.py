@@ -0,0 +1,158 @@
+"""
+Registry of every saved model in the project, loaded on demand
+
+Finds all models/<name>/saved_model/*.pkl files, but only loads one the first
+time somebody asks for it. Loaded models count against a memory budget, and
+when a new one doesn't fit, the least recently used ones are unloaded first.
+If a file changes on disk (e.g. train.py --promote), the next get() loads it again.
+
+This way one pool of pods can serve every model we own instead of
+running a separate deployment per model.
+"""
+import glob
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+from sklearn.base import is_classifier
+
+
+class ModelNotFound(KeyError):
+    """Raised when someone asks for a model the registry doesn't know about"""
+
+
+class ModelRegistry:
+    """
+    Lazy-loading, memory-bounded collection of models
+
+    Memory use is estimated from the artifact size on disk: the pickles are
+    mostly numpy arrays, so their file size is a good, cheap proxy for the
+    memory they take once loaded (and we know it before loading)
+    """
+
+    def __init__(self, models_root='models', memory_budget_mb=256):
+        self.models_root = models_root
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self._artifacts = {}           # name -> path of the .pkl
+        self._loaded = OrderedDict()   # name -> model, least recently used first
+        self._loaded_at = {}
+        self._stamps = {}              # name -> (mtime, size) of the file we loaded
+        self._lock = threading.Lock()
+        self._loading = {}             # name -> lock held while that model is being loaded
+        self.loads = 0
+        self.evictions = 0
+        self.reloads = 0
+        self.discover()
+
+    def discover(self):
+        """Scan models/*/saved_model/*.pkl, naming each model after its folder"""
+        found = {}
+        for model_dir in sorted(glob.glob(os.path.join(self.models_root, '*', 'saved_model'))):
+            folder = os.path.basename(os.path.dirname(model_dir))
+            pickles = sorted(glob.glob(os.path.join(model_dir, '*.pkl')))
+            for path in pickles:
+                # One artifact per folder is the normal case; if there are several,
+                # tell them apart by file name, e.g. house_price.ridge_regression
+                stem = os.path.splitext(os.path.basename(path))[0]
+                found[folder if len(pickles) == 1 else f'{folder}.{stem}'] = path
+        with self._lock:
+            self._artifacts = found
+        return list(found)
+
+    def names(self):
+        return list(self._artifacts)
+
+    def _size(self, name):
+        return os.path.getsize(self._artifacts[name])
+
+    def _stamp(self, name):
+        try:
+            stat = os.stat(self._artifacts[name])
+        except OSError:
+            # Deleted (or moved) since discover() saw it
+            raise ModelNotFound(name) from None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _used(self):
+        # Sizes as they were when each model was loaded, no disk access needed
+        return sum(self._stamps[name][1] for name in self._loaded)
+
+    def _cached(self, name, stamp):
+        """The loaded model if it's still the one on disk (call with the lock held)"""
+        model = self._loaded.get(name)
+        if model is not None and self._stamps.get(name) == stamp:
+            self._loaded.move_to_end(name)
+            return model
+        return None
+
+    def get(self, name):
+        """Return the model called name, loading it (and evicting others) if needed"""
+        if name not in self._artifacts:
+            raise ModelNotFound(name)
+        stamp = self._stamp(name)
+        with self._lock:
+            model = self._cached(name, stamp)
+            if model is not None:
+                return model
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        # Unpickling can take a while, so do it outside self._lock: requests for
+        # models that are already loaded shouldn't wait for it. The per-name lock
+        # makes a burst of requests for the same model load it only once
+        with loading:
+            with self._lock:
+                model = self._cached(name, stamp)
+                if model is not None:
+                    return model
+            try:
+                model = joblib.load(self._artifacts[name])
+            except FileNotFoundError:
+                raise ModelNotFound(name) from None
+
+            with self._lock:
+                if name in self._loaded:
+                    # The file was replaced since we loaded it, so this is a reload
+                    del self._loaded[name]
+                    self.reloads += 1
+                # Make room: drop the least recently used models until this one fits
+                # (requests already holding an evicted model keep using their reference)
+                while self._loaded and self._used() + stamp[1] > self.memory_budget:
+                    self._loaded.popitem(last=False)
+                    self.evictions += 1
+                self._loaded[name] = model
+                self._loaded_at[name] = time.time()
+                self._stamps[name] = stamp
+                self.loads += 1
+                return model
+
+    def info(self, name):
+        if name not in self._artifacts:
+            raise ModelNotFound(name)
+        model = self._loaded.get(name)
+        details = {
+            'name': name,
+            'path': self._artifacts[name],
+            'size_bytes': self._size(name),
+            'loaded': model is not None,
+        }
+        if model is not None:
+            details['type'] = 'classifier' if is_classifier(model) else 'regressor'
+            details['estimator'] = type(model[-1] if hasattr(model, 'steps') else model).__name__
+            details['features_required'] = list(getattr(model, 'feature_names_in_', []))
+            if is_classifier(model):
+                details['classes'] = [str(c) for c in model.classes_]
+        return details
+
+    def stats(self):
+        with self._lock:
+            return {
+                'models': len(self._artifacts),
+                'loaded': list(self._loaded),
+                'memory_used_bytes': self._used(),
+                'memory_budget_bytes': self.memory_budget,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'reloads': self.reloads,
+            }
@@ -0,0 +1,154 @@
+"""
+Offline bulk scoring of a CSV of houses - no HTTP involved
+
+Reads the input in fixed-size chunks, scores the chunks in parallel in a pool
+of worker processes (each loads the model once), and streams the predictions
+to the output file in the same order as the input. Only a handful of chunks
+are in memory at any time, so the file can be far bigger than RAM.
+
+Missing values are handled exactly like in training: Lot Frontage gets the
+median and Electrical the most common value of the training data.
+
+Run from the project root:
+    python services/house-price-api/score_csv.py data/test_new.csv predictions.csv --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from kernel import compile_pipeline
+
+DEFAULT_MODEL = 'models/house_price/saved_model/elastic_net_regression.pkl'
+
+# Set in each worker process by _init_worker, so the model is loaded once per worker
+_model = None
+_kernel = None
+_fill_values = None
+
+
+def training_fill_values(reference_csv):
+    """The values training used for missing data (see the regression notebook)"""
+    train = pd.read_csv(reference_csv, usecols=['Lot Frontage', 'Electrical'])
+    return {
+        'Lot Frontage': float(train['Lot Frontage'].median()),
+        'Electrical': train['Electrical'].mode()[0],
+    }
+
+
+def _init_worker(model_path, fill_values, use_kernel):
+    global _model, _kernel, _fill_values
+    _model = joblib.load(model_path)
+    _fill_values = fill_values
+    _kernel = None
+    if use_kernel:
+        try:
+            _kernel = compile_pipeline(_model)
+        except ValueError:
+            pass  # not a linear pipeline, score with sklearn instead
+
+
+def score_chunk(chunk, id_column):
+    """Predict prices for one chunk; rows that still have missing numbers get NaN"""
+    features = list(_model.feature_names_in_)
+    chunk = chunk.fillna(_fill_values)
+    usable = ~chunk[features].isna().any(axis=1).to_numpy()
+
+    log_prices = np.full(len(chunk), np.nan)
+    if usable.any():
+        scored = chunk.loc[usable, features]
+        if _kernel is not None:
+            # Column arrays straight into the kernel - no per-row Python objects
+            log_prices[usable] = _kernel.predict_columns({f: scored[f].to_numpy() for f in features})
+        else:
+            log_prices[usable] = _model.predict(scored)
+
+    output = pd.DataFrame({'predicted_price': np.round(np.expm1(log_prices), 2)})
+    if id_column in chunk.columns:
+        output.insert(0, id_column, chunk[id_column].to_numpy())
+    return output, int((~usable).sum())
+
+
+def score_file(input_csv, output_csv, model_path=DEFAULT_MODEL, reference_csv='data/train_new.csv',
+               chunksize=50_000, workers=None, id_column='PID', use_kernel=True, progress=None):
+    """
+    Score input_csv into output_csv and return a summary dict
+    At most 2 chunks per worker are in flight, which bounds memory use
+    """
+    workers = workers or os.cpu_count() or 1
+    fill_values = training_fill_values(reference_csv)
+    started = time.perf_counter()
+    rows = skipped = chunks = 0
+
+    def write(result):
+        nonlocal rows, skipped, chunks
+        output, n_skipped = result
+        output.to_csv(out, header=(chunks == 0), index=False)
+        rows += len(output)
+        skipped += n_skipped
+        chunks += 1
+        if progress:
+            progress(rows, time.perf_counter() - started)
+
+    reader = pd.read_csv(input_csv, chunksize=chunksize)
+    with open(output_csv, 'w', newline='') as out:
+        if workers == 1:
+            _init_worker(model_path, fill_values, use_kernel)
+            for chunk in reader:
+                write(score_chunk(chunk, id_column))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                     initargs=(model_path, fill_values, use_kernel)) as pool:
+                in_flight = deque()
+                for chunk in reader:
+                    in_flight.append(pool.submit(score_chunk, chunk, id_column))
+                    # Write finished chunks in input order; block once the window is full
+                    while in_flight and (in_flight[0].done() or len(in_flight) >= 2 * workers):
+                        write(in_flight.popleft().result())
+                while in_flight:
+                    write(in_flight.popleft().result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': rows,
+        'rows_skipped': skipped,
+        'chunks': chunks,
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='CSV with the 23 model columns (extra columns are ignored)')
+    parser.add_argument('output', help='where to write the predictions CSV')
+    parser.add_argument('--model', default=DEFAULT_MODEL)
+    parser.add_argument('--reference', default='data/train_new.csv',
+                        help='training CSV used for the missing-value fill (median/mode)')
+    parser.add_argument('--chunksize', type=int, default=50_000, help='rows per chunk')
+    parser.add_argument('--workers', type=int, help='worker processes (default: all CPUs)')
+    parser.add_argument('--id-column', default='PID', help='copied to the output if present')
+    parser.add_argument('--no-kernel', action='store_true', help='score with sklearn instead of the compiled kernel')
+    args = parser.parse_args()
+
+    def progress(rows, seconds):
+        print(f'\r{rows:,} rows scored ({rows / seconds:,.0f} rows/s)', end='', file=sys.stderr)
+
+    summary = score_file(args.input, args.output, args.model, args.reference, args.chunksize,
+                         args.workers, args.id_column, not args.no_kernel, progress)
+    print(file=sys.stderr)
+    print(f"Scored {summary['rows']:,} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']:,} rows/s, {summary['workers']} workers)")
+    if summary['rows_skipped']:
+        print(f"{summary['rows_skipped']:,} rows had missing values we can't fill and got no prediction")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Shadow scoring: try a candidate model on real traffic before promoting it
+
+Every prediction the live model makes is also handed to the ShadowScorer,
+together with the live answer. That costs the request one non-blocking put
+on a queue; if the queue is full the item is simply dropped (and counted),
+so a slow candidate can never slow down /predict. The queue is bounded by
+rows, not items: one 10,000-row bulk payload takes as much room as 10,000
+single /predict calls.
+
+A background thread takes items off the queue in batches, scores them with
+the candidate model and keeps running comparison numbers:
+  - mean difference in dollars and in percent (candidate vs live)
+  - percentiles of the percent difference (from a fixed-size random sample)
+  - the share of predictions that differ by more than threshold_pct
+
+The candidate never answers a user. Nothing here changes what /predict returns.
+"""
+import os
+import queue
+import random
+import threading
+import time
+
+import numpy as np
+
+
+class ShadowScorer:
+    """
+    Scores mirrored traffic with `candidate` (a LoadedModel) in the background
+    and compares it with the live model's predictions
+    max_queue: how many rows can wait (or be in the middle of scoring) at once
+    """
+
+    def __init__(self, candidate, max_queue=10000, batch_size=256, threshold_pct=5.0, sample_size=10000):
+        self.candidate = candidate
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.threshold_pct = threshold_pct
+        self.sample_size = sample_size
+        self._queue = queue.Queue()
+        self._queued_rows = 0
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._stopped = False
+        self.dropped = 0
+        self.started_at = time.time()
+        self._reset_stats(None)
+
+    def _reset_stats(self, primary_version):
+        self.primary_version = primary_version
+        self.compared = 0
+        self.failed = 0
+        self.over_threshold = 0
+        self._sum_diff = 0.0
+        self._sum_pct = 0.0
+        self._sum_abs_pct = 0.0
+        self._sum_primary = 0.0
+        self._sum_candidate = 0.0
+        self._sample = []  # reservoir sample of percent differences, for percentiles
+        self._seen = 0
+        self._rng = random.Random(0)
+
+    def _ensure_worker(self):
+        # Same fork rule as the micro-batcher: each process needs its own thread
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._queued_rows = 0
+                self._worker_pid = os.getpid()
+                self._worker = threading.Thread(target=self._run, name='shadow-scorer', daemon=True)
+                self._worker.start()
+
+    def submit(self, features, primary_log_prices, primary_version):
+        """
+        Mirror scored traffic to the candidate. Never blocks
+        features: a list of 23-feature dicts, or {column: array} for bulk payloads
+        Returns False if there wasn't room for all its rows and it was dropped
+        """
+        if self._stopped:
+            return False
+        self._ensure_worker()
+        rows = len(primary_log_prices)
+        with self._lock:
+            if self._queued_rows + rows > self.max_queue:
+                self.dropped += rows
+                return False
+            self._queued_rows += rows
+        self._queue.put_nowait((features, primary_log_prices, primary_version))
+        return True
+
+    def stop(self):
+        """Stop mirroring; the worker finishes what it's doing and exits"""
+        self._stopped = True
+        self._queue.put_nowait(None)
+
+    def _collect(self):
+        """Block for the first item, then take whatever else is already waiting (up to batch_size rows)"""
+        batch = [self._queue.get()]
+        rows = self._item_rows(batch[0])
+        while rows < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += self._item_rows(item)
+        return batch
+
+    @staticmethod
+    def _item_rows(item):
+        return 0 if item is None else len(item[1])
+
+    def _run(self):
+        while not self._stopped:
+            batch = [item for item in self._collect() if item is not None]
+            rows = [item for item in batch if isinstance(item[0], list)]
+            columns = [item for item in batch if isinstance(item[0], dict)]
+            # All single rows and JSON batches scored by the same live model go
+            # through ONE candidate call (normally there's only one live version)
+            for version in dict.fromkeys(item[2] for item in rows):
+                same = [item for item in rows if item[2] == version]
+                try:
+                    candidate = self.candidate.predict([row for item in same for row in item[0]])
+                    primary = np.concatenate([np.asarray(item[1], dtype=float) for item in same])
+                    self._compare(version, primary, candidate)
+                except Exception:
+                    self._count_failed(same)
+            for item in columns:
+                features, primary, version = item
+                try:
+                    self._compare(version, np.asarray(primary, dtype=float), self.candidate.predict_columns(features))
+                except Exception:
+                    self._count_failed([item])
+            # Only now are these rows out of memory, so only now do they free up room
+            with self._lock:
+                self._queued_rows -= sum(self._item_rows(item) for item in batch)
+
+    def _count_failed(self, items):
+        # Only the rows of the candidate call that failed, not the whole batch
+        with self._lock:
+            self.failed += sum(self._item_rows(item) for item in items)
+
+    def _compare(self, primary_version, primary_log, candidate_log):
+        primary = np.expm1(primary_log)
+        candidate = np.expm1(np.asarray(candidate_log, dtype=float))
+        diff = candidate - primary
+        pct = diff / primary * 100
+        with self._lock:
+            # A new live model makes the old comparison meaningless, so start over
+            if primary_version != self.primary_version:
+                self._reset_stats(primary_version)
+            self.compared += len(pct)
+            self.over_threshold += int(np.count_nonzero(np.abs(pct) > self.threshold_pct))
+            self._sum_diff += float(diff.sum())
+            self._sum_pct += float(pct.sum())
+            self._sum_abs_pct += float(np.abs(pct).sum())
+            self._sum_primary += float(primary.sum())
+            self._sum_candidate += float(candidate.sum())
+            # Reservoir sampling keeps a uniform sample of everything seen, in fixed memory
+            for value in pct.tolist():
+                self._seen += 1
+                if len(self._sample) < self.sample_size:
+                    self._sample.append(value)
+                else:
+                    slot = self._rng.randrange(self._seen)
+                    if slot < self.sample_size:
+                        self._sample[slot] = value
+
+    def stats(self):
+        """Running comparison of candidate vs live predictions"""
+        with self._lock:
+            n = self.compared
+            sample = np.array(self._sample) if self._sample else np.zeros(1)
+            return {
+                'candidate': self.candidate.describe(),
+                'primary_version': self.primary_version,
+                'running': not self._stopped,
+                'started_at': self.started_at,
+                'compared': n,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'queue_depth': self._queued_rows,  # rows, including the batch being scored
+                'threshold_pct': self.threshold_pct,
+                'share_over_threshold': self.over_threshold / n if n else None,
+                'mean_primary_price': self._sum_primary / n if n else None,
+                'mean_candidate_price': self._sum_candidate / n if n else None,
+                'mean_diff': self._sum_diff / n if n else None,
+                'mean_diff_pct': self._sum_pct / n if n else None,
+                'mean_abs_diff_pct': self._sum_abs_pct / n if n else None,
+                'diff_pct_percentiles': {
+                    f'p{q}': float(np.percentile(sample, q)) if n else None for q in (1, 5, 50, 95, 99)
+                },
+            }
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import app as service
+from admission import BATCH, INTERACTIVE, AdmissionController, Rejected
+
+client = service.app.test_client()
+
+house = {"lot_area": 9605, "overall_qual": 7, "year_built": 2000,
+         "gr_liv_area": 1218, "bedrooms": 3, "bathrooms": 2}
+
+
+def wait_in_background(controller, priority, results, name):
+    def run():
+        try:
+            controller.acquire(priority)
+            results.append(name)
+        except Rejected as e:
+            results.append(f'{name}:{e.reason}')
+    thread = threading.Thread(target=run)
+    thread.start()
+    deadline = time.time() + 2
+    while controller.queue_depth() == 0 and thread.is_alive() and time.time() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_waiters_are_admitted_interactive_first():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=2)
+    controller.acquire()
+    results = []
+    batch = wait_in_background(controller, BATCH, results, 'batch')
+    interactive = threading.Thread(target=lambda: (controller.acquire(INTERACTIVE), results.append('interactive')))
+    interactive.start()
+    while controller.queue_depth() < 2:
+        time.sleep(0.001)
+
+    controller.release()
+    interactive.join(2)
+    assert results == ['interactive']
+    controller.release()
+    batch.join(2)
+    assert results == ['interactive', 'batch'] and controller.in_flight == 1
+
+
+def test_full_line_rejects_fast_but_interactive_bumps_batch():
+    controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=2)
+    controller.acquire()
+    results = []
+    batch = wait_in_background(controller, BATCH, results, 'batch')
+
+    started = time.perf_counter()
+    with pytest.raises(Rejected) as rejected:
+        controller.acquire(BATCH)
+    assert rejected.value.status == 429 and time.perf_counter() - started < 0.1
+
+    interactive = wait_in_background(controller, INTERACTIVE, results, 'interactive')
+    batch.join(2)
+    assert results == ['batch:bumped']
+    controller.release()
+    interactive.join(2)
+    assert results == ['batch:bumped', 'interactive']
+    assert controller.stats()['rejected'] == {'batch_bumped': 1, 'batch_queue_full': 1}
+
+
+def test_waiting_past_the_deadline_gives_503():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.05)
+    controller.acquire()
+    with pytest.raises(Rejected) as rejected:
+        controller.acquire()
+    assert rejected.value.status == 503 and rejected.value.reason == 'timeout'
+    assert controller.queue_depth() == 0
+
+
+def test_overloaded_service_sheds_predictions_only(monkeypatch):
+    controller = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=0.05, retry_after=2)
+    monkeypatch.setattr(service, 'admission', controller)
+    controller.acquire()   # somebody else is using the only slot
+
+    response = client.post('/predict/simple', json=house)
+    assert response.status_code == 429 and response.headers['Retry-After'] == '2'
+    assert client.get('/healthz/live').status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'admission_in_flight{pid=' in text and '# TYPE admission_in_flight gauge' in text
+    assert '# TYPE admission_rejected_total counter' in text
+    assert 'admission_rejected_total{priority="interactive",reason="queue_full",pid=' in text
+
+    controller.release()
+    assert client.post('/predict/simple', json=house).status_code == 200
+    assert controller.in_flight == 0
+    assert client.get('/admission/stats').get_json()['admitted'] == {'interactive': 2, 'batch': 0}
+
+
+def test_explain_priority_follows_the_number_of_records(monkeypatch):
+    controller = AdmissionController(max_concurrent=4)
+    monkeypatch.setattr(service, 'admission', controller)
+
+    assert client.post('/explain', json=house).status_code == 200
+    assert client.post('/explain', json={'records': [house]}).status_code == 200
+    assert controller.stats()['admitted'] == {'interactive': 2, 'batch': 0}
+
+    assert client.post('/explain', json=[house, house, house]).status_code == 200
+    assert client.post('/explain', json={'records': [house, house]}).status_code == 200
+    assert controller.stats()['admitted'] == {'interactive': 2, 'batch': 2}
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from app import app, model_manager, FEATURES_REQUIRED
+
+client = app.test_client()
+
+FULL_HOUSE = {
+    "Lot Frontage": 80.0, "Lot Area": 9605, "Street": "Pave", "Neighborhood": "SawyerW",
+    "Bldg Type": "1Fam", "House Style": "1Story", "Overall Qual": 7, "Overall Cond": 6,
+    "Year Built": 2000, "Roof Style": "Gable", "Heating": "GasA", "Central Air": "Y",
+    "Electrical": "SBrkr", "Full Bath": 2, "Half Bath": 1, "Bedroom AbvGr": 3,
+    "TotRms AbvGrd": 6, "Gr Liv Area": 1800, "Functional": "Typ", "Screen Porch": 0,
+    "Pool Area": 0, "Yr Sold": 2009, "Sale Type": "WD"
+}
+
+SIMPLE_HOUSE = {
+    "lot_area": 8500, "overall_qual": 7, "year_built": 2005,
+    "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2
+}
+
+
+def test_batch_matches_single_endpoints():
+    """Every batch row should get the exact price the single-row routes give"""
+    full = client.post('/predict', json=FULL_HOUSE).get_json()['predicted_price']
+    simple = client.post('/predict/simple', json=SIMPLE_HOUSE).get_json()['predicted_price']
+
+    response = client.post('/predict/batch', json={'records': [FULL_HOUSE, SIMPLE_HOUSE]})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['count'] == 2 and result['errors'] == 0
+    assert [p['predicted_price'] for p in result['predictions']] == [full, simple]
+
+
+def test_batch_reports_errors_per_row_and_keeps_order():
+    missing = {k: v for k, v in FULL_HOUSE.items() if k != "Gr Liv Area"}
+    records = [SIMPLE_HOUSE, missing, {"lot_area": "big"}, "not a record", FULL_HOUSE]
+
+    result = client.post('/predict/batch', json=records).get_json()
+    predictions = result['predictions']
+    assert [p['index'] for p in predictions] == [0, 1, 2, 3, 4]
+    assert 'predicted_price' in predictions[0]
+    assert 'Gr Liv Area' in predictions[1]['error']
+    assert 'lot_area' in predictions[2]['error']
+    assert 'error' in predictions[3]
+    assert 'predicted_price' in predictions[4]
+    assert result['errors'] == 3
+
+
+def test_batch_scores_the_training_set():
+    train = pd.read_csv('data/train_new.csv').dropna()
+    records = train[FEATURES_REQUIRED].to_dict(orient='records')
+
+    result = client.post('/predict/batch', json={'records': records}).get_json()
+    prices = np.array([p['predicted_price'] for p in result['predictions']])
+    expected = np.round(np.expm1(model_manager.active.model.predict(train[FEATURES_REQUIRED])), 2)
+    np.testing.assert_allclose(prices, expected, rtol=1e-9)
+
+
+def test_batch_rejects_empty_input():
+    assert client.post('/predict/batch', json={'records': []}).status_code == 400
+
+
+def test_body_that_is_not_json_is_a_400_not_a_500():
+    for path in ('/predict', '/predict/simple', '/predict/batch', '/explain', '/models/house_price/predict'):
+        assert client.post(path, data='lot_area=9000', content_type='text/plain').status_code == 400
+        assert client.post(path, data='{not json', content_type='application/json').status_code == 400
@@ -0,0 +1,85 @@
+import threading
+import time
+
+import numpy as np
+
+import app as service
+from batching import MicroBatcher
+
+
+def slow_double(rows):
+    """Fake model: doubles each row, and takes a little time like a real predict"""
+    time.sleep(0.005)
+    return [row * 2 for row in rows]
+
+
+def run_concurrently(fn, n):
+    results = [None] * n
+
+    def call(i):
+        results[i] = fn(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_rows_share_batches_and_get_their_own_result():
+    batcher = MicroBatcher(slow_double, max_wait_ms=20, max_batch_size=16)
+    results = run_concurrently(batcher.submit, 48)
+
+    assert results == [i * 2 for i in range(48)]
+    stats = batcher.stats()
+    assert stats['rows'] == 48
+    assert stats['batches'] < 48
+    assert stats['largest_batch'] <= 16
+    assert stats['queue_wait_ms']['max'] >= 0
+
+
+def test_bad_row_only_fails_its_own_caller():
+    def picky(rows):
+        if 'bad' in rows:
+            raise ValueError('bad row')
+        return [len(row) for row in rows]
+
+    batcher = MicroBatcher(picky, max_wait_ms=20, max_batch_size=8)
+    results = run_concurrently(lambda i: _safe(batcher.submit, 'bad' if i == 3 else 'ok' * i), 6)
+
+    assert isinstance(results[3], ValueError)
+    assert [r for i, r in enumerate(results) if i != 3] == [0, 2, 4, 8, 10]
+
+
+def test_rows_are_scored_by_the_model_they_were_submitted_with():
+    # Half the rows were submitted before a reload and half after: each
+    # half has to be answered by its own model even when they share a window
+    old, new = (lambda rows: [row + 1000 for row in rows]), (lambda rows: [row + 2000 for row in rows])
+    batcher = MicroBatcher(lambda rows, model: model(rows), max_wait_ms=20, max_batch_size=16)
+    results = run_concurrently(lambda i: batcher.submit(i, old if i % 2 else new), 16)
+
+    assert results == [i + (1000 if i % 2 else 2000) for i in range(16)]
+
+
+def _safe(fn, arg):
+    try:
+        return fn(arg)
+    except Exception as e:
+        return e
+
+
+def test_routes_give_same_price_with_micro_batching(monkeypatch):
+    monkeypatch.setattr(service, 'prediction_cache', None)  # every request should reach the batcher
+    client = service.app.test_client()
+    house = {"lot_area": 8500, "overall_qual": 7, "year_built": 2005,
+             "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2}
+    expected = client.post('/predict/simple', json=house).get_json()['predicted_price']
+
+    monkeypatch.setattr(service, 'batcher', MicroBatcher(service.predict_log_prices, max_wait_ms=5))
+    prices = run_concurrently(
+        lambda i: client.post('/predict/simple', json=house).get_json()['predicted_price'], 20)
+
+    np.testing.assert_allclose(prices, expected)
+    stats = client.get('/batching/stats').get_json()
+    assert stats['enabled'] and stats['rows'] == 20
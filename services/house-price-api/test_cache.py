@@ -0,0 +1,51 @@
+import time
+
+import app as service
+from cache import PredictionCache
+
+HOUSE = {"lot_area": 8500, "overall_qual": 7, "year_built": 2000,
+         "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    cache.put('v1', 'a', 1.0)
+    cache.put('v1', 'b', 2.0)
+    assert cache.get('v1', 'a') == 1.0  # 'a' is now the most recent
+    cache.put('v1', 'c', 3.0)            # so 'b' gets evicted
+    assert cache.get('v1', 'b') is None
+    assert cache.get('v1', 'c') == 3.0
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 1, 1)
+
+
+def test_entries_expire_after_ttl():
+    cache = PredictionCache(max_entries=10, ttl_seconds=0.01)
+    cache.put('v1', 'a', 1.0)
+    time.sleep(0.02)
+    assert cache.get('v1', 'a') is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_new_model_version_invalidates_everything():
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    cache.put('v1', 'a', 1.0)
+    assert cache.get('v2', 'a') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_repeat_simple_and_full_requests_hit_the_cache(monkeypatch):
+    monkeypatch.setattr(service, 'prediction_cache', PredictionCache(16, 60))
+    client = service.app.test_client()
+
+    first = client.post('/predict/simple', json=HOUSE).get_json()['predicted_price']
+    second = client.post('/predict/simple', json=dict(reversed(list(HOUSE.items())))).get_json()['predicted_price']
+    # The same house sent to /predict (with 3.0 instead of 3) is the same cache entry
+    full = service.build_simple_features(HOUSE)
+    full["Bedroom AbvGr"] = 3.0
+    third = client.post('/predict', json=full).get_json()['predicted_price']
+
+    assert first == second == third
+    stats = client.get('/cache/stats').get_json()
+    assert stats['hits'] == 2 and stats['misses'] == 1
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as service
+from drift import CategoricalSummary, DriftMonitor, NumericSummary, reference_edges
+
+client = service.app.test_client()
+
+# Cleaned like the reference the monitor builds (median Lot Frontage, most common Electrical)
+train = pd.read_csv('data/train_new.csv')
+train = train.fillna({'Lot Frontage': train['Lot Frontage'].median(), 'Electrical': train['Electrical'].mode()[0]})
+
+
+def make_monitor(**kwargs):
+    return DriftMonitor.from_csv('data/train_new.csv', service.NUMERIC_FEATURES, service.CATEGORICAL_FEATURES,
+                                 fold_interval=3600, **kwargs)
+
+
+def test_numeric_summary_matches_numpy_in_constant_memory():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1500, 400, 20_000)
+    summary = NumericSummary(reference_edges(values[:1000], 20))
+    for chunk in np.array_split(values, 37):
+        summary.update(chunk)
+
+    assert summary.count == len(values)
+    assert summary.mean == pytest.approx(values.mean())
+    assert summary.std == pytest.approx(values.std(ddof=1))
+    assert summary.quantile(0.5) == pytest.approx(np.median(values), rel=0.02)
+    assert summary.quantile(0.95) == pytest.approx(np.quantile(values, 0.95), rel=0.02)
+    assert len(summary.counts) == len(summary.edges) + 1 <= 25
+
+
+def test_unseen_categories_are_counted_but_bounded():
+    summary = CategoricalSummary(['NAmes', 'OldTown'], max_unseen=3)
+    summary.update(['NAmes', 'NAmes'] + [f'New{i}' for i in range(10)])
+    assert summary.counts.tolist() == [2, 0]
+    assert len(summary.unseen) == 3 and summary.unseen_other == 7 and summary.unseen_count == 10
+
+
+def test_training_data_does_not_drift_but_defaults_do():
+    monitor = make_monitor()
+    monitor.observe({name: train[name].to_numpy() for name in service.FEATURES_REQUIRED}, 'batch')
+    report = monitor.report()
+    assert report['rows'] == len(train)
+    assert report['summary'] == {'shifted': [], 'drifting': []}
+
+    houses = [service.build_simple_features({'lot_area': a, 'gr_liv_area': 1500}) for a in range(8000, 8200)]
+    for house in houses:
+        monitor.observe([{**house, 'Neighborhood': 'Atlantis'}], 'simple')
+    report = monitor.report('simple')
+    assert report['rows'] == len(houses)
+    assert 'Yr Sold' in report['summary']['shifted']       # 2023 is after every training sale
+    neighborhood = report['features']['Neighborhood']
+    assert neighborhood['unseen_share'] == 1.0 and neighborhood['unseen_values'] == {'Atlantis': len(houses)}
+    assert monitor.report()['rows_by_source'] == {'batch': len(train), 'simple': len(houses)}
+
+
+def test_pending_inputs_are_bounded_by_rows():
+    monitor = make_monitor(max_pending=1000)
+    bulk = {name: train[name].to_numpy()[:600] for name in service.FEATURES_REQUIRED}
+    monitor.observe(bulk, 'batch')
+    monitor.observe(bulk, 'batch')  # 1,200 rows wouldn't fit, so this one is dropped whole
+    monitor.observe([service.build_simple_features({})] * 400, 'simple')
+    report = monitor.report()
+    assert report['rows'] == 1000 and report['dropped'] == 600
+
+    # Folding frees the room up again
+    monitor.observe(bulk, 'batch')
+    assert monitor.report()['rows'] == 1600
+
+
+def test_drift_endpoint(monkeypatch):
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', 'secret')
+    assert client.delete('/monitor/drift').status_code == 403
+    assert client.delete('/monitor/drift', headers={'X-Admin-Token': 'secret'}).status_code == 200
+    house = {"lot_area": 9605, "overall_qual": 7, "year_built": 2000,
+             "gr_liv_area": 1218, "bedrooms": 3, "bathrooms": 2}
+    for i in range(20):
+        client.post('/predict/simple', json={**house, 'lot_area': 9000 + i})
+    client.post('/predict/batch', json={'records': train[service.FEATURES_REQUIRED].head(50).to_dict(orient='records')})
+
+    report = client.get('/monitor/drift?source=simple').get_json()
+    assert report['enabled'] and report['rows'] == 20
+    assert report['features']['Yr Sold']['status'] == 'shifted'
+    assert report['features']['Lot Area']['live']['min'] == 9000
+    assert client.get('/monitor/drift').get_json()['rows_by_source'] == {'simple': 20, 'batch': 50}
+    assert 'feature_drift_psi{feature="Yr Sold"' in client.get('/metrics').get_data(as_text=True)
@@ -0,0 +1,48 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluate import (DEFAULTED_FEATURES, SIMPLE_FROM_COLUMNS, bootstrap, errors, evaluate,
+                      load_labelled, simple_columns)
+from features import FEATURES_REQUIRED, build_simple_features
+from score_csv import DEFAULT_MODEL
+
+model = joblib.load(DEFAULT_MODEL)
+full, true_log = load_labelled('data/train_new.csv')
+
+
+def test_both_paths_score_like_the_api_would():
+    report = evaluate(resamples=0)
+    frame = pd.DataFrame(full)
+    simple_rows = [build_simple_features({field: row[column] for field, column in SIMPLE_FROM_COLUMNS.items()})
+                   for row in frame.to_dict(orient='records')]
+
+    full_rmse = np.sqrt(np.mean((model.predict(frame) - true_log) ** 2))
+    simple_rmse = np.sqrt(np.mean((model.predict(pd.DataFrame(simple_rows)) - true_log) ** 2))
+    assert report['rows'] == len(true_log) and report['intervals'] is None
+    assert report['metrics']['full']['rmse_log'] == pytest.approx(full_rmse)
+    assert report['metrics']['simple']['rmse_log'] == pytest.approx(simple_rmse)
+
+
+def test_bootstrap_does_not_depend_on_the_number_of_workers():
+    per_row = {'full': errors(model.predict(pd.DataFrame(full)), true_log),
+               'simple': errors(model.predict(pd.DataFrame(simple_columns(full))), true_log)}
+    one = bootstrap(per_row, resamples=600, seed=3, workers=1)
+    two = bootstrap(per_row, resamples=600, seed=3, workers=2)
+    assert one == two
+
+    low, high = one['full']['rmse_log']
+    assert low < np.sqrt(per_row['full'][0].mean()) < high
+    assert set(one) == {'full', 'simple', 'simple_minus_full'}
+
+
+def test_every_defaulted_column_gets_a_tradeoff_row():
+    report = evaluate(resamples=0)
+    assert sorted(row['feature'] for row in report['default_tradeoff']) == sorted(DEFAULTED_FEATURES)
+    assert sorted(DEFAULTED_FEATURES + list(SIMPLE_FROM_COLUMNS.values())) == sorted(FEATURES_REQUIRED)
+
+    # Asking for every defaulted column turns the simple path back into the full path
+    simple = simple_columns(full)
+    asked = {**simple, **{f: full[f] for f in DEFAULTED_FEATURES}}
+    np.testing.assert_allclose(model.predict(pd.DataFrame(asked)), model.predict(pd.DataFrame(full)))
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as service
+from model_manager import load_model
+
+client = service.app.test_client()
+
+simple_house = {"lot_area": 9605, "overall_qual": 7, "year_built": 2000,
+                "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2}
+
+
+def test_explanations_add_up_to_the_predicted_price():
+    full_house = service.build_simple_features({**simple_house, "overall_qual": 9})
+    response = client.post('/explain', json={'records': [simple_house, full_house, {'bogus': 1}]})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 3 and body['errors'] == 1 and 'error' in body['explanations'][2]
+
+    for record, explanation in zip([simple_house, full_house], body['explanations']):
+        assert set(explanation['contributions']) == set(service.FEATURES_REQUIRED)
+        total = body['base_price'] + sum(explanation['contributions'].values())
+        assert total == pytest.approx(explanation['predicted_price'], abs=0.01)
+        log_total = np.log1p(body['base_price']) + sum(explanation['log_contributions'].values())
+        assert np.expm1(log_total) == pytest.approx(explanation['predicted_price'], rel=1e-5)
+
+    # Same price as the prediction routes, and on the log scale only the quality moved
+    predicted = client.post('/predict/simple', json=simple_house).get_json()['predicted_price']
+    assert body['explanations'][0]['predicted_price'] == pytest.approx(predicted, abs=0.01)
+    first, second = (e['log_contributions'] for e in body['explanations'][:2])
+    assert {f for f in first if first[f] != second[f]} == {'Overall Qual'}
+    assert second['Overall Qual'] > first['Overall Qual']
+
+
+def test_every_training_row_adds_up_to_the_cent():
+    train = pd.read_csv('data/train_new.csv')
+    train = train.fillna({'Lot Frontage': train['Lot Frontage'].median(), 'Electrical': train['Electrical'].mode()[0]})
+    body = client.post('/explain', json={'records': train[service.FEATURES_REQUIRED].to_dict(orient='records')}).get_json()
+    assert body['errors'] == 0
+    base_cents = round(body['base_price'] * 100)
+    for explanation in body['explanations']:
+        cents = base_cents + sum(round(value * 100) for value in explanation['contributions'].values())
+        assert cents == round(explanation['predicted_price'] * 100)
+
+
+def test_single_record_and_bad_input():
+    response = client.post('/explain', json=simple_house)
+    assert response.status_code == 200 and response.get_json()['count'] == 1
+    assert client.post('/explain', json=[]).status_code == 400
+
+
+def test_model_without_kernel_gets_501(monkeypatch):
+    sklearn_only = load_model(service.model_manager.active.path, use_kernel=False)
+    monkeypatch.setattr(service.model_manager, 'active', sklearn_only)
+    assert client.post('/explain', json=simple_house).status_code == 501
@@ -0,0 +1,37 @@
+import pytest
+
+import app as service
+
+client = service.app.test_client()
+
+
+def test_ready_after_warmup():
+    assert service.startup['ready']
+    assert service.startup['first_prediction_ms'] > 0
+    response = client.get('/healthz/ready')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+    assert client.get('/').get_json()['status'] == 'healthy'
+
+
+def test_not_ready_means_503_but_still_alive(monkeypatch):
+    monkeypatch.setitem(service.startup, 'ready', False)
+    assert client.get('/healthz/ready').status_code == 503
+    assert client.get('/').status_code == 503
+    assert client.get('/healthz/live').status_code == 200
+
+
+def test_failed_warmup_keeps_service_unready(monkeypatch):
+    monkeypatch.setattr(service, 'predict_log_prices', lambda rows: 1 / 0)
+    monkeypatch.setattr(service, 'prediction_cache', None)
+    monkeypatch.setattr(service, 'startup', {**service.startup, 'ready': False, 'error': None})
+    with pytest.raises(RuntimeError, match='Warmup prediction failed'):
+        service.warm_up(1)
+
+    # The import-time path: logs the error and stays alive but unready
+    service.start_up(1)
+    assert service.startup['ready'] is False
+    assert 'Warmup prediction failed' in service.startup['error']
+    response = client.get('/healthz/ready')
+    assert response.status_code == 503 and response.get_json()['error'] == service.startup['error']
+    assert client.get('/healthz/live').status_code == 200
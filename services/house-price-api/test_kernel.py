@@ -0,0 +1,117 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from kernel import compile_pipeline, dollar_contributions, round_to_cents
+
+MODEL_PATH = 'models/house_price/saved_model/elastic_net_regression.pkl'
+
+model = joblib.load(MODEL_PATH)
+kernel = compile_pipeline(model)
+
+
+def load_features(path):
+    """Load a CSV the same way the notebook did before training"""
+    df = pd.read_csv(path)
+    train = pd.read_csv('data/train_new.csv')
+    df['Lot Frontage'] = df['Lot Frontage'].fillna(train['Lot Frontage'].median())
+    df['Electrical'] = df['Electrical'].fillna(train['Electrical'].mode()[0])
+    return df.drop(columns=['PID', 'SalePrice'], errors='ignore')
+
+
+@pytest.mark.parametrize('path', ['data/train_new.csv', 'data/test_new.csv'])
+def test_kernel_matches_sklearn_on_records(path):
+    features = load_features(path)
+    expected = model.predict(features)
+    actual = kernel.predict_records(features.to_dict(orient='records'))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('path', ['data/train_new.csv', 'data/test_new.csv'])
+def test_kernel_matches_sklearn_on_columns(path):
+    features = load_features(path)
+    expected = model.predict(features)
+    actual = kernel.predict_columns({c: features[c].to_numpy() for c in features.columns})
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-10)
+
+
+def test_unknown_categories_are_ignored_like_onehotencoder():
+    features = load_features('data/test_new.csv').head(20).copy()
+    features['Neighborhood'] = 'Atlantis'
+    features['Sale Type'] = 'Barter'
+    expected = model.predict(features)
+    actual = kernel.predict_records(features.to_dict(orient='records'))
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-10)
+
+
+def test_missing_numbers_and_columns_are_rejected():
+    row = load_features('data/test_new.csv').iloc[0].to_dict()
+    with pytest.raises(ValueError):
+        kernel.predict_records([{**row, 'Lot Frontage': np.nan}])
+    with pytest.raises(ValueError):
+        kernel.predict_records([{k: v for k, v in row.items() if k != 'Yr Sold'}])
+
+
+def test_explanations_are_exact_coefficients_times_inputs():
+    features = load_features('data/test_new.csv')
+    base, contributions = kernel.explain_columns({c: features[c].to_numpy() for c in features.columns})
+
+    # Ground truth from sklearn: coef * transformed input, one-hot columns summed per text column
+    preprocessor, estimator = model.steps[0][1], model.steps[1][1]
+    transformed = preprocessor.transform(features)
+    if hasattr(transformed, 'toarray'):
+        transformed = transformed.toarray()
+    terms = transformed * estimator.coef_
+    for name, _, columns in preprocessor.transformers_:
+        if name == 'remainder':
+            continue
+        block = terms[:, preprocessor.output_indices_[name]]
+        if isinstance(preprocessor.named_transformers_[name], OneHotEncoder):
+            sizes = [len(c) for c in preprocessor.named_transformers_[name].categories_]
+            block = np.column_stack([part.sum(axis=1) for part in np.split(block, np.cumsum(sizes)[:-1], axis=1)])
+        for j, column in enumerate(columns):
+            np.testing.assert_allclose(contributions[:, kernel.features.index(column)], block[:, j], atol=1e-10)
+
+    assert base == pytest.approx(estimator.intercept_)
+    np.testing.assert_allclose(base + contributions.sum(axis=1), model.predict(features), atol=1e-10)
+
+
+def test_dollar_contributions_add_up_to_the_price():
+    base = np.log1p(150_000)
+    log_contributions = np.array([[0.2, -0.05, 0.1], [0.1, -0.1, 0.0], [0.0, 0.0, 0.0]])
+    dollars = dollar_contributions(base, log_contributions)
+    prices = np.expm1(base + log_contributions.sum(axis=1))
+    np.testing.assert_allclose(dollars.sum(axis=1), prices - 150_000, atol=1e-6)
+    # Cancelling log changes still get finite, opposite dollar amounts
+    assert dollars[1, 0] == pytest.approx(-dollars[1, 1]) and dollars[1, 0] > 0
+    assert not dollars[2].any()
+
+
+def test_round_to_cents_hits_the_total_exactly():
+    dollars = np.array([[0.334, 0.333, 0.333],      # plain rounding: 1.00 - ok
+                        [0.335, 0.335, 0.335],      # plain rounding: 1.02 (or 1.01), total 1.00
+                        [0.006, 0.006, -0.004]])    # plain rounding: 0.01, total 0.00
+    rounded = round_to_cents(dollars, [1.00, 1.00, 0.00])
+    np.testing.assert_allclose(rounded.sum(axis=1), [1.00, 1.00, 0.00], atol=1e-9)
+    np.testing.assert_allclose(rounded * 100, np.rint(rounded * 100))
+    assert np.abs(rounded - dollars).max() < 0.01
+
+    # Price and base are rounded separately, so the total can be a cent below the floors
+    np.testing.assert_allclose(round_to_cents(np.array([[0.004, 0.002]]), [-0.01]), [[0.0, -0.01]], atol=1e-12)
+
+
+def test_non_linear_model_is_not_compiled():
+    features = load_features('data/train_new.csv').head(50)
+    ct = ColumnTransformer([
+        ('dummify', OneHotEncoder(handle_unknown='ignore', sparse_output=False), ['Neighborhood']),
+        ('standardize', StandardScaler(), ['Gr Liv Area'])
+    ])
+    tree = Pipeline([('preprocessor', ct), ('model', DecisionTreeRegressor(max_depth=2))])
+    tree.fit(features, np.arange(len(features), dtype=float))
+    with pytest.raises(ValueError):
+        compile_pipeline(tree)
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import app as service
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'benchmarks'))
+import loadtest  # noqa: E402
+
+
+def test_short_in_process_run_reports_every_endpoint():
+    payloads = loadtest.load_payloads(batch_size=10)
+    mix = loadtest.parse_mix('predict=1,simple=1,batch=1')
+    results = loadtest.run(lambda: loadtest.InProcessClient(service.app), payloads, mix,
+                           concurrency=2, duration=0.5)
+    assert set(results) == {'predict', 'simple', 'batch'}
+    for r in results.values():
+        assert r['requests'] > 0 and r['errors'] == 0
+        assert r['p50_ms'] <= r['p95_ms'] <= r['p99_ms']
+
+
+def test_regressions_are_detected():
+    baseline = {'simple': {'throughput_rps': 100.0, 'p99_ms': 10.0, 'errors': 0}}
+    assert loadtest.compare_to_baseline(
+        {'simple': {'throughput_rps': 90.0, 'p99_ms': 11.0, 'errors': 0}}, baseline, 0.2) == []
+    problems = loadtest.compare_to_baseline(
+        {'simple': {'throughput_rps': 50.0, 'p99_ms': 30.0, 'errors': 2}}, baseline, 0.2)
+    assert len(problems) == 3
@@ -0,0 +1,135 @@
+import multiprocessing
+import os
+import runpy
+import time
+
+import pytest
+
+import app as service
+from metrics import Metrics, PodGauges
+
+HOUSE = {"lot_area": 8123, "overall_qual": 6, "year_built": 1999,
+         "gr_liv_area": 1500, "bedrooms": 3, "bathrooms": 2}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    fresh = Metrics()
+    fresh.add_gauges(service._service_gauges)
+    monkeypatch.setattr(service, 'metrics', fresh)
+    monkeypatch.setattr(service, 'prediction_cache', None)
+    return service.app.test_client()
+
+
+def test_metrics_has_endpoint_and_stage_histograms(client):
+    for _ in range(3):
+        assert client.post('/predict/simple', json=HOUSE).status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+
+    assert 'http_request_duration_seconds_count{endpoint="/predict/simple",' in text
+    for stage_name in ('parse', 'prepare', 'kernel', 'timestamp', 'serialize'):
+        assert f'endpoint="/predict/simple",stage="{stage_name}"' in text
+    assert 'http_requests_total{endpoint="/predict/simple",status="200"' in text
+    assert 'house_price_model_info{hash=' in text
+
+
+def test_sklearn_path_reports_transform_and_model_stages(client, monkeypatch):
+    active = service.model_manager.active
+    monkeypatch.setattr(active, 'kernel', None)
+    assert client.post('/predict/simple', json=HOUSE).status_code == 200
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'stage="transform"' in text and 'stage="model"' in text
+
+
+def test_errors_are_counted(client):
+    assert client.post('/predict', json={'Lot Area': 1}).status_code == 500
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'http_request_errors_total{endpoint="/predict",' in text
+
+
+def test_profiler_can_be_started_and_collects_stacks(client, monkeypatch):
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', 'secret')
+    admin = {'X-Admin-Token': 'secret'}
+    assert client.post('/debug/profile/start', json={'interval_ms': 1, 'seconds': 5}, headers=admin).status_code == 202
+    stop_at = time.time() + 0.3
+    while time.time() < stop_at:
+        client.post('/predict/simple', json=HOUSE)
+    client.post('/debug/profile/stop', headers=admin)
+
+    status = client.get('/debug/profile?format=json', headers=admin).get_json()
+    assert not status['running'] and status['samples'] > 0
+    folded = client.get('/debug/profile?top=5', headers=admin).get_data(as_text=True)
+    assert folded.strip() and folded.splitlines()[0].rsplit(' ', 1)[1].isdigit()
+
+
+def test_profiler_routes_need_the_admin_token(client, monkeypatch):
+    for token, headers in ((None, {}), (None, {'X-Admin-Token': ''}), ('secret', {'X-Admin-Token': 'wrong'})):
+        monkeypatch.setattr(service, 'ADMIN_TOKEN', token)
+        assert client.post('/debug/profile/start', json={'seconds': 5}, headers=headers).status_code == 403
+        assert client.post('/debug/profile/stop', headers=headers).status_code == 403
+        assert client.get('/debug/profile', headers=headers).status_code == 403
+    assert not service.profiler.running
+
+
+def test_cumulative_samples_are_counters():
+    metrics = Metrics()
+    metrics.add_gauges(lambda: [('things_total', 'Things seen', {}, 3), ('things_waiting', 'Things waiting', {}, 1)])
+    text = metrics.render()
+    assert '# TYPE things_total counter' in text and '# TYPE things_waiting gauge' in text
+
+
+def test_gunicorn_keeps_its_worker_pool_under_kubernetes(monkeypatch):
+    config = os.path.join(os.path.dirname(__file__), 'gunicorn.conf.py')
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    monkeypatch.delenv('KUBERNETES_SERVICE_HOST', raising=False)
+    assert runpy.run_path(config)['workers'] == 4
+    monkeypatch.setenv('KUBERNETES_SERVICE_HOST', '10.0.0.1')
+    assert runpy.run_path(config)['workers'] == 4
+
+
+def in_another_worker(gauges, **values):
+    """Fork a process that publishes values and stays alive until the returned stop() is called"""
+    context = multiprocessing.get_context('fork')
+    published, done = context.Event(), context.Event()
+
+    def worker():
+        gauges.set(**values)
+        published.set()
+        done.wait(10)
+
+    child = context.Process(target=worker)
+    child.start()
+    assert published.wait(5)
+
+    def stop():
+        done.set()
+        child.join(5)
+    return stop
+
+
+def test_pod_gauges_add_up_every_worker_process():
+    gauges = PodGauges(['in_flight', 'queued'])
+    gauges.set(in_flight=2, queued=1)
+    stop = in_another_worker(gauges, in_flight=3, queued=4)
+    try:
+        assert gauges.totals() == {'in_flight': 5, 'queued': 5}
+    finally:
+        stop()
+    # A worker that's gone doesn't count any more
+    assert gauges.totals() == {'in_flight': 2, 'queued': 1}
+
+
+def test_admission_metrics_are_for_the_whole_pod(client, monkeypatch):
+    gauges = PodGauges(['in_flight', 'queued_interactive', 'queued_batch'])
+    monkeypatch.setattr(service, 'pod_admission', gauges)
+    stop = in_another_worker(gauges, in_flight=3, queued_batch=2)
+    service.admission.acquire()   # one request running in this worker
+    try:
+        text = client.get('/metrics').get_data(as_text=True)
+        assert f'admission_in_flight{{pid="{os.getpid()}"}} 4' in text
+        assert f'admission_queue_depth{{priority="batch",pid="{os.getpid()}"}} 2' in text
+        assert client.get('/admission/stats').get_json()['pod'] == {
+            'in_flight': 4, 'queued_interactive': 0, 'queued_batch': 2}
+    finally:
+        service.admission.release()
+        stop()
@@ -0,0 +1,88 @@
+import gzip
+import json
+import os
+
+import numpy as np
+
+import app as service
+from prediction_log import PredictionLogger
+
+client = service.app.test_client()
+
+house = {"lot_area": 9605, "overall_qual": 7, "year_built": 2000,
+         "gr_liv_area": 1218, "bedrooms": 3, "bathrooms": 2}
+
+
+def read_log(directory):
+    files = sorted(os.listdir(directory))
+    assert all(name.endswith('.jsonl.gz') for name in files)   # nothing left half-written
+    lines = []
+    for name in files:
+        with gzip.open(os.path.join(directory, name), 'rt') as f:
+            lines += [json.loads(line) for line in f]
+    return files, lines
+
+
+def test_close_writes_everything_buffered(tmp_path):
+    logger = PredictionLogger(str(tmp_path), flush_interval=3600)
+    logger.log('simple', 'v1', 0.5, [{'Lot Area': 1}, {'Lot Area': 2}], np.log1p([100.0, 200.0]))
+    logger.log('batch', 'v1', 1.5, {'Lot Area': np.array([3, 4]), 'Street': np.array(['Pave', 'Grvl'])},
+               np.log1p([300.0, 400.0]))
+    logger.close()
+
+    files, lines = read_log(tmp_path)
+    assert len(files) == 1 and logger.stats()['written'] == 4
+    assert [line['predicted_price'] for line in lines] == [100.0, 200.0, 300.0, 400.0]
+    assert lines[3]['features'] == {'Lot Area': 4, 'Street': 'Grvl'}
+    assert lines[2]['endpoint'] == 'batch' and lines[2]['latency_ms'] == 1.5
+
+
+def test_files_rotate_by_size(tmp_path):
+    logger = PredictionLogger(str(tmp_path), flush_interval=3600, max_file_bytes=1)
+    for i in range(3):
+        logger.log('simple', 'v1', 0.1, [{'i': i}], [12.0])
+        logger.flush()
+    logger.close()
+    files, lines = read_log(tmp_path)
+    assert len(files) == 3 and [line['features']['i'] for line in lines] == [0, 1, 2]
+
+
+def test_full_buffer_drops_instead_of_blocking(tmp_path):
+    logger = PredictionLogger(str(tmp_path), max_buffer=5, flush_interval=3600, flush_rows=1000)
+    accepted = [logger.log('simple', 'v1', 0.1, [{'i': i}], [12.0]) for i in range(8)]
+    assert accepted.count(True) == 5 and logger.stats()['dropped'] == 3
+    logger.close()
+    assert len(read_log(tmp_path)[1]) == 5
+
+
+def test_endpoints_log_every_prediction(tmp_path, monkeypatch):
+    logger = PredictionLogger(str(tmp_path), flush_interval=3600)
+    monkeypatch.setattr(service, 'prediction_logger', logger)
+
+    price = client.post('/predict/simple', json=house).get_json()['predicted_price']
+    batch = client.post('/predict/batch', json={'records': [house, {'lot_area': 'bad'}]}).get_json()
+    logger.close()
+
+    _, lines = read_log(tmp_path)
+    assert [line['endpoint'] for line in lines] == ['simple', 'batch']   # the bad row wasn't scored
+    assert lines[0]['predicted_price'] == price == batch['predictions'][0]['predicted_price']
+    assert lines[0]['features'] == service.build_simple_features(house)
+    assert lines[0]['model_version'] == service.model_manager.active.version
+    assert lines[0]['latency_ms'] > 0
+    assert client.get('/logging/stats').get_json()['written'] == 2
+
+
+def test_explain_and_registry_predictions_are_logged_too(tmp_path, monkeypatch):
+    logger = PredictionLogger(str(tmp_path), flush_interval=3600)
+    monkeypatch.setattr(service, 'prediction_logger', logger)
+    full = service.build_simple_features(house)
+
+    explained = client.post('/explain', json=house).get_json()
+    registry = client.post('/models/house_price/predict', json=full).get_json()
+    client.post('/models/political_affiliation/predict', json={'anything': 1})  # not a house model
+    logger.close()
+
+    _, lines = read_log(tmp_path)
+    assert [line['endpoint'] for line in lines] == ['explain', 'registry']
+    assert lines[0]['predicted_price'] == explained['explanations'][0]['predicted_price']
+    assert lines[1]['predicted_price'] == registry['predictions_original_scale'][0]
@@ -0,0 +1,102 @@
+import copy
+import os
+
+import joblib
+import pandas as pd
+import pytest
+
+import app as service
+from registry import ModelNotFound, ModelRegistry
+
+client = service.app.test_client()
+
+
+def test_discovers_every_saved_model_without_loading():
+    registry = ModelRegistry('models')
+    assert set(registry.names()) == {'house_price', 'political_affiliation'}
+    assert registry.stats()['loaded'] == []
+    with pytest.raises(ModelNotFound):
+        registry.get('does_not_exist')
+
+
+def test_least_recently_used_model_is_evicted_over_budget():
+    sizes = [os.path.getsize(p) for p in ModelRegistry('models')._artifacts.values()]
+    # Room for the biggest model, but not both at once
+    registry = ModelRegistry('models', memory_budget_mb=max(sizes) * 1.5 / 1024 / 1024)
+
+    registry.get('house_price')
+    registry.get('political_affiliation')
+    stats = registry.stats()
+    assert stats['loaded'] == ['political_affiliation']
+    assert stats['evictions'] == 1
+    assert stats['memory_used_bytes'] <= stats['memory_budget_bytes']
+
+
+def test_classifier_predict_returns_probabilities():
+    survey = pd.read_csv('data/CAH-201803-test.csv').drop(columns=['id_num']).head(5)
+    response = client.post('/models/political_affiliation/predict',
+                           json={'records': survey.to_dict(orient='records')})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['count'] == 5
+    assert set(result['predictions']) <= set(result['classes'])
+    for probabilities in result['probabilities']:
+        assert sum(probabilities.values()) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_house_price_through_registry_matches_primary_route():
+    house = service.build_simple_features({"lot_area": 8500, "overall_qual": 7})
+    primary = client.post('/predict', json=house).get_json()['predicted_price']
+    result = client.post('/models/house_price/predict', json=house).get_json()
+    assert result['predictions_original_scale'][0] == pytest.approx(primary, abs=0.01)
+
+
+def test_unknown_model_is_404():
+    assert client.post('/models/nope/predict', json={'a': 1}).status_code == 404
+    assert client.get('/models/nope/info').status_code == 404
+    listed = client.get('/models').get_json()
+    assert {m['name'] for m in listed['models']} == {'house_price', 'political_affiliation'}
+
+
+def test_replaced_file_is_loaded_again(tmp_path):
+    folder = tmp_path / 'house_price' / 'saved_model'
+    folder.mkdir(parents=True)
+    model = joblib.load(service.model_path)
+    joblib.dump(model, folder / 'model.pkl')
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.get('house_price')
+    assert registry.get('house_price') is first
+
+    model[-1].intercept_ += 1.0
+    joblib.dump(model, folder / 'model.pkl')
+    os.utime(folder / 'model.pkl', ns=(0, os.stat(folder / 'model.pkl').st_mtime_ns + 10**9))
+    second = registry.get('house_price')
+    assert second is not first and second[-1].intercept_ == pytest.approx(first[-1].intercept_ + 1.0)
+    assert registry.stats()['reloads'] == 1
+
+
+def test_house_price_route_follows_the_active_model(monkeypatch):
+    house = service.build_simple_features({"lot_area": 8500, "overall_qual": 7})
+    shifted = copy.deepcopy(service.model_manager.active.model)
+    shifted[-1].intercept_ += 0.1
+    monkeypatch.setattr(service.model_manager.active, 'model', shifted)
+    result = client.post('/models/house_price/predict', json=house).get_json()
+    assert result['predictions'][0] == pytest.approx(shifted.predict(pd.DataFrame([house]))[0])
+
+
+def test_deleted_file_is_a_model_not_found(tmp_path):
+    folder = tmp_path / 'house_price' / 'saved_model'
+    folder.mkdir(parents=True)
+    joblib.dump(joblib.load(service.model_path), folder / 'model.pkl')
+    registry = ModelRegistry(str(tmp_path))
+    os.remove(folder / 'model.pkl')
+    with pytest.raises(ModelNotFound):
+        registry.get('house_price')
+
+
+def test_house_price_info_describes_the_active_model():
+    loaded = service.registry.stats()['loaded']
+    info = client.get('/models/house_price/info').get_json()
+    assert info['version'] == service.model_manager.active.version
+    # No second copy of the primary model just to describe it
+    assert service.registry.stats()['loaded'] == loaded
@@ -0,0 +1,167 @@
+import copy
+import time
+
+import joblib
+import pytest
+from sklearn.dummy import DummyRegressor
+
+import app as service
+from cache import PredictionCache
+import model_manager
+from model_manager import ModelManager
+
+HOUSE = {"lot_area": 8500, "overall_qual": 7, "year_built": 2000,
+         "gr_liv_area": 1800, "bedrooms": 3, "bathrooms": 2}
+ADMIN = {'X-Admin-Token': 'secret'}
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """App with its own ModelManager and cache so reloads don't leak into other tests"""
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(service, 'MODELS_DIR', str(tmp_path))
+    manager = ModelManager(service.model_path, logger=service.app.logger,
+                           canary_path='data/train_new.csv', features=service.FEATURES_REQUIRED)
+    monkeypatch.setattr(service, 'model_manager', manager)
+    monkeypatch.setattr(service, 'prediction_cache', PredictionCache(16, 60))
+    return service.app.test_client()
+
+
+def save_variant(tmp_path, name, intercept_shift):
+    """Copy of the real model with its intercept moved (log scale), saved under MODELS_DIR"""
+    variant = copy.deepcopy(service.model_manager.active.model)
+    variant.named_steps['model'].intercept_ += intercept_shift
+    path = tmp_path / 'house_price' / 'versions' / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(variant, path)
+    return str(path)
+
+
+def price(client):
+    return client.post('/predict/simple', json=HOUSE).get_json()['predicted_price']
+
+
+def test_reload_swaps_model_and_rollback_restores_it(client, tmp_path):
+    original = price(client)
+    path = save_variant(tmp_path, 'better.pkl', 0.01)
+
+    status = client.post('/admin/reload', json={'path': path, 'wait': True}, headers=ADMIN).get_json()
+    assert status['state'] == 'succeeded'
+    assert status['canary']['rows'] == 200
+
+    info = client.get('/model/info').get_json()
+    assert info['model_path'] == path and info['model_revision'] == 2
+    assert info['model_version'] == service.model_manager.active.version != info['previous_version']
+    assert info['previous_version'] is not None and info['loaded_at']
+    # The cache was keyed on the old model, so we get the new model's answer
+    assert price(client) > original
+
+    rollback = client.post('/admin/rollback', headers=ADMIN).get_json()
+    assert rollback['active']['revision'] == 1
+    assert price(client) == original
+
+
+def test_model_failing_the_canary_is_not_swapped_in(client, tmp_path):
+    original = price(client)
+    path = save_variant(tmp_path, 'broken.pkl', 5.0)  # every price off by a factor of ~150
+
+    response = client.post('/admin/reload', json={'path': path, 'wait': True}, headers=ADMIN)
+    assert response.status_code == 422
+    assert 'Canary RMSE' in response.get_json()['error']
+    assert client.get('/model/info').get_json()['model_revision'] == 1
+    assert price(client) == original
+
+
+def test_background_reload_and_admin_token(client):
+    assert client.post('/admin/reload', json={}).status_code == 403
+    assert client.post('/admin/rollback', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+
+    response = client.post('/admin/reload', json={}, headers=ADMIN)
+    assert response.status_code == 202
+    manager = service.model_manager
+    for _ in range(200):
+        if manager.status['state'] != 'loading' and manager.active.revision == 2:
+            break
+        time.sleep(0.01)
+    assert manager.status['state'] == 'succeeded'
+
+
+def test_rollback_without_previous_model_is_rejected(client):
+    assert client.post('/admin/rollback', headers=ADMIN).status_code == 409
+
+
+def test_admin_routes_are_closed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', None)
+    for headers in ({}, {'X-Admin-Token': ''}, {'X-Admin-Token': 'None'}):
+        response = client.post('/admin/reload', json={'path': '/etc/passwd', 'wait': True}, headers=headers)
+        assert response.status_code == 403
+        assert client.post('/admin/rollback', headers=headers).status_code == 403
+
+
+def test_reload_only_accepts_paths_under_the_models_dir(client, tmp_path):
+    outside = tmp_path / 'elsewhere.pkl'
+    outside.write_bytes(b'not a model')
+    sneaky = tmp_path / 'house_price' / 'versions' / '..' / '..' / 'elsewhere.pkl'
+    for path in ('/etc/passwd', str(outside), str(sneaky), str(tmp_path / 'house_price' / 'model.pkl')):
+        response = client.post('/admin/reload', json={'path': path, 'wait': True}, headers=ADMIN)
+        assert response.status_code == 400
+    assert service.model_manager.status['state'] != 'failed'
+    assert service.model_manager.active.revision == 1
+
+
+def test_watcher_is_not_started_by_the_warmup(client, monkeypatch):
+    monkeypatch.setattr(service, 'MODEL_WATCH_INTERVAL', 3600)
+    monkeypatch.setitem(service.startup, 'ready', False)
+    client.post('/predict/simple', json=HOUSE)
+    assert service.model_manager._watcher is None
+
+    monkeypatch.setitem(service.startup, 'ready', True)
+    client.post('/predict/simple', json=HOUSE)
+    assert service.model_manager._watcher.is_alive()
+
+
+def test_version_is_the_hash_of_the_bytes_that_were_loaded(client, tmp_path, monkeypatch):
+    path = save_variant(tmp_path, 'v2.pkl', 0.01)
+    reads = []
+    real_open = open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == path:
+            reads.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', counting_open)
+    loaded = model_manager.load_model(path)
+    assert len(reads) == 1
+    assert loaded.version == model_manager.file_hash(path)
+
+
+def test_watcher_survives_a_reload_already_in_progress(tmp_path):
+    path = save_variant(tmp_path, 'watched.pkl', 0.0)
+    manager = ModelManager(path, features=service.FEATURES_REQUIRED)
+    manager._reload_lock.acquire()  # an admin reload is running
+    try:
+        with pytest.raises(RuntimeError):
+            manager.reload_async()
+        manager.ensure_watcher(0.02)
+        save_variant(tmp_path, 'watched.pkl', 0.01)
+        time.sleep(0.1)
+        assert manager._watcher.is_alive() and manager.active.revision == 1
+    finally:
+        manager._reload_lock.release()
+
+    # Once the other reload is done the watcher picks up the new file
+    deadline = time.time() + 5
+    while manager.active.revision == 1 and time.time() < deadline:
+        time.sleep(0.02)
+    assert manager.active.revision == 2 and manager.status['state'] == 'succeeded'
+
+
+def test_a_model_that_is_not_a_pipeline_is_scored_with_its_own_predict(tmp_path):
+    # e.g. a bare estimator that does its own preprocessing: no kernel, no [:-1]
+    path = tmp_path / 'dummy.pkl'
+    joblib.dump(DummyRegressor(constant=12.0, strategy='constant').fit([[0]], [0]), path)
+    loaded = model_manager.load_model(str(path))
+    assert loaded.kernel is None
+    row = service.build_simple_features(HOUSE)
+    assert list(loaded.predict([row, row])) == [12.0, 12.0]
@@ -0,0 +1,34 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from score_csv import DEFAULT_MODEL, score_file
+
+model = joblib.load(DEFAULT_MODEL)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_scores_in_order_and_match_the_model(tmp_path, workers):
+    output = tmp_path / 'predictions.csv'
+    summary = score_file('data/test_new.csv', output, chunksize=97, workers=workers)
+
+    test = pd.read_csv('data/test_new.csv')
+    scored = pd.read_csv(output)
+    assert summary['rows'] == len(test) and summary['chunks'] == -(-len(test) // 97)
+    assert (scored['PID'] == test['PID']).all()
+    expected = np.round(np.expm1(model.predict(test.drop(columns=['PID']))), 2)
+    np.testing.assert_allclose(scored['predicted_price'], expected, atol=0.011)
+
+
+def test_missing_values_are_filled_like_training(tmp_path):
+    train = pd.read_csv('data/train_new.csv')
+    output = tmp_path / 'predictions.csv'
+    summary = score_file('data/train_new.csv', output, chunksize=500, workers=1)
+
+    filled = train.copy()
+    filled['Lot Frontage'] = filled['Lot Frontage'].fillna(train['Lot Frontage'].median())
+    filled['Electrical'] = filled['Electrical'].fillna(train['Electrical'].mode()[0])
+    expected = np.round(np.expm1(model.predict(filled.drop(columns=['PID', 'SalePrice']))), 2)
+    assert summary['rows_skipped'] == 0
+    np.testing.assert_allclose(pd.read_csv(output)['predicted_price'], expected, atol=0.011)
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import joblib
+import numpy as np
+import pytest
+
+import app as service
+from shadow import ShadowScorer
+
+client = service.app.test_client()
+
+house = {"lot_area": 9605, "overall_qual": 7, "year_built": 2000,
+         "gr_liv_area": 1218, "bedrooms": 3, "bathrooms": 2}
+
+
+class ScaledModel:
+    """Fake candidate that predicts the row's 'log_price' times `factor` in dollars"""
+
+    def __init__(self, factor, gate=None):
+        self.factor = factor
+        self.gate = gate
+
+    def predict(self, rows):
+        if self.gate is not None:
+            self.gate.wait()
+        if any(row.get('bad') for row in rows):
+            raise ValueError('candidate cannot score this row')
+        return np.log1p(np.expm1([row['log_price'] for row in rows]) * self.factor)
+
+    def describe(self):
+        return {'version': 'fake'}
+
+
+def wait_for(scorer, compared, timeout=5):
+    deadline = time.time() + timeout
+    while scorer.stats()['compared'] < compared and time.time() < deadline:
+        time.sleep(0.01)
+    return scorer.stats()
+
+
+def test_running_comparison():
+    scorer = ScaledModel(1.1)
+    shadow = ShadowScorer(scorer, threshold_pct=5)
+    log_prices = np.log1p(np.linspace(100_000, 300_000, 50))
+    for log_price in log_prices:
+        shadow.submit([{'log_price': log_price}], [log_price], 'live-v1')
+
+    stats = wait_for(shadow, 50)
+    assert stats['compared'] == 50 and stats['dropped'] == 0
+    assert stats['mean_diff_pct'] == pytest.approx(10)
+    assert stats['diff_pct_percentiles']['p50'] == pytest.approx(10)
+    assert stats['share_over_threshold'] == 1.0
+    assert stats['mean_diff'] == pytest.approx(20_000)
+
+    # A new live model starts a fresh comparison
+    shadow.submit([{'log_price': log_prices[0]}], [log_prices[0]], 'live-v2')
+    time.sleep(0.2)
+    assert shadow.stats()['compared'] == 1 and shadow.stats()['primary_version'] == 'live-v2'
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+    shadow = ShadowScorer(ScaledModel(1.0, gate), max_queue=2, batch_size=1)
+    started = time.perf_counter()
+    accepted = [shadow.submit([{'log_price': 12.0}], [12.0], 'v') for _ in range(20)]
+    assert time.perf_counter() - started < 0.5
+    assert not all(accepted) and shadow.stats()['dropped'] == accepted.count(False)
+
+    gate.set()
+    assert wait_for(shadow, accepted.count(True))['compared'] == accepted.count(True)
+
+
+def test_queue_is_bounded_by_rows_not_items():
+    gate = threading.Event()
+    shadow = ShadowScorer(ScaledModel(1.0, gate), max_queue=100)
+    bulk = [{'log_price': 12.0}] * 60
+    assert shadow.submit(bulk, [12.0] * 60, 'v')
+    assert not shadow.submit(bulk, [12.0] * 60, 'v')  # 120 rows won't fit in 100
+    assert shadow.submit(bulk[:40], [12.0] * 40, 'v')
+    assert shadow.stats()['dropped'] == 60 and shadow.stats()['queue_depth'] == 100
+
+    gate.set()
+    assert wait_for(shadow, 100)['compared'] == 100
+    time.sleep(0.05)
+    assert shadow.stats()['queue_depth'] == 0
+
+
+def test_failed_candidate_call_only_counts_its_own_rows():
+    gate = threading.Event()
+    shadow = ShadowScorer(ScaledModel(1.0, gate))
+    shadow.submit([{'log_price': 12.0}], [12.0], 'v')  # holds the worker until the gate opens
+    time.sleep(0.05)
+    # These two land in the same batch, but are scored by separate candidate calls
+    shadow.submit([{'log_price': 12.0, 'bad': True}] * 3, [12.0] * 3, 'old')
+    shadow.submit([{'log_price': 12.0}] * 2, [12.0] * 2, 'v')
+    gate.set()
+
+    stats = wait_for(shadow, 3)
+    assert stats['compared'] == 3 and stats['failed'] == 3
+
+
+def test_shadow_endpoints_mirror_live_traffic(tmp_path, monkeypatch):
+    # Candidate = the live model with every price 10% higher
+    model = joblib.load(service.model_path)
+    model[-1].intercept_ += np.log(1.1)
+    candidate_path = tmp_path / 'house_price' / 'versions' / 'candidate' / 'model.pkl'
+    candidate_path.parent.mkdir(parents=True)
+    joblib.dump(model, candidate_path)
+    monkeypatch.setattr(service, 'prediction_cache', None)
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(service, 'MODELS_DIR', str(tmp_path))
+    admin = {'X-Admin-Token': 'secret'}
+
+    assert client.get('/shadow/stats').get_json() == {'enabled': False}
+    response = client.post('/admin/shadow', json={'path': str(candidate_path), 'threshold_pct': 5}, headers=admin)
+    assert response.status_code == 200 and response.get_json()['enabled']
+    try:
+        live = client.post('/predict/simple', json=house).get_json()['predicted_price']
+        client.post('/predict/batch', json={'records': [house, {**house, 'lot_area': 12000}]})
+
+        stats = wait_for(service.shadow, 3)
+        assert stats['compared'] == 3
+        assert stats['mean_diff_pct'] == pytest.approx(10, abs=0.01)
+        assert stats['share_over_threshold'] == 1.0
+
+        # Users still get the live model's answer
+        expected = np.expm1(service.model_manager.active.predict([service.build_simple_features(house)])[0])
+        assert live == round(float(expected), 2)
+    finally:
+        assert client.delete('/admin/shadow', headers=admin).get_json() == {'enabled': False}
+    assert service.shadow is None
+
+    missing = tmp_path / 'house_price' / 'versions' / 'missing' / 'model.pkl'
+    assert client.post('/admin/shadow', json={'path': str(missing)}, headers=admin).status_code == 422
+
+
+def test_admin_shadow_needs_a_token_and_a_models_dir_path(tmp_path, monkeypatch):
+    outside = tmp_path / 'candidate.pkl'
+    joblib.dump(joblib.load(service.model_path), outside)
+    monkeypatch.setattr(service, 'MODELS_DIR', str(tmp_path / 'models'))
+
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', None)
+    assert client.post('/admin/shadow', json={'path': str(outside)}).status_code == 403
+    assert client.delete('/admin/shadow').status_code == 403
+
+    monkeypatch.setattr(service, 'ADMIN_TOKEN', 'secret')
+    for path in (str(outside), '/etc/passwd', str(tmp_path / 'models' / 'house_price' / '..' / '..' / 'candidate.pkl')):
+        response = client.post('/admin/shadow', json={'path': path}, headers={'X-Admin-Token': 'secret'})
+        assert response.status_code == 400
+    assert service.shadow is None
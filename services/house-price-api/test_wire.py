@@ -0,0 +1,83 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+import app as service
+
+client = service.app.test_client()
+
+test = pd.read_csv('data/test_new.csv').head(200)
+features = test[service.FEATURES_REQUIRED]
+expected = np.round(np.expm1(service.model_manager.active.model.predict(features)), 2)
+
+
+def npz_payload(frame):
+    buffer = io.BytesIO()
+    np.savez(buffer, **{c: frame[c].to_numpy(dtype=str if frame[c].dtype == object else None)
+                        for c in frame.columns})
+    return buffer.getvalue()
+
+
+def ndjson_payload(frame):
+    return ''.join(json.dumps(r) + '\n' for r in frame.to_dict(orient='records'))
+
+
+def test_ndjson_in_json_out():
+    response = client.post('/predict/batch', data=ndjson_payload(features), content_type='application/x-ndjson')
+    assert response.status_code == 200
+    prices = [p['predicted_price'] for p in response.get_json()['predictions']]
+    np.testing.assert_allclose(prices, expected, atol=0.011)
+
+
+def test_npz_in_npz_out():
+    response = client.post('/predict', data=npz_payload(features), content_type='application/x-npz',
+                           headers={'Accept': 'application/x-npz'})
+    assert response.status_code == 200 and response.mimetype == 'application/x-npz'
+    prices = np.load(io.BytesIO(response.data))['predicted_price']
+    np.testing.assert_allclose(prices, expected, atol=0.011)
+
+
+def test_ndjson_out_streams_one_line_per_row():
+    response = client.post('/predict/batch', data=npz_payload(features), content_type='application/x-npz',
+                           headers={'Accept': 'application/x-ndjson'})
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == len(features)
+    assert json.loads(lines[5]) == {'index': 5, 'predicted_price': expected[5]}
+
+
+def test_simple_columns_match_simple_route():
+    simple = {"lot_area": [8500, 9000], "overall_qual": [7, 5], "year_built": [2000, 1970],
+              "gr_liv_area": [1800, 1200], "bedrooms": [3, 2], "bathrooms": [2, 1]}
+    buffer = io.BytesIO()
+    np.savez(buffer, **{k: np.array(v) for k, v in simple.items()})
+    response = client.post('/predict/simple', data=buffer.getvalue(), content_type='application/x-npz')
+    bulk = [p['predicted_price'] for p in response.get_json()['predictions']]
+
+    singles = [client.post('/predict/simple', json={k: v[i] for k, v in simple.items()}).get_json()['predicted_price']
+               for i in range(2)]
+    assert bulk == singles
+
+
+def test_schema_is_checked_once_for_the_whole_payload():
+    broken = features.drop(columns=['Gr Liv Area'])
+    response = client.post('/predict/batch', data=npz_payload(broken), content_type='application/x-npz')
+    assert response.status_code == 400 and 'Gr Liv Area' in response.get_json()['error']
+
+    wrong_type = features.assign(**{'Lot Area': features['Lot Area'].astype(str)})
+    response = client.post('/predict', data=ndjson_payload(wrong_type), content_type='application/x-ndjson')
+    assert response.status_code == 400 and 'Lot Area' in response.get_json()['error']
+
+    response = client.post('/predict/batch', data=b'not an archive', content_type='application/x-npz')
+    assert response.status_code == 400
+
+
+def test_too_many_records_is_a_413_like_json(monkeypatch):
+    monkeypatch.setattr(service, 'MAX_BATCH_SIZE', 50)
+    for data, content_type in ((ndjson_payload(features), 'application/x-ndjson'),
+                               (npz_payload(features), 'application/x-npz')):
+        response = client.post('/predict/batch', data=data, content_type=content_type)
+        assert response.status_code == 413
+    response = client.post('/predict/batch', json={'records': features.to_dict(orient='records')})
+    assert response.status_code == 413
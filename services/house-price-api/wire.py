@@ -0,0 +1,123 @@
+"""
+Bulk wire formats for the prediction routes, besides plain JSON
+
+- NDJSON (application/x-ndjson): one JSON record per line, read line by line
+  straight from the request stream and collected into columns as we go
+- NPZ (application/x-npz): a NumPy .npz archive with one array per column,
+  e.g. np.savez(buf, **{"Lot Area": lot_areas, "Neighborhood": neighborhoods, ...})
+  It decodes into column arrays with no per-row Python objects at all
+  (only plain arrays are accepted - allow_pickle is off)
+
+Either way the payload ends up as {column: array}, and the schema (which columns,
+numeric vs text, no missing numbers) is checked ONCE for the whole payload with
+vectorized numpy checks instead of row by row.
+
+Responses can come back in the same formats (pick with the Accept header).
+"""
+import io
+import json
+
+import numpy as np
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+NPZ = 'application/x-npz'
+BULK_FORMATS = (NDJSON, NPZ)
+
+
+class PayloadError(ValueError):
+    """The payload as a whole doesn't match the expected schema"""
+
+
+class PayloadTooLarge(PayloadError):
+    """More records than we accept in one request (413, like an oversized JSON batch)"""
+
+
+def read_ndjson_columns(stream, max_rows):
+    """Collect NDJSON records into {column: list of values}, one line at a time"""
+    columns = {}
+    n = 0
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise PayloadError(f'Line {line_number} is not valid JSON: {e}') from None
+        if not isinstance(record, dict):
+            raise PayloadError(f'Line {line_number} is not a JSON object')
+        if n == 0:
+            columns = {key: [] for key in record}
+        elif record.keys() != columns.keys():
+            raise PayloadError(f'Line {line_number} has different fields than line 1')
+        for key, value in record.items():
+            columns[key].append(value)
+        n += 1
+        if n > max_rows:
+            raise PayloadTooLarge(f'Too many records (max {max_rows})')
+    if n == 0:
+        raise PayloadError('No records in payload')
+    return columns
+
+
+def read_npz_columns(body, max_rows):
+    """Decode a .npz archive into {column: 1-d array}"""
+    try:
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            columns = {name: archive[name] for name in archive.files}
+    except Exception as e:
+        raise PayloadError(f'Could not read .npz payload: {e}') from None
+    if not columns:
+        raise PayloadError('No columns in payload')
+    if any(np.ndim(col) != 1 for col in columns.values()):
+        raise PayloadError('Every column must be a 1-d array')
+    if len(next(iter(columns.values()))) > max_rows:
+        raise PayloadTooLarge(f'Too many records (max {max_rows})')
+    return columns
+
+
+def validate_columns(columns, numeric, categorical):
+    """
+    Check the whole payload at once and return (columns as numpy arrays, row count)
+    numeric columns must be real numbers with nothing missing, categorical ones text
+    """
+    lengths = {len(col) for col in columns.values()}
+    if len(lengths) != 1:
+        raise PayloadError('All columns must have the same length')
+    missing = [f for f in list(numeric) + list(categorical) if f not in columns]
+    if missing:
+        raise PayloadError(f'Missing features: {missing}')
+
+    arrays = {}
+    for name in numeric:
+        values = np.asarray(columns[name])
+        if values.dtype.kind not in 'iuf':
+            raise PayloadError(f'Feature {name!r} must be numeric')
+        if values.dtype.kind == 'f' and not np.isfinite(values).all():
+            raise PayloadError(f'Feature {name!r} has missing or infinite values')
+        arrays[name] = values
+    for name in categorical:
+        values = np.asarray(columns[name])
+        if values.dtype.kind != 'U':
+            raise PayloadError(f'Feature {name!r} must be text')
+        arrays[name] = values
+    return arrays, lengths.pop()
+
+
+def negotiate(accept_mimetypes):
+    """Response format from the Accept header (JSON unless they ask otherwise)"""
+    return accept_mimetypes.best_match([JSON, NDJSON, NPZ], default=JSON)
+
+
+def ndjson_lines(prices, chunk_rows=1000):
+    """Yield the NDJSON response in chunks so big responses stream out"""
+    for start in range(0, len(prices), chunk_rows):
+        yield ''.join(f'{{"index": {i}, "predicted_price": {price:.2f}}}\n'
+                      for i, price in enumerate(prices[start:start + chunk_rows].tolist(), start))
+
+
+def npz_bytes(prices):
+    """Predictions as a .npz archive with one float64 array, predicted_price"""
+    buffer = io.BytesIO()
+    np.savez(buffer, predicted_price=np.round(prices, 2))
+    return buffer.getvalue()
@@ -0,0 +1,87 @@
+"""
+Wall-clock training time: the notebooks' way vs training/train.py
+
+"notebook" = what the notebooks do: a serial GridSearchCV for every family,
+             the ColumnTransformer refitted for every candidate and fold, and
+             every alpha fitted from scratch
+"scripted" = train.py's searches: parallel, cached preprocessing, and
+             warm-started paths for Lasso/ElasticNet
+
+Both search the same grids on the same folds, so the best scores should match
+(up to the solver tolerance). The preprocessing cache is emptied before each
+repeat so the scripted number is a cold run.
+
+By default every family the notebooks searched is timed, including the ones
+train.py only searches to compare against (comparison_only), e.g. the SVM
+grid for political_affiliation: 108 combinations x 5 folds, by far the
+slowest search. --families picks a subset.
+
+Run from the project root:
+    python training/bench_training.py house_price --repeats 3
+    python training/bench_training.py political_affiliation --families svm --repeats 1
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from train import TASKS, grid_search, load_data, make_cv, search_family  # noqa: E402
+
+
+def all_families(task):
+    """The task's default searches plus its comparison-only ones"""
+    spec = TASKS[task]
+    return spec['default_families'] + [f for f in spec.get('comparison_only', [])
+                                       if f not in spec['default_families']]
+
+
+def notebook_way(task, families, X, y, cv):
+    return [grid_search(family, X, y, cv, TASKS[task]['scoring'], n_jobs=1, memory=None)
+            for family in families]
+
+
+def scripted_way(task, families, X, y, cv, n_jobs):
+    cache_dir = tempfile.mkdtemp(prefix='training-cache-')
+    try:
+        return [search_family(task, family, X, y, cv, n_jobs, cache_dir) for family in families]
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('task', choices=list(TASKS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--families', help='comma separated, e.g. svm (default: every family of the task)')
+    args = parser.parse_args()
+
+    families = args.families.split(',') if args.families else all_families(args.task)
+    unknown = [f for f in families if f not in all_families(args.task)]
+    if unknown:
+        parser.error(f'{args.task} does not have families {unknown}, use {all_families(args.task)}')
+
+    X, y = load_data(args.task)
+    cv = make_cv(args.task, 5)
+    timings = {'notebook': [], 'scripted': []}
+    for _ in range(args.repeats):
+        for name, run in (('notebook', lambda: notebook_way(args.task, families, X, y, cv)),
+                          ('scripted', lambda: scripted_way(args.task, families, X, y, cv, args.n_jobs))):
+            started = time.perf_counter()
+            searches = run()
+            timings[name].append(time.perf_counter() - started)
+            best = {s['family']: round(s['best_score'], 5) for s in searches}
+            print(f'{name:<9} {timings[name][-1]:7.2f}s  best CV scores {best}')
+
+    notebook, scripted = statistics.median(timings['notebook']), statistics.median(timings['scripted'])
+    print(f'\nmedian of {args.repeats}: notebook {notebook:.2f}s, scripted {scripted:.2f}s '
+          f'({notebook / scripted:.1f}x faster, {os.cpu_count()} CPUs)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+import json
+
+import joblib
+import numpy as np
+import pytest
+
+from train import grid_search, load_data, make_cv, path_search, train
+
+SMALL_GRIDS = {'ridge': {'alpha': [1.0, 10.0]},
+               'lasso': {'alpha': [0.001, 0.01]},
+               'elastic_net': {'alpha': [0.001, 0.01], 'l1_ratio': [0.01, 0.5]}}
+
+
+@pytest.fixture(scope='module')
+def house_data():
+    X, y = load_data('house_price')
+    return X, y, make_cv('house_price', 3)
+
+
+@pytest.mark.parametrize('family', ['lasso', 'elastic_net'])
+def test_warm_started_path_scores_like_grid_search(house_data, family):
+    X, y, cv = house_data
+    path = path_search(family, X, y, cv, n_jobs=1, grid=SMALL_GRIDS[family])
+    grid = grid_search(family, X, y, cv, 'neg_root_mean_squared_error', n_jobs=1, memory=None,
+                       grid=SMALL_GRIDS[family])
+
+    by_params = {json.dumps(c['params'], sort_keys=True): c['mean_score'] for c in grid['candidates']}
+    for candidate in path['candidates']:
+        assert candidate['mean_score'] == pytest.approx(by_params[json.dumps(candidate['params'], sort_keys=True)],
+                                                        abs=1e-4)
+    assert path['best_params'] == grid['best_params']
+
+
+def test_train_writes_a_version_with_metadata_and_promotes(tmp_path, house_data):
+    served = tmp_path / 'house_price' / 'saved_model' / 'elastic_net_regression.pkl'
+    served.parent.mkdir(parents=True)
+
+    metadata = train('house_price', folds=3, n_jobs=1, cache_dir=str(tmp_path / 'cache'), grids=SMALL_GRIDS,
+                     models_root=str(tmp_path), version='v1', promote=True)
+
+    version_dir = tmp_path / 'house_price' / 'versions' / 'v1'
+    assert json.loads((version_dir / 'metadata.json').read_text()) == metadata
+    assert [s['family'] for s in metadata['searches']] == ['ridge', 'lasso', 'elastic_net']
+    assert metadata['selected']['family'] == 'elastic_net'
+    assert metadata['selected']['cv_score'] == metadata['searches'][2]['best_score']
+    assert served.read_bytes() == (version_dir / 'model.pkl').read_bytes()
+
+    X, _, _ = house_data
+    model = joblib.load(served)
+    assert np.isfinite(model.predict(X.head(5))).all()
+
+
+def test_svm_is_compared_but_never_saved(tmp_path):
+    metadata = train('political_affiliation', families=['logistic', 'svm'], folds=3, n_jobs=1,
+                     grids={'logistic': {'C': [1], 'penalty': ['l2'], 'solver': ['liblinear']},
+                            'svm': {'C': [1], 'kernel': ['linear']}},
+                     models_root=str(tmp_path), version='v1')
+    assert metadata['selected']['family'] == 'logistic'
+    assert hasattr(joblib.load(tmp_path / 'political_affiliation' / 'versions' / 'v1' / 'model.pkl'), 'predict_proba')
+
+    with pytest.raises(ValueError):
+        train('house_price', families=['svm'], models_root=str(tmp_path))
+
+
+def test_ridge_beating_elastic_net_is_not_saved_under_its_name(tmp_path):
+    # A hopeless ElasticNet grid, so Ridge clearly scores best
+    grids = {'ridge': {'alpha': [1.0]}, 'elastic_net': {'alpha': [10.0], 'l1_ratio': [0.5]}}
+    metadata = train('house_price', families=['ridge', 'elastic_net'], folds=3, n_jobs=1, grids=grids,
+                     models_root=str(tmp_path), version='v1')
+    ridge, elastic_net = metadata['searches']
+    assert ridge['best_score'] > elastic_net['best_score']
+    assert metadata['selected']['family'] == 'elastic_net'
+    assert type(joblib.load(tmp_path / 'house_price' / 'versions' / 'v1' / 'model.pkl')[-1]).__name__ == 'ElasticNet'
+
+    with pytest.raises(ValueError):
+        train('house_price', families=['ridge'], models_root=str(tmp_path))
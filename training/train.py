@@ -0,0 +1,331 @@
+"""
+Scripted training for both models (replaces running the notebooks by hand)
+
+Same data prep, preprocessing and model families as the notebooks in notebooks/,
+but reproducible and a lot faster:
+  - every search runs in parallel on all cores (n_jobs)
+  - the fitted ColumnTransformer is cached on disk per CV fold (Pipeline memory),
+    so it is fitted once per fold instead of once per candidate
+  - Lasso and ElasticNet walk a regularization path: one model per fold and
+    l1_ratio, refitted from strong to weak alpha starting from the previous
+    solution (warm_start), instead of a cold fit for every alpha
+  - all paths are relative to the project root, no os.chdir needed
+
+Every run writes a new version:
+    models/<name>/versions/<version>/model.pkl
+    models/<name>/versions/<version>/metadata.json   (CV scores, fit times, data hash, ...)
+and --promote copies the model over the file the API serves
+(models/<name>/saved_model/...), where the hot-reload watcher picks it up.
+
+Run from the project root:
+    python training/train.py house_price --promote
+    python training/train.py political_affiliation --families logistic,svm
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Memory, Parallel, delayed
+from sklearn.compose import ColumnTransformer, make_column_selector
+from sklearn.linear_model import ElasticNet, Lasso, LogisticRegression, Ridge
+from sklearn.model_selection import GridSearchCV, KFold, StratifiedKFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVC
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Ridge, logistic and SVM grids are the notebooks' grids. The Lasso and
+# ElasticNet alpha grids add 0.0001, 0.0003 and 0.003 to the notebooks' values:
+# the notebook's best alpha (0.001) was the smallest one it tried, so the search
+# could not see whether a smaller one does better. The ElasticNet grid also has
+# l1_ratio 0.01, the value the served model was finally trained with
+GRIDS = {
+    'ridge': {'alpha': [0.01, 0.1, 1.0, 10.0, 100.0]},
+    'lasso': {'alpha': [0.0001, 0.0003, 0.001, 0.003, 0.01, 0.1, 1.0, 10.0]},
+    'elastic_net': {'alpha': [0.0001, 0.0003, 0.001, 0.003, 0.01, 0.1, 1.0, 10.0],
+                    'l1_ratio': [0.01, 0.1, 0.5, 0.9]},
+    'logistic': {'C': [0.01, 0.1, 1, 10, 100], 'penalty': ['l1', 'l2'], 'solver': ['liblinear', 'saga']},
+    'svm': {'C': [0.001, 0.01, 0.1, 1, 10, 100], 'kernel': ['linear', 'rbf', 'poly'],
+            'gamma': ['scale', 'auto', 0.001, 0.01, 0.1, 1]},
+}
+
+TASKS = {
+    'house_price': {
+        'data': 'data/train_new.csv',
+        'target': 'SalePrice',
+        'drop': ['SalePrice', 'PID'],
+        'scoring': 'neg_root_mean_squared_error',
+        # The API serves this as "ElasticNet Regression" from elastic_net_regression.pkl,
+        # so Ridge and Lasso are only searched to compare against, never saved
+        # (l1_ratio 0.01 already makes the ElasticNet almost a Ridge)
+        'families': ['elastic_net'],
+        'default_families': ['ridge', 'lasso', 'elastic_net'],
+        'comparison_only': ['ridge', 'lasso'],
+        'artifact': 'elastic_net_regression.pkl',
+    },
+    'political_affiliation': {
+        'data': 'data/CAH-201803-train.csv',
+        'target': 'political_affiliation',
+        'drop': ['id_num', 'political_affiliation'],
+        'scoring': 'accuracy',
+        # The API needs predict_proba, so SVM is only searched to compare against,
+        # never picked as the model to save
+        'families': ['logistic'],
+        'default_families': ['logistic'],
+        'comparison_only': ['svm'],
+        'artifact': 'logistic_regression_classifier.pkl',
+    },
+}
+
+
+def load_data(task, project_root=PROJECT_ROOT):
+    """Features and target, cleaned exactly like the notebooks did"""
+    spec = TASKS[task]
+    train = pd.read_csv(os.path.join(project_root, spec['data']))
+    if task == 'house_price':
+        train['Lot Frontage'] = train['Lot Frontage'].fillna(train['Lot Frontage'].median())
+        train['Electrical'] = train['Electrical'].fillna(train['Electrical'].mode()[0])
+        y = np.log1p(train[spec['target']])  # the model predicts log(1 + price)
+    else:
+        y = train[spec['target']]
+    return train.drop(columns=spec['drop']), y
+
+
+def make_preprocessor():
+    """One-hot the text columns, standardize the numbers (as in the notebooks)"""
+    return ColumnTransformer([
+        ("dummify", OneHotEncoder(handle_unknown="ignore", sparse_output=False),
+         make_column_selector(dtype_include=object)),
+        ("standardize", StandardScaler(), make_column_selector(dtype_include="number"))
+    ], remainder="passthrough")
+
+
+def make_estimator(family, **params):
+    if family == 'ridge':
+        return Ridge(**params)
+    if family == 'lasso':
+        return Lasso(max_iter=10000, **params)
+    if family == 'elastic_net':
+        return ElasticNet(max_iter=10000, **params)
+    if family == 'logistic':
+        return LogisticRegression(max_iter=10000, random_state=42, **params)
+    if family == 'svm':
+        return SVC(random_state=42, **params)
+    raise ValueError(f'Unknown model family: {family}')
+
+
+def make_cv(task, folds, seed=42):
+    if TASKS[task]['scoring'] == 'accuracy':
+        return StratifiedKFold(folds, shuffle=True, random_state=seed)
+    return KFold(folds, shuffle=True, random_state=seed)
+
+
+def grid_search(family, X, y, cv, scoring, n_jobs, memory, grid=None):
+    """
+    Plain GridSearchCV over the pipeline, in parallel
+    With `memory` the fitted preprocessor is cached per fold, so candidates that
+    only differ in model parameters reuse it instead of refitting it
+    """
+    pipeline = Pipeline([("preprocessor", make_preprocessor()), ("model", make_estimator(family))],
+                        memory=memory)
+    param_grid = {f'model__{k}': v for k, v in (grid or GRIDS[family]).items()}
+    started = time.perf_counter()
+    search = GridSearchCV(pipeline, param_grid, scoring=scoring, cv=cv, n_jobs=n_jobs)
+    search.fit(X, y)
+    results = search.cv_results_
+    return {
+        'family': family,
+        'method': 'grid_search',
+        'best_params': {k.removeprefix('model__'): v for k, v in search.best_params_.items()},
+        'best_score': float(search.best_score_),
+        'candidates': [
+            {'params': {k.removeprefix('model__'): v for k, v in params.items()},
+             'mean_score': float(mean), 'std_score': float(std), 'mean_fit_seconds': float(fit)}
+            for params, mean, std, fit in zip(results['params'], results['mean_test_score'],
+                                               results['std_test_score'], results['mean_fit_time'])
+        ],
+        'search_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def _path_fold(X, y, train_index, val_index, l1_ratios, alphas):
+    """
+    RMSE of every (l1_ratio, alpha) on one fold
+    The preprocessor is fitted once for the fold. For each l1_ratio the path is
+    walked from strong to weak regularization, and each fit starts from the
+    previous alpha's coefficients (warm_start), so later fits take few iterations
+    """
+    preprocessor = make_preprocessor().fit(X.iloc[train_index])
+    X_train, X_val = preprocessor.transform(X.iloc[train_index]), preprocessor.transform(X.iloc[val_index])
+    y_train, y_val = y.iloc[train_index].to_numpy(), y.iloc[val_index].to_numpy()
+
+    rmse, fit_seconds = {}, {}
+    for l1_ratio in l1_ratios:
+        model = ElasticNet(l1_ratio=l1_ratio, warm_start=True, max_iter=10000)
+        for alpha in sorted(alphas, reverse=True):
+            started = time.perf_counter()
+            model.set_params(alpha=alpha).fit(X_train, y_train)
+            fit_seconds[l1_ratio, alpha] = time.perf_counter() - started
+            rmse[l1_ratio, alpha] = float(np.sqrt(np.mean((model.predict(X_val) - y_val) ** 2)))
+    return rmse, fit_seconds
+
+
+def path_search(family, X, y, cv, n_jobs, grid=None):
+    """
+    CV over a warm-started regularization path for Lasso (l1_ratio = 1) or ElasticNet
+    One task per fold, run in parallel. Scores use the same sign
+    convention as GridSearchCV's neg_root_mean_squared_error (higher is better)
+    """
+    grid = grid or GRIDS[family]
+    alphas = grid['alpha']
+    l1_ratios = [1.0] if family == 'lasso' else grid['l1_ratio']
+    started = time.perf_counter()
+    fold_results = Parallel(n_jobs=n_jobs)(
+        delayed(_path_fold)(X, y, train_index, val_index, l1_ratios, alphas)
+        for train_index, val_index in cv.split(X, y)
+    )
+
+    candidates = []
+    for l1_ratio in l1_ratios:
+        for alpha in alphas:
+            scores = [-rmse[l1_ratio, alpha] for rmse, _ in fold_results]
+            params = {'alpha': alpha} if family == 'lasso' else {'alpha': alpha, 'l1_ratio': l1_ratio}
+            candidates.append({
+                'params': params,
+                'mean_score': float(np.mean(scores)),
+                'std_score': float(np.std(scores)),
+                'mean_fit_seconds': float(np.mean([seconds[l1_ratio, alpha] for _, seconds in fold_results])),
+            })
+    best = max(candidates, key=lambda c: c['mean_score'])
+    return {
+        'family': family,
+        'method': 'warm_started_path',
+        'best_params': best['params'],
+        'best_score': best['mean_score'],
+        'candidates': candidates,
+        'search_seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def search_family(task, family, X, y, cv, n_jobs, memory, grid=None):
+    if family in ('lasso', 'elastic_net'):
+        return path_search(family, X, y, cv, n_jobs, grid)
+    return grid_search(family, X, y, cv, TASKS[task]['scoring'], n_jobs, memory, grid)
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def train(task, families=None, folds=5, n_jobs=-1, cache_dir=None, grids=None,
+          models_root=None, version=None, promote=False, project_root=PROJECT_ROOT):
+    """
+    Search each family, refit the best one on all the data and save a new version
+    Returns the metadata dict that is also written next to the model
+    """
+    spec = TASKS[task]
+    families = families or spec['default_families']
+    unknown = [f for f in families if f not in spec['families'] + spec.get('comparison_only', [])]
+    if unknown:
+        raise ValueError(f'{task} does not support families {unknown}')
+    grids = grids or {}
+    models_root = models_root or os.path.join(project_root, 'models')
+    version = version or datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')
+    memory = Memory(cache_dir, verbose=0) if cache_dir else None
+
+    started = time.perf_counter()
+    X, y = load_data(task, project_root)
+    cv = make_cv(task, folds)
+    searches = [search_family(task, family, X, y, cv, n_jobs, memory, grids.get(family)) for family in families]
+
+    selectable = [s for s in searches if s['family'] in spec['families']]
+    if not selectable:
+        raise ValueError(f'No family that can be saved was searched for {task}')
+    best = max(selectable, key=lambda s: s['best_score'])
+
+    fit_started = time.perf_counter()
+    model = Pipeline([("preprocessor", make_preprocessor()),
+                      ("model", make_estimator(best['family'], **best['best_params']))])
+    model.fit(X, y)
+    final_fit_seconds = time.perf_counter() - fit_started
+
+    version_dir = os.path.join(models_root, task, 'versions', version)
+    os.makedirs(version_dir, exist_ok=True)
+    model_path = os.path.join(version_dir, 'model.pkl')
+    joblib.dump(model, model_path)
+
+    data_path = os.path.join(project_root, spec['data'])
+    metadata = {
+        'model': task,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'artifact': os.path.relpath(model_path, project_root),
+        'artifact_sha256': sha256_file(model_path),
+        'data': {'path': spec['data'], 'sha256': sha256_file(data_path), 'rows': int(len(X)),
+                 'features': list(X.columns)},
+        'scoring': spec['scoring'],
+        'cv_folds': folds,
+        'selected': {'family': best['family'], 'params': best['best_params'], 'cv_score': best['best_score']},
+        'searches': searches,
+        'final_fit_seconds': round(final_fit_seconds, 3),
+        'total_seconds': round(time.perf_counter() - started, 3),
+        'n_jobs': n_jobs,
+        'versions': {'python': platform.python_version(), 'sklearn': sklearn.__version__,
+                     'numpy': np.__version__, 'pandas': pd.__version__},
+    }
+    if promote:
+        served = os.path.join(models_root, task, 'saved_model', spec['artifact'])
+        # Copy then rename, so the API's watcher never sees a half-written file
+        shutil.copyfile(model_path, served + '.tmp')
+        os.replace(served + '.tmp', served)
+        metadata['promoted_to'] = os.path.relpath(served, project_root)
+
+    with open(os.path.join(version_dir, 'metadata.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('task', choices=list(TASKS))
+    parser.add_argument('--families', help='comma separated, e.g. ridge,lasso,elastic_net (default: all for the task)')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-jobs', type=int, default=-1, help='parallel jobs (-1 = all cores)')
+    parser.add_argument('--cache-dir', default=os.path.join(PROJECT_ROOT, '.training_cache'),
+                        help='where fitted preprocessors are cached ("" to turn off)')
+    parser.add_argument('--version', help='version name (default: UTC timestamp)')
+    parser.add_argument('--promote', action='store_true', help='also replace the model the API serves')
+    args = parser.parse_args()
+
+    families = args.families.split(',') if args.families else None
+    metadata = train(args.task, families, args.folds, args.n_jobs, args.cache_dir or None,
+                     version=args.version, promote=args.promote)
+
+    higher_is_better = '' if metadata['scoring'] == 'accuracy' else ' (negative RMSE, closer to 0 is better)'
+    print(f"{'family':<12} {'method':<18} {'best CV score':>14} {'seconds':>8}  best params")
+    for s in metadata['searches']:
+        print(f"{s['family']:<12} {s['method']:<18} {s['best_score']:>14.5f} {s['search_seconds']:>8.2f}  {s['best_params']}")
+    print(f"\nScores are {metadata['scoring']}{higher_is_better}")
+    print(f"Selected {metadata['selected']['family']} {metadata['selected']['params']}")
+    print(f"Saved version {metadata['version']} to {metadata['artifact']} in {metadata['total_seconds']}s")
+    if 'promoted_to' in metadata:
+        print(f"Promoted to {metadata['promoted_to']}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())